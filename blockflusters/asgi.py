@@ -2,6 +2,8 @@
 ASGI config for blockflusters project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP is served by Django; WebSocket connections to /ws/game/ and /ws/room/
+are handed to the gameplay channels in game.consumers.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -13,4 +15,30 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "blockflusters.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+from game import stats  # noqa: E402
+
+# Counters still buffered when a server process exits
+stats.flush_at_exit()
+
+if getattr(settings, 'WARM_CACHES_ON_STARTUP', False):
+    from game.warmup import warm_up
+
+    warm_up()
+
+# Imported after Django is set up, as it loads models
+from game.consumers import GAME_SOCKET_PATH, ROOM_SOCKET_PATH, game_socket, room_socket  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "websocket":
+        if scope["path"] == GAME_SOCKET_PATH:
+            return await game_socket(scope, receive, send)
+        if scope["path"] == ROOM_SOCKET_PATH:
+            return await room_socket(scope, receive, send)
+        # Unknown socket path, reject the handshake
+        await receive()
+        return await send({"type": "websocket.close"})
+    return await django_application(scope, receive, send)
@@ -0,0 +1,113 @@
+"""
+Logging handlers for blockflusters.
+
+The file handler used by LOGGING writes and rotates on a background thread,
+so disk latency and log rotation never block a request. The thread is
+restarted in forked children, such as the workers of a preloading gunicorn
+master (see game.warmup.preload).
+"""
+
+import atexit
+import copy
+import logging
+import os
+import queue
+import weakref
+from logging.handlers import QueueListener, RotatingFileHandler
+
+
+class QueuedRotatingFileHandler(logging.Handler):
+    """
+    A RotatingFileHandler fronted by a bounded queue.
+
+    Records are put on the queue without blocking and written by a
+    QueueListener thread. When the queue is full the record is dropped and
+    counted in ``dropped``; the total is logged once the queue has room again.
+    """
+
+    def __init__(self, filename, maxBytes=0, backupCount=0, queue_size=10000, encoding=None):
+        super().__init__()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._reported_dropped = 0
+        self.file_handler = RotatingFileHandler(
+            filename,
+            maxBytes=maxBytes,
+            backupCount=backupCount,
+            encoding=encoding,
+            delay=True,
+        )
+        self._start_listener()
+        atexit.register(self.close)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_restarter(self))
+
+    def _start_listener(self):
+        self.listener = QueueListener(self.queue, self.file_handler)
+        self.listener.start()
+
+    def _restart_in_child(self):
+        # Threads don't survive fork, so nothing would read the queue
+        if self.listener is None:
+            return
+        # Records left in the parent's queue are the parent's to write
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        self.dropped = self._reported_dropped = 0
+        self._start_listener()
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread, in the file handler
+        super().setFormatter(fmt)
+        self.file_handler.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Only merge args into the message here so the record no longer
+        # references mutable request objects; full formatting is left to the
+        # file handler's thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = (self.formatter or logging.Formatter()).formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self.dropped += 1
+            return
+        except Exception:
+            self.handleError(record)
+            return
+
+        if self.dropped > self._reported_dropped and self.queue.qsize() < self.queue.maxsize // 2:
+            lost = self.dropped - self._reported_dropped
+            self._reported_dropped = self.dropped
+            warning = logging.LogRecord(
+                record.name, logging.WARNING, __file__, 0,
+                f"Log queue overflowed, dropped {lost} record(s) ({self.dropped} total)", None, None,
+            )
+            try:
+                self.queue.put_nowait(warning)
+            except queue.Full:
+                pass
+
+    def close(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            self.file_handler.close()
+        super().close()
+
+
+def _restarter(handler):
+    # A weak reference, so the fork hook doesn't keep closed handlers alive
+    reference = weakref.ref(handler)
+
+    def restart():
+        handler = reference()
+        if handler is not None:
+            handler._restart_in_child()
+    return restart
@@ -10,9 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 import os
+import tempfile
 import environ
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -111,6 +111,10 @@ DATABASES = {
         'PASSWORD': env('DB_PASSWORD', default=env('POSTGRES_PASSWORD')),
         'HOST': env('DB_HOST'),
         'PORT': env('DB_PORT'),
+        # Set above 0 to keep connections open between requests, so a warmed
+        # connection is reused (WSGI only: ASGI requests run on short-lived threads)
+        'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=0),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -164,6 +168,16 @@ MEDIA_ROOT = BASE_DIR / 'media'
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'static'
 
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    # Hashed names plus .gz/.br variants written by collectstatic (see game.storage)
+    "staticfiles": {
+        "BACKEND": "game.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -189,11 +203,12 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
         },
-        'file': {  # RotatingFileHandler
-            'class': 'logging.handlers.RotatingFileHandler',
+        'file': {  # RotatingFileHandler, written from a background thread
+            'class': 'blockflusters.log_handlers.QueuedRotatingFileHandler',
             'filename': os.path.join(LOGS_DIR, 'blockflusters.log'),
             'maxBytes': 1024 * 1024 * 5,
             'backupCount': 5,  # Keep up to 5 backup log files
+            'queue_size': 10000,  # Records beyond this are dropped and counted
             'formatter': 'verbose',
         },
     },
@@ -216,6 +231,28 @@ LOGGING = {
     },
 }
 
+# Gameplay event log, one append-only binary file per worker (see game.eventlog).
+# Set to an empty value to turn it off; tests do.
+EVENT_LOG_DIR = env('EVENT_LOG_DIR', default=os.path.join(LOGS_DIR, 'events')) or None
+EVENT_LOG_MAX_BYTES = 1024 * 1024 * 64
+
+# Touched when the catalogue changes, so every worker on the host reloads it (see game.catalogue)
+# Set to an empty value to rely on CATALOGUE_TTL alone
+CATALOGUE_STAMP_PATH = env(
+    'CATALOGUE_STAMP_PATH', default=os.path.join(tempfile.gettempdir(), 'blockflusters-catalogue.stamp')
+) or None
+
+# Share the catalogue between workers through an mmap'd file (see game.snapshot)
+CATALOGUE_SNAPSHOT_PATH = env('CATALOGUE_SNAPSHOT_PATH', default=None)
+
+# Run game.warmup when a worker loads the WSGI/ASGI application
+WARM_CACHES_ON_STARTUP = env.bool('WARM_CACHES_ON_STARTUP', default=False)
+
+# Preload and freeze the app in wsgi.py before workers fork (gunicorn --preload)
+WSGI_PRELOAD = env.bool('WSGI_PRELOAD', default=False)
+# Fewer young-generation collections; requests allocate many short-lived objects
+GC_THRESHOLDS = (50000, 20, 100)
+
 # Axes Admin Logout
 AXES_FAILURE_LIMIT = env('AXES_FAILURE_LIMIT'),
 AXES_COOLOFF_TIME = env('AXES_COOLOFF_TIME'),
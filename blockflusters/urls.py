@@ -16,11 +16,10 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path, include
-from django.conf.urls.static import static
+from django.urls import path, re_path, include
 from django.conf import settings
 from game.sitemaps import StaticViewsSitemap
-from game.views import custom_sitemap_view, robots_txt
+from game.views import custom_sitemap_view, robots_txt, serve_media, serve_static
 
 sitemaps = {
     'static': StaticViewsSitemap
@@ -31,4 +30,18 @@ urlpatterns = [
     path("", include("game.urls")),
     path('robots.txt', robots_txt, name='robots_txt'),
     path('sitemap.xml', custom_sitemap_view, name='sitemap'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+# Media is served by Django in development, or when the front end proxies it
+# through (SERVE_MEDIA), from the in-memory media cache.
+if getattr(settings, 'SERVE_MEDIA', settings.DEBUG):
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media, name='media'),
+    ]
+
+# Collected static files with their precompressed variants, for deployments
+# without a front end server for /static/ (SERVE_STATIC)
+if getattr(settings, 'SERVE_STATIC', False):
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), serve_static, name='static'),
+    ]
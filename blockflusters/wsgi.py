@@ -14,3 +14,19 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "blockflusters.settings")
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+from game import stats  # noqa: E402
+
+# Counters still buffered when a server process exits
+stats.flush_at_exit()
+
+if getattr(settings, 'WSGI_PRELOAD', False):
+    # Loaded once in a preforking master (gunicorn --preload), see game.warmup
+    from game.warmup import preload
+
+    preload()
+elif getattr(settings, 'WARM_CACHES_ON_STARTUP', False):
+    from game.warmup import warm_up
+
+    warm_up()
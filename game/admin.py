@@ -1,6 +1,57 @@
-from django.contrib import admin
-from .models import FilmImage, GameSession
-from django.utils.html import mark_safe
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.core.exceptions import PermissionDenied
+from django.core.files.storage import default_storage
+from django.core.paginator import Paginator
+from django.db import connection
+from django.shortcuts import redirect, render
+from django.urls import path, reverse
+from django.utils.functional import cached_property
+from . import catalogue, jobs
+from .forms import BulkHintForm, ZipUploadForm
+from .models import DailyDeck, FilmImage, GameSession, ImageJob, ImageStats, LeaderboardEntry
+from django.utils.html import format_html
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the planner's row estimate instead of COUNT(*) for an unfiltered
+    changelist of a large table; exact counts are still used for filtered
+    lists and small tables.
+    """
+    exact_count_below = 10000
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        if not query.where and not query.combinator:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                    [self.object_list.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            # reltuples is -1 (or missing) until the table is first analysed
+            if row and row[0] >= self.exact_count_below:
+                return row[0]
+        return super().count
+
+
+def set_field_action(field, value, label):
+    """
+    Builds an admin action that sets field to value on every selected row
+    with one UPDATE, without loading or saving the rows.
+    """
+    def action(modeladmin, request, queryset):
+        updated = queryset.update(**{field: value})
+        # update() sends no post_save, so drop the catalogue here
+        catalogue.invalidate()
+        modeladmin.message_user(request, f"Set {field} to {label} on {updated} image(s).", messages.SUCCESS)
+
+    action.__name__ = f'set_{field}_{value.lower()}'
+    action.short_description = f'Set {field} to {label}'
+    return action
 
 
 @admin.register(FilmImage)
@@ -9,10 +60,93 @@ class FilmImageAdmin(admin.ModelAdmin):
     list_filter = ('tier',)
     search_fields = ('title',)
     readonly_fields = ('image_tag',)
+    actions = [
+        *(set_field_action('tier', value, label) for value, label in FilmImage.TIER_CHOICES),
+        *(set_field_action('frame', value, label) for value, label in FilmImage.FRAME_CHOICES),
+        'edit_hints',
+        'reencode_images',
+    ]
+    change_list_template = 'admin/game/filmimage/change_list.html'
+
+    def get_urls(self):
+        return [
+            path(
+                'upload-zip/',
+                self.admin_site.admin_view(self.upload_zip_view),
+                name='game_filmimage_upload_zip',
+            ),
+        ] + super().get_urls()
+
+    def upload_zip_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        if request.method == 'POST':
+            form = ZipUploadForm(request.POST, request.FILES)
+            if form.is_valid():
+                # Loaded by a background job; the request only stores the upload
+                job = jobs.start_ingest_job(form.cleaned_data['archive'])
+                self.message_user(request, f"Started {job}.", messages.SUCCESS)
+                return redirect('admin:game_imagejob_change', job.pk)
+        else:
+            form = ZipUploadForm()
+
+        return render(request, 'admin/game/filmimage/upload_zip.html', {
+            **self.admin_site.each_context(request),
+            'title': 'Upload zip archive',
+            'opts': self.model._meta,
+            'form': form,
+        })
+
+    @admin.action(description='Edit hints of selected images')
+    def edit_hints(self, request, queryset):
+        if 'apply' in request.POST:
+            form = BulkHintForm(request.POST)
+            if form.is_valid():
+                if form.cleaned_data['clear_hints']:
+                    changes = {'hint_1': None, 'hint_2': None}
+                else:
+                    changes = {
+                        field: form.cleaned_data[field]
+                        for field in ('hint_1', 'hint_2')
+                        if form.cleaned_data[field]
+                    }
+                if changes:
+                    updated = queryset.update(**changes)
+                    catalogue.invalidate()
+                    self.message_user(request, f"Updated hints on {updated} image(s).", messages.SUCCESS)
+                return None
+        else:
+            form = BulkHintForm()
+
+        return render(request, 'admin/game/filmimage/edit_hints.html', {
+            **self.admin_site.each_context(request),
+            'title': 'Edit hints',
+            'opts': self.model._meta,
+            'form': form,
+            'selected': list(queryset.values_list('pk', flat=True)),
+            'action_checkbox_name': ACTION_CHECKBOX_NAME,
+        })
+
+    @admin.action(description='Re-encode selected images in the background')
+    def reencode_images(self, request, queryset):
+        job = jobs.start_reencode_job(queryset.values_list('id', flat=True))
+        url = reverse('admin:game_imagejob_change', args=[job.pk])
+        self.message_user(
+            request,
+            format_html('Started <a href="{}">{}</a> for {} image(s).', url, job, job.total),
+            messages.SUCCESS,
+        )
 
     def image_tag(self, obj):
         if obj.image:
-            return mark_safe(f'<img src="{obj.image.url}" width="100" />')
+            # Imported here to keep PIL off the admin import path
+            from .imaging import thumbnail_name
+
+            # Thumbnails are made with the upload (or by generate_thumbnails),
+            # never here, so a changelist page doesn't decode full-size stills
+            name = thumbnail_name(obj.image.name, getattr(settings, 'ADMIN_THUMBNAIL_WIDTH', 200))
+            url = default_storage.url(name) if default_storage.exists(name) else obj.image.url
+            return format_html('<img src="{}" width="100" loading="lazy" />', url)
         return "No Image"
 
     image_tag.short_description = 'Image Preview'
@@ -20,5 +154,40 @@ class FilmImageAdmin(admin.ModelAdmin):
 
 @admin.register(GameSession)
 class GameSessionAdmin(admin.ModelAdmin):
-    list_display = ('session_id', 'score', 'time_remaining', 'current_tier_shown', 'frame_mode', 'last_active')
-    readonly_fields = ('session_id',)
\ No newline at end of file
+    list_display = ('session_id', 'score', 'time_remaining', 'frame_mode', 'last_active')
+    readonly_fields = ('session_id',)
+    # Exact match only, so the unique index on session_id is used
+    search_fields = ('=session_id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(LeaderboardEntry)
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ('frame_mode', 'period', 'period_start', 'score', 'session_id', 'achieved_at')
+    list_filter = ('frame_mode', 'period')
+
+
+@admin.register(DailyDeck)
+class DailyDeckAdmin(admin.ModelAdmin):
+    list_display = ('date', 'created_at')
+
+
+@admin.register(ImageStats)
+class ImageStatsAdmin(admin.ModelAdmin):
+    list_display = ('image', 'shown', 'correct', 'skipped', 'hinted', 'solve_rate', 'updated_at')
+    list_select_related = ('image',)
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'progress_display', 'failed', 'bytes_saved', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    readonly_fields = [field.name for field in ImageJob._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description='Progress')
+    def progress_display(self, obj):
+        return f"{obj.processed}/{obj.total} ({obj.progress:.0%})"
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class GameConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "game"
+
+    def ready(self):
+        from . import catalogue, zoom
+        from .models import FilmImage
+
+        post_save.connect(catalogue.invalidate, sender=FilmImage, dispatch_uid="catalogue_invalidate_save")
+        post_delete.connect(catalogue.invalidate, sender=FilmImage, dispatch_uid="catalogue_invalidate_delete")
+        post_delete.connect(zoom.delete_image_crops, sender=FilmImage, dispatch_uid="zoom_delete_crops")
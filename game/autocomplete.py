@@ -0,0 +1,133 @@
+"""
+Typo-tolerant title suggestions.
+
+An in-memory prefix and trigram index over every catalogue title, plus the
+decoy titles in data/decoy_titles.txt so the suggestions don't give the
+answer away. The index is built once per worker, rebuilt only when the
+catalogue reloads, and lookups never touch the database.
+"""
+
+import bisect
+import os
+import re
+import threading
+from collections import Counter
+
+from django.conf import settings
+
+from . import catalogue
+
+DECOY_TITLES_PATH = os.path.join(os.path.dirname(__file__), 'data', 'decoy_titles.txt')
+
+_NON_WORD = re.compile(r'[^a-z0-9 ]+')
+
+
+def normalize(title):
+    return ' '.join(_NON_WORD.sub('', title.lower().replace('_', ' ').replace('&', 'and')).split())
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def load_decoy_titles():
+    try:
+        with open(DECOY_TITLES_PATH, encoding='utf-8') as file:
+            return [line.strip() for line in file if line.strip() and not line.startswith('#')]
+    except FileNotFoundError:
+        return []
+
+
+class TitleIndex:
+    """
+    Prefix (sorted keys + bisect) and trigram (postings lists) index over titles.
+    """
+
+    def __init__(self, titles):
+        by_key = {}
+        for title in titles:
+            key = normalize(title)
+            if key:
+                by_key.setdefault(key, title.replace('_', ' '))
+
+        self.keys = sorted(by_key)
+        self.titles = [by_key[key] for key in self.keys]
+        self.trigram_counts = []
+        self.postings = {}
+        for position, key in enumerate(self.keys):
+            grams = trigrams(key)
+            self.trigram_counts.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(position)
+
+        # Starts of the later words, so "knight" finds "The Dark Knight"; the
+        # first word is covered by self.keys
+        self.word_keys = sorted(
+            (key[match.end():], position)
+            for position, key in enumerate(self.keys)
+            for match in re.finditer(' ', key)
+        )
+
+    def search(self, query, limit=8):
+        query = normalize(query)
+        if len(query) < 2:
+            return []
+
+        # Titles starting with the query rank first, then titles with a later
+        # word starting with it. Both scans stop once limit titles are found,
+        # so a short, common prefix costs no more than a long one.
+        matches = []
+        seen = set()
+        start = bisect.bisect_left(self.keys, query)
+        for position in range(start, min(start + limit, len(self.keys))):
+            if not self.keys[position].startswith(query):
+                break
+            matches.append(position)
+            seen.add(position)
+
+        index = bisect.bisect_left(self.word_keys, (query,))
+        while len(matches) < limit and index < len(self.word_keys):
+            word_key, position = self.word_keys[index]
+            if not word_key.startswith(query):
+                break
+            if position not in seen:
+                matches.append(position)
+                seen.add(position)
+            index += 1
+
+        # Then fill up with the closest titles by trigram similarity
+        if len(matches) < limit:
+            grams = trigrams(query)
+            shared = Counter()
+            for gram in grams:
+                shared.update(self.postings.get(gram, ()))
+            scored = []
+            for position, count in shared.items():
+                similarity = count / (len(grams) + self.trigram_counts[position] - count)
+                if similarity >= 0.2 and position not in seen:
+                    scored.append((-similarity, position))
+            scored.sort()
+            matches.extend(position for _, position in scored[:limit - len(matches)])
+
+        return [self.titles[position] for position in matches]
+
+
+_lock = threading.Lock()
+_index = None
+_source = None
+
+
+def get_index():
+    global _index, _source
+    current = catalogue.get_catalogue()
+    if _index is None or _source is not current:
+        with _lock:
+            if _index is None or _source is not current:
+                titles = [entry.title for entry in current.values()] + load_decoy_titles()
+                _index, _source = TitleIndex(titles), current
+    return _index
+
+
+def suggest(query, limit=None):
+    return get_index().search(query, limit or getattr(settings, 'AUTOCOMPLETE_LIMIT', 8))
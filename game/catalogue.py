@@ -0,0 +1,134 @@
+"""
+In-process catalogue of FilmImage metadata.
+
+The catalogue is loaded once per worker and reused for read-only lookups
+(hints, titles) so they don't cost a query per request. It is dropped when a
+FilmImage is saved or deleted in this process, and reloaded after
+CATALOGUE_TTL seconds to pick up changes made by other processes such as
+load_images. Dropping it also touches the CATALOGUE_STAMP_PATH file, which
+every worker on the host stats per lookup, so an admin edit reaches the
+other workers on their next request.
+
+With CATALOGUE_SNAPSHOT_PATH set, the catalogue is instead shared by all
+workers through an mmap'd snapshot file (see game.snapshot).
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+from .models import FilmImage
+
+logger = logging.getLogger(__name__)
+
+CATALOGUE_FIELDS = ['id', 'title', 'tier', 'frame', 'hint_1', 'hint_2', 'image']
+
+
+class CatalogueEntry(namedtuple('CatalogueEntry', CATALOGUE_FIELDS)):
+    __slots__ = ()
+
+    @property
+    def hints(self):
+        return [hint for hint in (self.hint_1, self.hint_2) if hint]
+
+    def to_model(self):
+        """
+        Builds an unsaved FilmImage from the entry, for templates and image URLs.
+        """
+        return FilmImage(**self._asdict())
+
+
+_lock = threading.Lock()
+_catalogue = None
+_loaded_at = 0.0
+_loaded_stamp = None
+
+
+def _stamp():
+    """
+    Returns the mtime of the invalidation stamp file, or None without one.
+    """
+    path = getattr(settings, 'CATALOGUE_STAMP_PATH', None)
+    if not path:
+        return None
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _touch_stamp():
+    path = getattr(settings, 'CATALOGUE_STAMP_PATH', None)
+    if not path:
+        return
+    try:
+        with open(path, 'a'):
+            os.utime(path)
+    except OSError:
+        logger.warning("Could not touch the catalogue stamp %s", path, exc_info=True)
+
+
+def load_rows():
+    return FilmImage.objects.order_by('id').values_list(*CATALOGUE_FIELDS).iterator()
+
+
+def _load():
+    return {row[0]: CatalogueEntry(*row) for row in load_rows()}
+
+
+def get_catalogue():
+    """
+    Returns a dict of image id to CatalogueEntry, loading it if needed.
+    """
+    global _catalogue, _loaded_at, _loaded_stamp
+    if getattr(settings, 'CATALOGUE_SNAPSHOT_PATH', None):
+        # Imported here as the snapshot module imports this one
+        from . import snapshot
+
+        return snapshot.get_snapshot()
+
+    ttl = getattr(settings, 'CATALOGUE_TTL', 300)
+    stamp = _stamp()
+    catalogue = _catalogue
+    if catalogue is None or time.monotonic() - _loaded_at > ttl or stamp != _loaded_stamp:
+        with _lock:
+            if _catalogue is None or time.monotonic() - _loaded_at > ttl or stamp != _loaded_stamp:
+                _catalogue = _load()
+                _loaded_at = time.monotonic()
+                _loaded_stamp = stamp
+            catalogue = _catalogue
+    return catalogue
+
+
+def get_entry(image_id):
+    """
+    Returns the CatalogueEntry for image_id, or None if there is no such image.
+
+    Images added by another process since the last load are fetched on their
+    own and added to this worker's catalogue.
+    """
+    catalogue = get_catalogue()
+    entry = catalogue.get(image_id)
+    if entry is None:
+        row = FilmImage.objects.filter(id=image_id).values_list(*CATALOGUE_FIELDS).first()
+        if row:
+            entry = catalogue[image_id] = CatalogueEntry(*row)
+    return entry
+
+
+def invalidate(**kwargs):
+    """
+    Drops the catalogue in every worker on the host; used as a FilmImage
+    post_save/post_delete receiver and after bulk updates.
+    """
+    global _catalogue
+    _catalogue = None
+    _touch_stamp()
+    if getattr(settings, 'CATALOGUE_SNAPSHOT_PATH', None):
+        from . import snapshot
+
+        snapshot.invalidate()
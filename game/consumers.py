@@ -0,0 +1,270 @@
+"""
+WebSocket gameplay channel.
+
+A plain ASGI application mounted by blockflusters/asgi.py at /ws/game/. The
+player's Django session is read once when the socket connects, so guesses,
+skips and hints are small JSON frames with no cookie, CSRF or middleware
+work per message. The GameSession row is re-read for each frame, so a game
+ended over HTTP is seen. Each frame is answered with the same payload the HTTP
+views return, produced by the same functions in game.views.
+
+Client frames:
+
+    {"action": "guess", "image_id": 12, "answer": "heat"}
+    {"action": "skip", "image_id": 12}
+    {"action": "hint", "image_id": 12, "hint_count": 0}
+    {"action": "next"}
+
+Replies echo "action" alongside the view payload, or carry an "error".
+
+Multiplayer rooms (see game.rooms) are played over /ws/room/:
+
+    {"action": "create", "name": "Ripley", "mode": "first"}
+    {"action": "join", "code": "AB12CD", "name": "Hicks"}
+    {"action": "start"}
+    {"action": "guess", "answer": "aliens"}
+
+Room events are pushed to every player as they happen.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from http.cookies import SimpleCookie
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http.request import split_domain_port, validate_host
+
+from . import catalogue, rooms, views
+from .models import FilmImage, GameSession
+
+logger = logging.getLogger(__name__)
+
+GAME_SOCKET_PATH = '/ws/game/'
+ROOM_SOCKET_PATH = '/ws/room/'
+
+# Close codes in the application range (4000-4999)
+CLOSE_FORBIDDEN = 4003
+CLOSE_NO_SESSION = 4004
+
+
+def _get_header(scope, name):
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+def _origin_allowed(scope):
+    # Browsers always send Origin on WebSocket handshakes; checking it against
+    # ALLOWED_HOSTS stands in for CSRF protection. Only the game's own pages
+    # open these sockets, so a handshake without one is refused too.
+    origin = _get_header(scope, b'origin')
+    if origin is None:
+        return False
+    host, _ = split_domain_port(origin.split('://', 1)[-1])
+    allowed_hosts = settings.ALLOWED_HOSTS or (['localhost', '127.0.0.1', '[::1]'] if settings.DEBUG else [])
+    return validate_host(host, allowed_hosts)
+
+
+def database_sync_to_async(func):
+    """
+    sync_to_async for a frame's database work, with old connections closed
+    before and after it as Django does around a request (and Channels'
+    database_sync_to_async does), so CONN_MAX_AGE and health checks apply
+    to long-lived sockets and a broken connection is replaced.
+    """
+    def inner(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(inner)
+
+
+def load_game_session(scope):
+    """
+    Returns the GameSession for the connecting browser's Django session, or None.
+    """
+    cookie = SimpleCookie(_get_header(scope, b'cookie') or '')
+    morsel = cookie.get(settings.SESSION_COOKIE_NAME)
+    if morsel is None:
+        return None
+
+    store = import_module(settings.SESSION_ENGINE).SessionStore(morsel.value)
+    session_id = store.get('session_id')
+    if not session_id:
+        return None
+    return GameSession.objects.filter(session_id=session_id).first()
+
+
+def handle_message(session, message):
+    """
+    Runs one client frame against the socket's GameSession and returns the reply.
+    """
+    action = message.get('action')
+    reply = {'action': action}
+
+    try:
+        session.refresh_from_db()
+    except GameSession.DoesNotExist:
+        reply['error'] = 'Invalid session'
+        return reply
+
+    if action in ('next', 'guess', 'skip') and views.session_expired(session):
+        reply.update(views.expired_payload(session))
+        return reply
+
+    if action == 'next':
+        image = views.get_next_image(session)
+        if image:
+            reply.update({**views.image_payload(session, image), 'score': session.score})
+        else:
+            reply.update({'end_game': True, 'score': session.score})
+        return reply
+
+    if action not in ('guess', 'skip', 'hint'):
+        reply['error'] = 'Invalid action'
+        return reply
+
+    try:
+        entry = catalogue.get_entry(int(message.get('image_id')))
+    except (TypeError, ValueError):
+        entry = None
+    if entry is None:
+        reply['error'] = 'Invalid image'
+        return reply
+
+    if action == 'guess':
+        answer = str(message.get('answer', '')).strip().lower()[:255]
+        if not answer:
+            reply['error'] = 'Invalid input'
+            return reply
+        reply.update(views.submit_answer(session, entry.to_model(), answer))
+    elif action == 'skip':
+        reply.update(views.skip(session, entry.to_model()))
+    else:
+        try:
+            hint_count = int(message.get('hint_count', 0))
+        except (TypeError, ValueError):
+            hint_count = 0
+        hint = views.take_hint(entry, hint_count, session.session_id)
+        if hint:
+            reply['hint'] = f'"{hint[1]}"'
+        else:
+            reply['error'] = 'No hints available.'
+    return reply
+
+
+async def game_socket(scope, receive, send):
+    session = None
+
+    while True:
+        event = await receive()
+
+        if event['type'] == 'websocket.connect':
+            if not _origin_allowed(scope):
+                await send({'type': 'websocket.close', 'code': CLOSE_FORBIDDEN})
+                return
+            session = await database_sync_to_async(load_game_session)(scope)
+            if session is None:
+                await send({'type': 'websocket.close', 'code': CLOSE_NO_SESSION})
+                return
+            await send({'type': 'websocket.accept'})
+
+        elif event['type'] == 'websocket.receive':
+            try:
+                message = json.loads(event.get('text') or event.get('bytes') or '')
+            except ValueError:
+                message = None
+            if not isinstance(message, dict):
+                reply = {'error': 'Invalid request'}
+            else:
+                reply = await database_sync_to_async(handle_message)(session, message)
+            await send({'type': 'websocket.send', 'text': json.dumps(reply)})
+
+        elif event['type'] == 'websocket.disconnect':
+            logger.debug("Game socket closed for session %s", session.session_id if session else None)
+            return
+
+
+async def _send_json(send, data):
+    await send({'type': 'websocket.send', 'text': json.dumps(data)})
+
+
+async def _forward(queue, send):
+    while True:
+        await _send_json(send, await queue.get())
+
+
+async def room_socket(scope, receive, send):
+    manager = rooms.get_room_manager()
+    room = player_id = queue = forwarder = None
+
+    try:
+        while True:
+            event = await receive()
+
+            if event['type'] == 'websocket.connect':
+                if not _origin_allowed(scope):
+                    await send({'type': 'websocket.close', 'code': CLOSE_FORBIDDEN})
+                    return
+                await send({'type': 'websocket.accept'})
+
+            elif event['type'] == 'websocket.receive':
+                try:
+                    message = json.loads(event.get('text') or event.get('bytes') or '')
+                except ValueError:
+                    message = None
+                if not isinstance(message, dict):
+                    await _send_json(send, {'error': 'Invalid request'})
+                    continue
+
+                action = message.get('action')
+                try:
+                    if action in ('create', 'join'):
+                        if room is not None:
+                            raise rooms.RoomError('Already in a room')
+                        if action == 'create':
+                            mode = message.get('mode', 'first')
+                            if mode not in dict(FilmImage.FRAME_CHOICES):
+                                mode = 'first'
+                            joining = manager.create_room(mode)
+                        else:
+                            joining = manager.get_room(str(message.get('code', '')).upper())
+                            if joining is None:
+                                raise rooms.RoomError('No such room')
+                        player_id = uuid.uuid4().hex[:8]
+                        # Off the event loop, as a room's lock may be held by a guess
+                        events = await sync_to_async(joining.join)(player_id, str(message.get('name', '')))
+                        room = joining
+                        queue = manager.backend.subscribe(room.code)
+                        forwarder = asyncio.ensure_future(_forward(queue, send))
+                        await _send_json(send, {'event': 'joined', 'code': room.code, 'player': player_id})
+                    elif room is None:
+                        raise rooms.RoomError('Join a room first')
+                    elif action == 'start':
+                        events = await database_sync_to_async(room.start)()
+                    elif action == 'guess':
+                        answer = str(message.get('answer', '')).strip().lower()[:255]
+                        events = await database_sync_to_async(room.guess)(player_id, answer)
+                    else:
+                        raise rooms.RoomError('Invalid action')
+                except rooms.RoomError as e:
+                    await _send_json(send, {'error': str(e)})
+                    continue
+                await manager.dispatch(room, events)
+
+            elif event['type'] == 'websocket.disconnect':
+                return
+    finally:
+        if room is not None:
+            await manager.dispatch(room, await sync_to_async(room.leave)(player_id))
+        if queue is not None:
+            manager.backend.unsubscribe(room.code, queue)
+            forwarder.cancel()
@@ -0,0 +1,98 @@
+"""
+Daily challenge decks.
+
+Every daily challenge player walks the same sequence of stills for the day.
+The deck is built once per date from the catalogue using the usual tier
+progression, stored as a single DailyDeck row and then held in every worker,
+so starting or playing a daily game needs no per-session image selection and
+no images_remaining writes.
+"""
+
+import random
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import catalogue
+from .models import DailyDeck
+
+DAILY_MODE = 'daily'
+
+_lock = threading.Lock()
+_decks = {}
+
+
+def build_tiered_deck(size, rng, frame=None):
+    """
+    Picks up to size image ids from the catalogue following the tier
+    progression, with deck position standing in for the score. Each title is
+    used at most once.
+    """
+    # Imported here as views imports this module
+    from .views import get_active_tiers
+
+    entries = [entry for entry in catalogue.get_catalogue().values() if frame is None or entry.frame == frame]
+    used_titles = set()
+    deck = []
+
+    for position in range(size):
+        tiers = get_active_tiers(position)
+        candidates = [entry for entry in entries if entry.tier in tiers and entry.title not in used_titles]
+        if not candidates:
+            break
+        chosen = rng.choice(candidates)
+        used_titles.add(chosen.title)
+        deck.append(chosen.id)
+
+    return deck
+
+
+def build_deck(date, size=None):
+    """
+    Builds the list of image ids for a date. The same date always gives the
+    same deck for a given catalogue, whichever worker builds it.
+    """
+    size = size or getattr(settings, 'DAILY_DECK_SIZE', 60)
+    return build_tiered_deck(size, random.Random(date.isoformat()))
+
+
+def get_deck(date=None, build=True):
+    """
+    Returns the deck for a date as a tuple of image ids, building and storing
+    it on first use. An empty catalogue gives an empty deck that is neither
+    stored nor cached, so the day's deck is built once there are stills.
+    With build=False a deck that isn't stored yet is returned empty instead.
+    """
+    global _decks
+    today = timezone.localdate()
+    date = date or today
+    deck = _decks.get(date)
+    if deck is None:
+        with _lock:
+            deck = _decks.get(date)
+            if deck is None:
+                image_ids = DailyDeck.objects.filter(date=date).values_list('image_ids', flat=True).first()
+                if image_ids is None:
+                    image_ids = build_deck(date) if build else None
+                    if not image_ids:
+                        return ()
+                    daily_deck, _ = DailyDeck.objects.get_or_create(date=date, defaults={'image_ids': image_ids})
+                    image_ids = daily_deck.image_ids
+                deck = tuple(image_ids)
+                # Keep the cache small: older decks are dropped as others are
+                # added, while today's stays whatever date is asked for
+                _decks = {key: value for key, value in _decks.items() if key >= today}
+                _decks[date] = deck
+    return deck
+
+
+def get_image(date, position):
+    """
+    Returns the unsaved FilmImage at a deck position, or None past the end.
+    """
+    deck = get_deck(date)
+    if position >= len(deck):
+        return None
+    entry = catalogue.get_entry(deck[position])
+    return entry.to_model() if entry else None
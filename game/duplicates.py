@@ -0,0 +1,115 @@
+"""
+Near-duplicate detection for stills.
+
+Every still gets a 64-bit difference hash (see imaging.dhash) when it is
+processed, stored in FilmImage.dhash. HashIndex keeps the hashes as one packed
+uint64 numpy array and measures Hamming distance with a vectorized XOR and
+popcount, so the stills near one hash are found in a single pass over the
+array. Finding every close pair doesn't compare all pairs either: two hashes
+within distance d agree exactly on at least one of d + 1 slices of their bits,
+so hashes are bucketed on each slice in turn and only compared within a
+bucket.
+"""
+
+import numpy as np
+
+from django.conf import settings
+
+from .models import FilmImage
+
+HASH_BITS = 64
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def popcount(values):
+    """
+    Number of set bits in each element of a uint64 array.
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    # numpy < 2.0: the usual SWAR bit count, element-wise
+    values = values - ((values >> np.uint64(1)) & _M1)
+    values = (values & _M2) + ((values >> np.uint64(2)) & _M2)
+    values = (values + (values >> np.uint64(4))) & _M4
+    return ((values * _H01) >> np.uint64(56)).astype(np.uint8)
+
+
+def default_distance():
+    return getattr(settings, 'DUPLICATE_HASH_DISTANCE', 6)
+
+
+class HashIndex:
+    """
+    Image ids and their hashes, for Hamming distance lookups.
+    """
+
+    def __init__(self, ids=(), hashes=()):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        # Stored signed in the database; the bits are what matter here
+        self.hashes = np.asarray(hashes, dtype=np.int64).view(np.uint64)
+
+    @classmethod
+    def load(cls, queryset=None):
+        queryset = FilmImage.objects.all() if queryset is None else queryset
+        rows = queryset.filter(dhash__isnull=False).order_by('id').values_list('id', 'dhash')
+        ids, hashes = zip(*rows) if rows else ((), ())
+        return cls(ids, hashes)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, image_id, image_hash):
+        self.ids = np.append(self.ids, np.int64(image_id))
+        self.hashes = np.append(self.hashes, np.int64(image_hash).view(np.uint64))
+
+    def nearest(self, image_hash, max_distance=None):
+        """
+        Returns [(image_id, distance)] for the hashes within max_distance of
+        image_hash, closest first.
+        """
+        max_distance = default_distance() if max_distance is None else max_distance
+        distances = popcount(self.hashes ^ np.int64(image_hash).view(np.uint64))
+        matches = np.flatnonzero(distances <= max_distance)
+        matches = matches[np.argsort(distances[matches], kind='stable')]
+        return [(int(self.ids[i]), int(distances[i])) for i in matches]
+
+    def pairs(self, max_distance=None):
+        """
+        Returns [(image_id, other_id, distance)] for every pair of hashes
+        within max_distance of each other, closest first.
+        """
+        max_distance = default_distance() if max_distance is None else max_distance
+        if max_distance >= HASH_BITS:
+            # Every pair is within range; compare everything
+            slices = [np.arange(0)]
+        else:
+            slices = np.array_split(np.arange(HASH_BITS), max_distance + 1)
+
+        found = []
+        for bits in slices:
+            if len(bits):
+                mask = np.uint64((1 << len(bits)) - 1)
+                keys = (self.hashes >> np.uint64(bits[0])) & mask
+            else:
+                keys = np.zeros(len(self.hashes), dtype=np.uint64)
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+            ends = np.r_[starts[1:], len(keys)]
+            for start, end in zip(starts[ends - starts > 1], ends[ends - starts > 1]):
+                members = np.sort(order[start:end])
+                group = self.hashes[members]
+                distances = popcount(group[:, None] ^ group[None, :])
+                first, second = np.nonzero(np.triu(distances <= max_distance, k=1))
+                found.append(np.stack([members[first], members[second], distances[first, second]], axis=1))
+
+        if not found:
+            return []
+        # A pair agreeing on several slices was found once per slice
+        found = np.unique(np.concatenate(found), axis=0)
+        found = found[np.argsort(found[:, 2], kind='stable')]
+        return [(int(self.ids[a]), int(self.ids[b]), int(distance)) for a, b, distance in found]
@@ -0,0 +1,199 @@
+"""
+Append-only binary log of gameplay events for offline analysis.
+
+Each worker process appends length-prefixed records to its own file under
+EVENT_LOG_DIR, so recording an event never touches the database. Writes are
+buffered, fsync'd in batches and the file is rotated once it reaches
+EVENT_LOG_MAX_BYTES. Use iter_events() to stream the records back and the
+compact_event_log command to summarise them.
+
+Record layout (little-endian), after a 4-byte payload length:
+
+    B  event type          d  unix timestamp      16s session uuid
+    q  image id (0: none)  i  score               f   similarity (NaN: none)
+    f  seconds since the session's previous request (NaN: unknown)
+    H  answer length, followed by the UTF-8 answer
+"""
+
+import atexit
+import glob
+import logging
+import math
+import os
+import struct
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+START, GUESS, SKIP, HINT, END = range(1, 6)
+EVENT_NAMES = {START: 'start', GUESS: 'guess', SKIP: 'skip', HINT: 'hint', END: 'end'}
+
+_LENGTH = struct.Struct('<I')
+_HEADER = struct.Struct('<Bd16sqiffH')
+
+Event = namedtuple(
+    'Event', ['event', 'timestamp', 'session_id', 'image_id', 'score', 'similarity', 'elapsed', 'answer']
+)
+
+
+def encode(event, session_id, image_id=None, score=0, similarity=None, elapsed=None, answer='', timestamp=None):
+    try:
+        session_bytes = uuid.UUID(session_id).bytes
+    except (TypeError, ValueError):
+        session_bytes = bytes(16)
+    answer_bytes = (answer or '').encode('utf-8')[:0xFFFF]
+    payload = _HEADER.pack(
+        event,
+        time.time() if timestamp is None else timestamp,
+        session_bytes,
+        image_id or 0,
+        score or 0,
+        math.nan if similarity is None else similarity,
+        math.nan if elapsed is None else elapsed,
+        len(answer_bytes),
+    ) + answer_bytes
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def decode(payload):
+    event, timestamp, session_bytes, image_id, score, similarity, elapsed, answer_length = _HEADER.unpack_from(payload)
+    answer = payload[_HEADER.size:_HEADER.size + answer_length].decode('utf-8', errors='replace')
+    return Event(
+        event,
+        timestamp,
+        str(uuid.UUID(bytes=session_bytes)),
+        image_id or None,
+        score,
+        None if math.isnan(similarity) else similarity,
+        None if math.isnan(elapsed) else elapsed,
+        answer,
+    )
+
+
+class EventLogWriter:
+    """
+    Appends encoded records to a per-process file, with batched fsync and
+    size-based rotation.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024, fsync_every=100, fsync_interval=1.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._file = None
+        self._pid = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._pid = os.getpid()
+        name = f'events-{self._pid}-{time.time_ns()}.bin'
+        self._file = open(os.path.join(self.directory, name), 'ab')
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _discard(self):
+        # The file came from the parent with its unflushed bytes, which the
+        # parent writes itself. Point the descriptor at /dev/null first so
+        # closing it here can't write them a second time.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        try:
+            os.dup2(devnull, self._file.fileno())
+        finally:
+            os.close(devnull)
+        self._file.close()
+        self._file = None
+
+    def write(self, record):
+        with self._lock:
+            # A forked worker must not share its parent's file
+            if self._file is not None and self._pid != os.getpid():
+                self._discard()
+            if self._file is None:
+                self._open()
+            self._file.write(record)
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+            if self._file.tell() >= self.max_bytes:
+                self._close()
+
+    def _close(self):
+        if self._file is None:
+            return
+        if self._pid != os.getpid():
+            self._discard()
+            return
+        self._sync()
+        self._file.close()
+        self._file = None
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = EventLogWriter(
+                    settings.EVENT_LOG_DIR,
+                    max_bytes=getattr(settings, 'EVENT_LOG_MAX_BYTES', 64 * 1024 * 1024),
+                    fsync_every=getattr(settings, 'EVENT_LOG_FSYNC_EVERY', 100),
+                    fsync_interval=getattr(settings, 'EVENT_LOG_FSYNC_INTERVAL', 1.0),
+                )
+                atexit.register(_writer.close)
+    return _writer
+
+
+def log_event(event, session_id, **fields):
+    """
+    Records one gameplay event. Does nothing when EVENT_LOG_DIR is not set,
+    and never raises into the request.
+    """
+    if not getattr(settings, 'EVENT_LOG_DIR', None):
+        return
+    try:
+        get_writer().write(encode(event, session_id, **fields))
+    except (OSError, struct.error):
+        logger.exception("Failed to write gameplay event")
+
+
+def iter_events(paths):
+    """
+    Streams Events from the given files in order. A truncated record at the
+    end of a file (e.g. after a crash) is skipped.
+    """
+    for path in paths:
+        with open(path, 'rb') as file:
+            while True:
+                prefix = file.read(_LENGTH.size)
+                if len(prefix) < _LENGTH.size:
+                    break
+                (length,) = _LENGTH.unpack(prefix)
+                payload = file.read(length)
+                if len(payload) < length:
+                    break
+                yield decode(payload)
+
+
+def list_log_files(directory):
+    return sorted(glob.glob(os.path.join(directory, 'events-*.bin')), key=os.path.getmtime)
@@ -8,3 +8,21 @@ class AnswerForm(forms.Form):
         'placeholder': 'Enter movie here!',
         'autocomplete': 'off'
     }))
+
+
+class BulkHintForm(forms.Form):
+    hint_1 = forms.CharField(max_length=255, required=False, help_text='Leave blank to keep the current hint.')
+    hint_2 = forms.CharField(max_length=255, required=False, help_text='Leave blank to keep the current hint.')
+    clear_hints = forms.BooleanField(required=False, help_text='Remove both hints instead.')
+
+
+class ZipUploadForm(forms.Form):
+    archive = forms.FileField(
+        help_text='A zip holding the CSV (title, image_filename, tier, frame, hint_1, hint_2) and the images.'
+    )
+
+    def clean_archive(self):
+        archive = self.cleaned_data['archive']
+        if not archive.name.lower().endswith('.zip'):
+            raise forms.ValidationError('Upload a .zip file.')
+        return archive
@@ -0,0 +1,321 @@
+"""
+Quality-targeted encoding for film stills.
+
+Instead of writing stills back with PIL's default quality, optimize_image()
+searches for the lowest JPEG/WebP quality whose decoded result still scores at
+least IMAGE_TARGET_SSIM (structural similarity) against the resized source,
+and writes it progressive and optimised. The EXIF orientation is applied to
+the pixels and the only metadata kept is the colour profile. numpy is only
+needed for the SSIM measurement; without it a fixed IMAGE_FALLBACK_QUALITY is
+used.
+
+thumbnail() writes the small previews shown in the admin, and zoom_crops()
+the zoom mode variants (see game.zoom). dhash() gives the perceptual hash
+used to find duplicate stills (see game.duplicates).
+"""
+
+import io
+import os
+import posixpath
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+MAX_SIZE = (1080, 400)
+
+# Formats encoded lossily with a quality search; anything else is saved optimised
+QUALITY_FORMATS = {'JPEG', 'WEBP'}
+
+# EXIF tag of the orientation a camera or editor recorded
+EXIF_ORIENTATION = 0x0112
+
+# Formats accepted for uploaded stills
+ACCEPTED_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+
+# Longest side of the copy a still's crop centre is chosen on
+SALIENCY_SIZE = 256
+
+
+def lanczos():
+    try:
+        return Image.Resampling.LANCZOS
+    except AttributeError:
+        return Image.LANCZOS
+
+
+def resize(img, max_size=MAX_SIZE):
+    max_width, max_height = max_size
+    original_width, original_height = img.size
+
+    # Calculate scaling factor while maintaining aspect ratio
+    scaling_factor = min(max_width / original_width, max_height / original_height, 1)  # Prevent upscaling
+    new_size = (int(original_width * scaling_factor), int(original_height * scaling_factor))
+    if new_size == img.size:
+        return img
+
+    return img.resize(new_size, resample=lanczos())
+
+
+def ssim(first, second, window=8):
+    """
+    Mean structural similarity of two same-sized images, computed on luma
+    over window x window blocks (1.0 means identical).
+    """
+    import numpy as np
+
+    x = np.asarray(first.convert('L'), dtype=np.float64)
+    y = np.asarray(second.convert('L'), dtype=np.float64)
+    height, width = x.shape
+    height, width = height - height % window, width - width % window
+    if not height or not width:
+        return 1.0 if np.array_equal(x, y) else 0.0
+
+    def blocks(a):
+        return a[:height, :width].reshape(height // window, window, width // window, window)
+
+    x, y = blocks(x), blocks(y)
+    mean_x, mean_y = x.mean(axis=(1, 3)), y.mean(axis=(1, 3))
+    var_x, var_y = x.var(axis=(1, 3)), y.var(axis=(1, 3))
+    covariance = (x * y).mean(axis=(1, 3)) - mean_x * mean_y
+
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    scores = ((2 * mean_x * mean_y + c1) * (2 * covariance + c2)) / (
+        (mean_x ** 2 + mean_y ** 2 + c1) * (var_x + var_y + c2)
+    )
+    return float(scores.mean())
+
+
+def encode(img, image_format, quality=None, icc_profile=None):
+    buffer = io.BytesIO()
+    options = {'optimize': True}
+    if image_format == 'JPEG':
+        options.update(progressive=True, quality=quality)
+    elif image_format == 'WEBP':
+        options = {'quality': quality, 'method': 6}
+    # No exif argument, so metadata other than the colour profile is stripped
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    img.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def encode_to_target(img, image_format, target=None, min_quality=None, max_quality=None, icc_profile=None):
+    """
+    Returns (data, quality) for the smallest encoding that meets the target
+    SSIM, by binary search over the quality setting.
+    """
+    target = target or getattr(settings, 'IMAGE_TARGET_SSIM', 0.98)
+    low = min_quality or getattr(settings, 'IMAGE_MIN_QUALITY', 40)
+    high = max_quality or getattr(settings, 'IMAGE_MAX_QUALITY', 92)
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        quality = getattr(settings, 'IMAGE_FALLBACK_QUALITY', 85)
+        return encode(img, image_format, quality, icc_profile), quality
+
+    best = encode(img, image_format, high, icc_profile), high
+    while low <= high:
+        quality = (low + high) // 2
+        data = encode(img, image_format, quality, icc_profile)
+        if ssim(img, Image.open(io.BytesIO(data))) >= target:
+            best = data, quality
+            high = quality - 1
+        else:
+            low = quality + 1
+    return best
+
+
+def optimize_image(path, max_size=MAX_SIZE):
+    """
+    Resizes and re-encodes the image file at path in place. Returns
+    (bytes_before, bytes_after); the file is left alone if re-encoding would
+    not make it smaller.
+    """
+    with open(path, 'rb') as file:
+        original = file.read()
+
+    img = Image.open(io.BytesIO(original))
+    image_format = img.format
+    original_size = img.size
+    icc_profile = img.info.get('icc_profile')
+    # The EXIF orientation is dropped with the rest of the metadata, so it is
+    # applied to the pixels instead
+    rotated = img.getexif().get(EXIF_ORIENTATION, 1) != 1
+    img = resize(ImageOps.exif_transpose(img), max_size)
+
+    if image_format in QUALITY_FORMATS:
+        if img.mode not in ('RGB', 'L'):
+            # JPEG can't keep an alpha channel, WebP can
+            has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+            img = img.convert('RGBA' if has_alpha and image_format == 'WEBP' else 'RGB')
+        data, _ = encode_to_target(img, image_format, icc_profile=icc_profile)
+    else:
+        data = encode(img, image_format, icc_profile=icc_profile)
+
+    if len(data) >= len(original) and img.size == original_size and not rotated:
+        return len(original), len(original)
+
+    replace_file(path, data)
+    return len(original), len(data)
+
+
+def replace_file(path, data):
+    """
+    Writes data over the file at path through a temporary file in the same
+    directory renamed over it, so readers and a crash mid-write only ever
+    see the old or the new file, never a truncated one.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def prepare_upload(path):
+    """
+    Checks that the file at path is a complete image in an accepted format,
+    then resizes and re-encodes it in place like optimize_image(). Returns
+    (bytes_before, bytes_after, zoom crops, dhash).
+    """
+    with Image.open(path) as img:
+        if img.format not in ACCEPTED_FORMATS:
+            raise ValueError(f"unsupported image format {img.format}")
+        img.verify()
+    bytes_before, bytes_after = optimize_image(path)
+    return bytes_before, bytes_after, zoom_crops(path), dhash(path)
+
+
+def reencode_image(path):
+    """
+    Re-encodes an existing still in place like optimize_image(). Returns
+    (bytes_before, bytes_after, zoom crops, dhash), the last two made from
+    the new file, or None if the file was left alone.
+    """
+    bytes_before, bytes_after = optimize_image(path)
+    if bytes_after == bytes_before:
+        return bytes_before, bytes_after, None, None
+    return bytes_before, bytes_after, zoom_crops(path), dhash(path)
+
+
+def dhash(path, size=8):
+    """
+    Returns the difference hash of the image at path: one bit per pair of
+    horizontally adjacent pixels of a (size + 1) x size greyscale copy, set
+    where the right one is brighter. Re-encoded, resized or lightly edited
+    copies of a still hash within a few bits of each other. The 64-bit value
+    is returned signed, as FilmImage.dhash stores it.
+    """
+    with Image.open(path) as img:
+        # Lets JPEG decode at a fraction of the size
+        img.draft('L', (size * 8, size * 8))
+        small = img.convert('L').resize((size + 1, size), resample=lanczos())
+
+    pixels = small.tobytes()
+    value = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for column in range(size):
+            value = value << 1 | (pixels[offset + column + 1] > pixels[offset + column])
+    bits = size * size
+    return value - (1 << bits) if value >= 1 << (bits - 1) else value
+
+
+def salient_centre(img, window):
+    """
+    Returns the (x, y) centre of the window-sized region of img with the
+    most edge detail, or the centre of img if it is flat.
+    """
+    width, height = img.size
+    try:
+        import numpy as np
+    except ImportError:
+        return width / 2, height / 2
+
+    luma = np.asarray(img.convert('L'), dtype=np.float32)
+    edges = np.zeros_like(luma)
+    edges[:, 1:] += np.abs(np.diff(luma, axis=1))
+    edges[1:, :] += np.abs(np.diff(luma, axis=0))
+
+    # Summed-area table, so every window's total is four lookups
+    table = np.zeros((height + 1, width + 1), dtype=np.float64)
+    table[1:, 1:] = edges.cumsum(axis=0).cumsum(axis=1)
+    window_width, window_height = window
+    sums = (
+        table[window_height:, window_width:] - table[:-window_height, window_width:]
+        - table[window_height:, :-window_width] + table[:-window_height, :-window_width]
+    )
+    if sums.max() == sums.min():
+        return width / 2, height / 2
+    # Windows that all hold the whole detailed region tie; take their middle
+    top, left = np.argwhere(sums >= sums.max() * 0.999).mean(axis=0)
+    return float(left) + window_width / 2, float(top) + window_height / 2
+
+
+def zoom_crops(path, scales=None):
+    """
+    Returns [(box, data)] for the zoom mode variants of the still at path,
+    from the tightest crop to the widest. Every crop is centred on the
+    tightest crop's most detailed region and scaled up to the still's size.
+    """
+    scales = sorted(scales or getattr(settings, 'ZOOM_CROP_SCALES', (0.3, 0.5, 0.75)))
+    with Image.open(path) as img:
+        img = img.convert('RGB')
+    width, height = img.size
+
+    small = img.copy()
+    small.thumbnail((SALIENCY_SIZE, SALIENCY_SIZE))
+    window = (max(1, round(small.width * scales[0])), max(1, round(small.height * scales[0])))
+    centre_x, centre_y = salient_centre(small, window)
+    centre_x, centre_y = centre_x * width / small.width, centre_y * height / small.height
+
+    crops = []
+    for scale in scales:
+        crop_width, crop_height = max(1, round(width * scale)), max(1, round(height * scale))
+        left = min(max(0, round(centre_x - crop_width / 2)), width - crop_width)
+        top = min(max(0, round(centre_y - crop_height / 2)), height - crop_height)
+        box = (left, top, left + crop_width, top + crop_height)
+        crop = img.crop(box).resize((width, height), resample=lanczos())
+        data, _ = encode_to_target(crop, 'JPEG')
+        crops.append((box, data))
+    return crops
+
+
+def thumbnail_name(name, width):
+    root, _ = posixpath.splitext(name)
+    return f'thumbnails/{root}.{width}w.jpg'
+
+
+def thumbnail(name, width=None, storage=None):
+    """
+    Returns the storage name of a JPEG thumbnail of the image stored as name,
+    generating it on first use or when the image is newer than it.
+    """
+    storage = storage or default_storage
+    width = width or getattr(settings, 'ADMIN_THUMBNAIL_WIDTH', 200)
+    thumb_name = thumbnail_name(name, width)
+
+    try:
+        if storage.get_modified_time(thumb_name) >= storage.get_modified_time(name):
+            return thumb_name
+    except (OSError, NotImplementedError):
+        pass
+
+    with storage.open(name, 'rb') as file:
+        img = Image.open(file)
+        img.draft('RGB', (width, width))
+        img = img.convert('RGB')
+        img.thumbnail((width, width * 4))
+
+    if storage.exists(thumb_name):
+        storage.delete(thumb_name)
+    storage.save(thumb_name, ContentFile(encode(img, 'JPEG', 75)))
+    return thumb_name
@@ -0,0 +1,193 @@
+"""
+Catalogue ingestion from a single zip archive.
+
+The archive holds a CSV in load_images' format (title, image_filename, tier,
+frame, hint_1, hint_2) and the images it names, at any depth. Entries are
+read one at a time straight from the archive, so memory use doesn't grow with
+its size: each image is copied to a temporary file, decoded, resized and
+re-encoded in a process pool, which also makes its zoom mode crops and hash,
+and stored with its FilmImage row as soon as it comes back. At most a few
+images per worker are in flight, which also bounds the temporary disk space.
+
+Like load_images, each still is checked against the stills already loaded
+and those earlier in the archive, and one that looks like another is loaded
+with a warning rather than rejected.
+
+ingest_zip() yields progress events rather than printing, so the load_zip
+command and the admin upload job can report them their own way.
+"""
+
+import csv
+import io
+import multiprocessing
+import os
+import posixpath
+import shutil
+import tempfile
+import zipfile
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from .models import FilmImage
+from .zoom import store_crops
+
+IngestEvent = namedtuple('IngestEvent', ['kind', 'row', 'message'])
+
+TOTAL, CREATED, ERROR, WARNING = 'total', 'created', 'error', 'warning'
+
+REQUIRED_COLUMNS = {'title', 'image_filename', 'tier'}
+
+
+class IngestError(Exception):
+    pass
+
+
+def _find_csv(archive):
+    names = [info.filename for info in archive.infolist() if info.filename.lower().endswith('.csv')]
+    if not names:
+        raise IngestError('The archive has no CSV file')
+    # The shallowest CSV, in case images come with their own
+    return min(names, key=lambda name: (name.count('/'), name))
+
+
+def _validate(row, images):
+    """
+    Returns (fields, ZipInfo) for a CSV row, raising ValueError if it can't be loaded.
+    images maps each file name to the entries with that name, in any folder.
+    """
+    title = (row.get('title') or '').strip()
+    image_filename = posixpath.basename((row.get('image_filename') or '').strip().replace('\\', '/'))
+    tier = (row.get('tier') or '').strip()
+    frame = (row.get('frame') or '').strip() or 'first'
+
+    if not title:
+        raise ValueError('missing title')
+    if tier not in dict(FilmImage.TIER_CHOICES):
+        raise ValueError(f'invalid tier "{tier}"')
+    if frame not in dict(FilmImage.FRAME_CHOICES):
+        raise ValueError(f'invalid frame "{frame}"')
+    infos = images.get(image_filename)
+    if not infos:
+        raise ValueError(f'image "{image_filename}" is not in the archive')
+    if len(infos) > 1:
+        folders = ', '.join(sorted(posixpath.dirname(info.filename) or '/' for info in infos))
+        raise ValueError(f'image "{image_filename}" is in more than one folder ({folders})')
+    info = infos[0]
+
+    max_bytes = getattr(settings, 'INGEST_MAX_IMAGE_BYTES', 50 * 1024 * 1024)
+    if info.file_size > max_bytes:
+        raise ValueError(f'image "{image_filename}" is over {max_bytes} bytes')
+
+    fields = {
+        'title': title,
+        'tier': tier,
+        'frame': frame,
+        'hint_1': (row.get('hint_1') or '').strip() or None,
+        'hint_2': (row.get('hint_2') or '').strip() or None,
+    }
+    return fields, info
+
+
+def _inline(function, *args):
+    # Same interface as executor.submit, for workers=0
+    future = Future()
+    try:
+        future.set_result(function(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def ingest_zip(archive_file, workers=None):
+    """
+    Loads every row of the archive's CSV, yielding an IngestEvent for the
+    row count, and then for each row created or rejected, and a warning for
+    each still that looks like one already loaded.
+    """
+    # Imported here to keep PIL and numpy off the import path of the admin and commands
+    from .duplicates import HashIndex
+    from .imaging import prepare_upload, thumbnail
+
+    if workers is None:
+        workers = getattr(settings, 'INGEST_WORKERS', min(4, os.cpu_count() or 1))
+
+    try:
+        archive = zipfile.ZipFile(archive_file)
+    except zipfile.BadZipFile as e:
+        raise IngestError(f'Not a zip archive: {e}')
+
+    with archive, tempfile.TemporaryDirectory() as temp_dir:
+        images = {}
+        for info in archive.infolist():
+            if not info.is_dir() and not info.filename.lower().endswith('.csv'):
+                images.setdefault(posixpath.basename(info.filename), []).append(info)
+        with archive.open(_find_csv(archive)) as csv_file:
+            rows = list(csv.DictReader(io.TextIOWrapper(csv_file, encoding='utf-8-sig', newline='')))
+        if rows and not REQUIRED_COLUMNS <= set(rows[0]):
+            raise IngestError(f'The CSV needs the columns {", ".join(sorted(REQUIRED_COLUMNS))}')
+        yield IngestEvent(TOTAL, None, str(len(rows)))
+
+        # Stills already loaded, to warn about ones loaded again under another name
+        index = HashIndex.load()
+
+        executor = None
+        if workers:
+            # spawn rather than fork, as the caller may be a threaded web worker
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        submit = executor.submit if executor else _inline
+        pending = {}
+
+        def finish(done):
+            # In row order, so the lookalike warnings come out the same every run
+            for future in sorted(done, key=lambda future: pending[future][0]):
+                row_number, fields, temp_path, image_name = pending.pop(future)
+                try:
+                    bytes_before, bytes_after, crops, image_hash = future.result()
+                    with open(temp_path, 'rb') as file:
+                        stored_name = default_storage.save(f'film_images/{image_name}', File(file))
+                    # A committed name, so save() doesn't process the file again
+                    image = FilmImage(
+                        image=stored_name, bytes_saved=bytes_before - bytes_after, dhash=image_hash, **fields
+                    )
+                    image.save()
+                    store_crops(image.pk, stored_name, crops)
+                    thumbnail(stored_name)
+                except Exception as e:
+                    yield IngestEvent(ERROR, row_number, f'{image_name}: {e}')
+                else:
+                    yield IngestEvent(CREATED, row_number, fields['title'])
+                    for image_id, distance in index.nearest(image_hash):
+                        message = f"{fields['title']} ({image_name}) looks like image #{image_id}"
+                        yield IngestEvent(WARNING, row_number, f'{message} (hash distance {distance})')
+                    index.add(image.pk, image_hash)
+                finally:
+                    os.unlink(temp_path)
+
+        try:
+            # Row numbers count the header as line 1, as a spreadsheet shows them
+            for row_number, row in enumerate(rows, start=2):
+                try:
+                    fields, info = _validate(row, images)
+                except ValueError as e:
+                    yield IngestEvent(ERROR, row_number, str(e))
+                    continue
+
+                image_name = posixpath.basename(info.filename)
+                temp_path = os.path.join(temp_dir, f'{row_number}-{image_name}')
+                with archive.open(info) as source, open(temp_path, 'wb') as target:
+                    shutil.copyfileobj(source, target, 1024 * 1024)
+                pending[submit(prepare_upload, temp_path)] = (row_number, fields, temp_path, image_name)
+
+                # Keep a bounded number of extracted images waiting
+                if len(pending) >= max(workers, 1) * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from finish(done)
+
+            yield from finish(list(pending))
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
@@ -0,0 +1,241 @@
+"""
+Background image jobs started from the admin.
+
+Metadata changes from the admin are single queryset.update() calls; only the
+file work (re-encoding, loading an uploaded zip archive) is slow, so it is
+recorded as an ImageJob and run outside the request: a thread in the admin's
+process hands the files to a process pool and writes progress back to the job
+row. Jobs that are left pending (IMAGE_JOBS_IN_BACKGROUND off, or the process
+restarted) are picked up by the run_image_jobs command, which also reclaims
+running jobs whose thread died with its process.
+"""
+
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import BigIntegerField, F, Func, Q, Value
+from django.utils import timezone
+
+from .models import FilmImage, ImageJob
+from .zoom import store_crops
+
+logger = logging.getLogger(__name__)
+
+# Ingest job progress is written every this many rows
+PROGRESS_BATCH = 25
+
+# Per-row errors kept on an ingest job
+MAX_ERROR_LINES = 500
+
+
+def _record(job_id, processed, failed, bytes_saved):
+    ImageJob.objects.filter(pk=job_id).update(
+        processed=F('processed') + processed,
+        failed=F('failed') + failed,
+        bytes_saved=F('bytes_saved') + bytes_saved,
+        heartbeat_at=timezone.now(),
+    )
+
+
+def _record_image(job_id, image_id, failed=0, bytes_saved=0):
+    # Re-encode progress is written per image, with the image marked done, as
+    # each one takes far longer than the update
+    ImageJob.objects.filter(pk=job_id).update(
+        processed=F('processed') + 1,
+        failed=F('failed') + failed,
+        bytes_saved=F('bytes_saved') + bytes_saved,
+        done_ids=Func(
+            F('done_ids'), Value(image_id), function='array_append', output_field=ArrayField(BigIntegerField())
+        ),
+        heartbeat_at=timezone.now(),
+    )
+
+
+def _results(paths, workers):
+    """
+    Yields (image_id, imaging.reencode_image() result or exception) for each path.
+    """
+    # Imported here to keep PIL off the admin import path
+    from .imaging import reencode_image
+
+    if not workers:
+        for image_id, path in paths.items():
+            try:
+                yield image_id, reencode_image(path)
+            except Exception as e:
+                yield image_id, e
+        return
+
+    # spawn rather than fork, as the parent is a threaded web worker
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = {executor.submit(reencode_image, path): image_id for image_id, path in paths.items()}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+
+
+def _run_reencode(job_id, workers):
+    image_ids, done_ids = ImageJob.objects.values_list('image_ids', 'done_ids').get(pk=job_id)
+    # A reclaimed job resumes: stills already re-encoded would lose quality
+    # if they were compressed again
+    remaining = set(image_ids) - set(done_ids)
+    names = dict(FilmImage.objects.filter(id__in=remaining).values_list('id', 'image'))
+    for image_id in remaining - names.keys():
+        _record_image(job_id, image_id, failed=1)
+
+    paths = {image_id: default_storage.path(name) for image_id, name in names.items()}
+    for image_id, result in _results(paths, workers):
+        if isinstance(result, Exception):
+            logger.error("Re-encoding image %s failed: %s", image_id, result)
+            _record_image(job_id, image_id, failed=1)
+            continue
+        bytes_before, bytes_after, crops, image_dhash = result
+        saved = max(bytes_before - bytes_after, 0)
+        if bytes_after != bytes_before:
+            # The zoom crops and the hash were made from the old file
+            store_crops(image_id, names[image_id], crops)
+            FilmImage.objects.filter(id=image_id).update(bytes_saved=F('bytes_saved') + saved, dhash=image_dhash)
+        _record_image(job_id, image_id, bytes_saved=saved)
+
+
+def _run_ingest(job_id, workers):
+    # Imported here as ingest is only needed by ingest jobs
+    from . import ingest
+
+    source = ImageJob.objects.values_list('source', flat=True).get(pk=job_id)
+    processed = failed = 0
+    errors = []
+    try:
+        with open(source, 'rb') as archive:
+            for event in ingest.ingest_zip(archive, workers=workers):
+                if event.kind == ingest.TOTAL:
+                    ImageJob.objects.filter(pk=job_id).update(total=int(event.message), heartbeat_at=timezone.now())
+                    continue
+                if event.kind == ingest.WARNING:
+                    if len(errors) < MAX_ERROR_LINES:
+                        errors.append(f'Row {event.row}: {event.message}')
+                    continue
+                processed += 1
+                if event.kind == ingest.ERROR:
+                    failed += 1
+                    if len(errors) < MAX_ERROR_LINES:
+                        errors.append(f'Row {event.row}: {event.message}')
+                if processed % PROGRESS_BATCH == 0:
+                    _record(job_id, processed, failed, 0)
+                    ImageJob.objects.filter(pk=job_id).update(error='\n'.join(errors))
+                    processed = failed = 0
+        _record(job_id, processed, failed, 0)
+        ImageJob.objects.filter(pk=job_id).update(error='\n'.join(errors))
+    finally:
+        os.unlink(source)
+
+
+def run_job(job_id):
+    """
+    Runs a pending job to completion, recording progress as it goes.
+    """
+    now = timezone.now()
+    updated = ImageJob.objects.filter(pk=job_id, status=ImageJob.PENDING).update(
+        status=ImageJob.RUNNING, started_at=now, heartbeat_at=now
+    )
+    if not updated:
+        # Already taken by another runner
+        return
+
+    workers = getattr(settings, 'IMAGE_JOB_WORKERS', min(4, os.cpu_count() or 1))
+    try:
+        kind = ImageJob.objects.values_list('kind', flat=True).get(pk=job_id)
+        if kind == 'ingest':
+            _run_ingest(job_id, workers)
+        else:
+            _run_reencode(job_id, workers)
+        ImageJob.objects.filter(pk=job_id).update(status=ImageJob.DONE, finished_at=timezone.now())
+    except Exception as e:
+        logger.exception("Image job %s failed", job_id)
+        ImageJob.objects.filter(pk=job_id).update(status=ImageJob.FAILED, error=str(e), finished_at=timezone.now())
+
+
+def reclaim_stale_jobs():
+    """
+    Handles running jobs with no progress for IMAGE_JOB_STALE_AFTER seconds,
+    whose thread died with its process (a worker recycle, a deploy, a crash).
+    Re-encode jobs are queued again and resume after the images they marked
+    done; a half-loaded archive can't be resumed without loading rows twice,
+    so ingest jobs are failed.
+    Returns the number of jobs reclaimed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'IMAGE_JOB_STALE_AFTER', 15 * 60))
+    stale = ImageJob.objects.filter(status=ImageJob.RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+
+    reclaimed = stale.filter(kind='reencode').update(status=ImageJob.PENDING, started_at=None, heartbeat_at=None)
+    for job_id, source in stale.filter(kind='ingest').values_list('id', 'source'):
+        reclaimed += ImageJob.objects.filter(pk=job_id, status=ImageJob.RUNNING).update(
+            status=ImageJob.FAILED,
+            # Progress is recorded every PROGRESS_BATCH rows, so the last few
+            # rows loaded may not have been counted yet
+            error=(
+                'Interrupted; the rows counted as processed were loaded, as may have '
+                f'been up to {PROGRESS_BATCH - 1} rows after them.'
+            ),
+            finished_at=timezone.now(),
+        )
+        if source:
+            try:
+                os.unlink(source)
+            except FileNotFoundError:
+                pass
+    if reclaimed:
+        logger.warning("Reclaimed %d stale image job(s)", reclaimed)
+    return reclaimed
+
+
+def _run_in_thread(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        connection.close()
+
+
+def _start(job):
+    if getattr(settings, 'IMAGE_JOBS_IN_BACKGROUND', True):
+        transaction.on_commit(
+            lambda: threading.Thread(target=_run_in_thread, args=(job.pk,), daemon=True).start()
+        )
+    return job
+
+
+def start_reencode_job(image_ids):
+    """
+    Records a re-encode job for image_ids and, unless IMAGE_JOBS_IN_BACKGROUND
+    is off, starts it in a background thread once the job row is committed.
+    """
+    image_ids = list(image_ids)
+    return _start(ImageJob.objects.create(kind='reencode', image_ids=image_ids, total=len(image_ids)))
+
+
+def start_ingest_job(upload):
+    """
+    Copies an uploaded zip archive to INGEST_UPLOAD_DIR chunk by chunk and
+    records (and starts) a job loading it.
+    """
+    directory = getattr(settings, 'INGEST_UPLOAD_DIR', None) or tempfile.gettempdir()
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix='.zip', dir=directory)
+    with os.fdopen(fd, 'wb') as file:
+        for chunk in upload.chunks():
+            file.write(chunk)
+    return _start(ImageJob.objects.create(kind='ingest', source=path))
@@ -0,0 +1,90 @@
+"""
+Materialized leaderboards.
+
+Each board (frame mode x day/week/all-time) is a bounded top-K list kept in
+LeaderboardEntry and updated incrementally when a game ends, so reading a
+board costs O(K) no matter how many games have been played. Boards are
+served from the cache and only touched in the database when a score
+qualifies.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import LeaderboardEntry
+
+PERIODS = [period for period, _ in LeaderboardEntry.PERIOD_CHOICES]
+ALL_TIME_START = datetime.date(1970, 1, 1)
+
+
+def get_size():
+    return getattr(settings, 'LEADERBOARD_SIZE', 10)
+
+
+def get_period_start(period, today=None):
+    today = today or timezone.localdate()
+    if period == 'day':
+        return today
+    if period == 'week':
+        return today - datetime.timedelta(days=today.weekday())
+    return ALL_TIME_START
+
+
+def _cache_key(frame_mode, period, start):
+    return f'leaderboard:{frame_mode}:{period}:{start.isoformat()}'
+
+
+def get_leaderboard(frame_mode, period, today=None):
+    """
+    Returns the board as a list of (session_id, score, achieved_at), best first.
+    """
+    start = get_period_start(period, today)
+    key = _cache_key(frame_mode, period, start)
+    entries = cache.get(key)
+    if entries is None:
+        entries = list(
+            LeaderboardEntry.objects.filter(frame_mode=frame_mode, period=period, period_start=start)
+            .order_by('-score', 'achieved_at')
+            .values_list('session_id', 'score', 'achieved_at')[:get_size()]
+        )
+        cache.set(key, entries, getattr(settings, 'LEADERBOARD_CACHE_TIMEOUT', 60))
+    return entries
+
+
+def record_score(session, today=None):
+    """
+    Offers a finished session's score to every board for its frame mode.
+
+    Scores that can't make a full board are rejected from the cached copy
+    without touching the database; otherwise the entry is inserted and the
+    board trimmed back to K rows.
+    """
+    if not session.score:
+        return
+
+    size = get_size()
+    for period in PERIODS:
+        entries = get_leaderboard(session.frame_mode, period, today)
+        if any(session_id == session.session_id for session_id, _, _ in entries):
+            continue
+        if len(entries) >= size and session.score <= entries[-1][1]:
+            continue
+
+        start = get_period_start(period, today)
+        board = LeaderboardEntry.objects.filter(frame_mode=session.frame_mode, period=period, period_start=start)
+        with transaction.atomic():
+            LeaderboardEntry.objects.get_or_create(
+                frame_mode=session.frame_mode,
+                period=period,
+                period_start=start,
+                session_id=session.session_id,
+                defaults={'score': session.score},
+            )
+            overflow = list(board.order_by('-score', 'achieved_at').values_list('id', flat=True)[size:])
+            if overflow:
+                LeaderboardEntry.objects.filter(id__in=overflow).delete()
+        cache.delete(_cache_key(session.frame_mode, period, start))
@@ -0,0 +1,77 @@
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from game.models import FilmImage, GameSession
+from game.views import get_next_image
+
+
+class Command(BaseCommand):
+    help = 'Benchmark get_next_image against synthetic catalogues. All rows are rolled back afterwards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 100000],
+            help='Number of images per tier to benchmark against.',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Number of get_next_image calls to time per size.',
+        )
+
+    def handle(self, *args, **options):
+        tiers = [tier for tier, _ in FilmImage.TIER_CHOICES]
+
+        for size in options['sizes']:
+            with transaction.atomic():
+                # bulk_create skips FilmImage.save, so no image files are touched
+                images = FilmImage.objects.bulk_create(
+                    [
+                        FilmImage(
+                            title=f'Benchmark {tier} {i}',
+                            image=f'film_images/benchmark_{tier}_{i}.jpg',
+                            tier=tier,
+                            frame='first',
+                        )
+                        for tier in tiers
+                        for i in range(size)
+                    ],
+                    batch_size=5000,
+                )
+                session = GameSession.objects.create(session_id=f'benchmark-{uuid.uuid4()}')
+                through = GameSession.images_remaining.through
+                through.objects.bulk_create(
+                    [through(gamesession_id=session.id, filmimage_id=image.id) for image in images],
+                    batch_size=5000,
+                )
+
+                # Planner statistics, as a live catalogue would have them
+                with connection.cursor() as cursor:
+                    cursor.execute(f'ANALYZE {FilmImage._meta.db_table}, {through._meta.db_table}')
+
+                timings = []
+                for _ in range(options['iterations']):
+                    # Cycle through every tier band of the progression
+                    session.score = random.choice([0, 15, 25, 35, 45])
+                    start = time.perf_counter()
+                    get_next_image(session)
+                    timings.append((time.perf_counter() - start) * 1000)
+
+                transaction.set_rollback(True)
+
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            self.stdout.write(
+                f"{size} images per tier: median {statistics.median(timings):.2f} ms, "
+                f"p95 {p95:.2f} ms, max {timings[-1]:.2f} ms"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completed.'))
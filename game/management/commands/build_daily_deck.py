@@ -0,0 +1,41 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from game.daily import build_deck
+from game.models import DailyDeck
+
+
+class Command(BaseCommand):
+    help = 'Build the daily challenge deck ahead of time. Meant to run from cron just before midnight.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=datetime.date.fromisoformat,
+            help='First date to build a deck for (YYYY-MM-DD). Defaults to tomorrow.',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=1,
+            help='Number of consecutive days to build decks for.',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild decks that already exist.',
+        )
+
+    def handle(self, *args, **options):
+        start = options['date'] or timezone.localdate() + datetime.timedelta(days=1)
+
+        for offset in range(options['days']):
+            date = start + datetime.timedelta(days=offset)
+            if DailyDeck.objects.filter(date=date).exists() and not options['force']:
+                self.stdout.write(f"Deck for {date} already exists, skipping.")
+                continue
+
+            image_ids = build_deck(date)
+            DailyDeck.objects.update_or_create(date=date, defaults={'image_ids': image_ids})
+            self.stdout.write(self.style.SUCCESS(f"Built deck for {date} with {len(image_ids)} images."))
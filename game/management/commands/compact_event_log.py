@@ -0,0 +1,103 @@
+import json
+import os
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from game import eventlog
+from game.views import ANSWER_THRESHOLD
+
+SUMMARY_COLUMNS = [
+    'image_id', 'guesses', 'correct', 'skips', 'hints',
+    'mean_similarity', 'mean_seconds_to_guess',
+]
+
+
+class Command(BaseCommand):
+    help = 'Compact gameplay event log files into a columnar per-image summary.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir',
+            default=settings.EVENT_LOG_DIR,
+            help='Directory containing the event log files.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Path of the JSON summary to write. Defaults to summary-<timestamp>.json in --dir.',
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=60,
+            help='Skip files modified in the last N seconds, as a worker may still be writing them.',
+        )
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Delete the log files once they have been summarised.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['dir']:
+            raise CommandError('No event log directory: pass --dir or set EVENT_LOG_DIR.')
+        cutoff = time.time() - options['min_age']
+        paths = [path for path in eventlog.list_log_files(options['dir']) if os.path.getmtime(path) <= cutoff]
+        if not paths:
+            self.stdout.write(self.style.WARNING('No event log files to compact.'))
+            return
+
+        events = Counter()
+        counts = defaultdict(Counter)
+        similarity_totals = defaultdict(float)
+        elapsed_totals = defaultdict(float)
+        elapsed_counts = Counter()
+
+        # Stream the records, only per-image aggregates are kept in memory
+        for event in eventlog.iter_events(paths):
+            events[eventlog.EVENT_NAMES.get(event.event, 'unknown')] += 1
+            if event.image_id is None:
+                continue
+            image_counts = counts[event.image_id]
+            if event.event == eventlog.GUESS:
+                image_counts['guesses'] += 1
+                if event.similarity is not None:
+                    similarity_totals[event.image_id] += event.similarity
+                    if event.similarity >= ANSWER_THRESHOLD:
+                        image_counts['correct'] += 1
+                if event.elapsed is not None:
+                    elapsed_totals[event.image_id] += event.elapsed
+                    elapsed_counts[event.image_id] += 1
+            elif event.event == eventlog.SKIP:
+                image_counts['skips'] += 1
+            elif event.event == eventlog.HINT:
+                image_counts['hints'] += 1
+
+        columns = {name: [] for name in SUMMARY_COLUMNS}
+        for image_id in sorted(counts):
+            image_counts = counts[image_id]
+            guesses = image_counts['guesses']
+            columns['image_id'].append(image_id)
+            columns['guesses'].append(guesses)
+            columns['correct'].append(image_counts['correct'])
+            columns['skips'].append(image_counts['skips'])
+            columns['hints'].append(image_counts['hints'])
+            columns['mean_similarity'].append(
+                round(similarity_totals[image_id] / guesses, 2) if guesses else None
+            )
+            columns['mean_seconds_to_guess'].append(
+                round(elapsed_totals[image_id] / elapsed_counts[image_id], 2) if elapsed_counts[image_id] else None
+            )
+
+        output = options['output'] or os.path.join(options['dir'], f'summary-{int(time.time())}.json')
+        with open(output, 'w') as file:
+            json.dump({'files': len(paths), 'events': events, 'columns': columns}, file)
+
+        if options['delete']:
+            for path in paths:
+                os.remove(path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Summarised {sum(events.values())} event(s) from {len(paths)} file(s) into {output}."
+        ))
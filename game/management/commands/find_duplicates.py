@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from game.duplicates import HashIndex, default_distance
+from game.imaging import dhash
+from game.models import FilmImage
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'List pairs of FilmImages whose perceptual hashes are close enough to be duplicates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--distance',
+            type=int,
+            help='Largest Hamming distance between hashes to report. Defaults to DUPLICATE_HASH_DISTANCE (6).',
+        )
+
+    def handle(self, *args, **options):
+        max_distance = default_distance() if options['distance'] is None else options['distance']
+
+        # Stills loaded before hashes were recorded
+        hashed = 0
+        for image in FilmImage.objects.exclude(image='').filter(dhash__isnull=True).only('id', 'image').iterator():
+            try:
+                FilmImage.objects.filter(id=image.id).update(dhash=dhash(image.image.path))
+            except OSError as e:
+                logger.error("Could not hash image %s: %s", image.image.name, e)
+                continue
+            hashed += 1
+        if hashed:
+            self.stdout.write(f"Hashed {hashed} image(s).")
+
+        started = time.monotonic()
+        index = HashIndex.load()
+        pairs = index.pairs(max_distance)
+        elapsed = time.monotonic() - started
+
+        images = FilmImage.objects.in_bulk({image_id for pair in pairs for image_id in pair[:2]})
+        for image_id, other_id, distance in pairs:
+            image, other = images[image_id], images[other_id]
+            self.stdout.write(
+                f"{distance:2d}  #{image.id} {image.title} ({image.get_frame_display()}, {image.image.name})"
+                f"  ~  #{other.id} {other.title} ({other.get_frame_display()}, {other.image.name})"
+            )
+
+        style = self.style.SUCCESS if not pairs else self.style.WARNING
+        self.stdout.write(style(
+            f"Found {len(pairs)} pair(s) within distance {max_distance} among {len(index)} image(s) "
+            f"in {elapsed:.2f}s."
+        ))
@@ -0,0 +1,134 @@
+import os
+import posixpath
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from game.imaging import thumbnail_name
+from game.models import FilmImage
+from game.zoom import crop_name
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def scan_directory(root, relative):
+    """
+    Lists one directory, returning (files, subdirectories) where files are
+    (name, size, mtime) tuples with storage-relative names.
+    """
+    files, subdirectories = [], []
+    with os.scandir(os.path.join(root, relative)) as entries:
+        for entry in entries:
+            name = posixpath.join(relative, entry.name) if relative else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(name)
+            elif entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                files.append((name, stat.st_size, stat.st_mtime))
+    return files, subdirectories
+
+
+def walk_filesystem(root, prefix, workers):
+    """
+    Yields every file under root/prefix, scanning directories in parallel.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(scan_directory, root, prefix)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    files, subdirectories = future.result()
+                except FileNotFoundError:
+                    continue
+                yield from files
+                pending.update(executor.submit(scan_directory, root, name) for name in subdirectories)
+
+
+def walk_storage(storage, prefix):
+    """
+    Yields every file under prefix through the Storage API, for backends
+    without a local path.
+    """
+    directories = [prefix]
+    while directories:
+        directory = directories.pop()
+        subdirectories, files = storage.listdir(directory)
+        directories.extend(posixpath.join(directory, name) for name in subdirectories)
+        for name in files:
+            name = posixpath.join(directory, name)
+            yield name, storage.size(name), storage.get_modified_time(name).timestamp()
+
+
+class Command(BaseCommand):
+    help = 'Report or delete media files that are no longer referenced by any FilmImage.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prefix',
+            default='film_images',
+            help='Storage directory to collect, relative to the storage root.',
+        )
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=24,
+            help='Leave files modified in the last N hours, as an upload may not be saved yet.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the unreferenced files.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of threads scanning directories.',
+        )
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        prefix = options['prefix'].strip('/')
+        cutoff = time.time() - options['grace'] * 60 * 60
+
+        # Stream the referenced names rather than loading whole rows. The zoom
+        # crops and admin thumbnail derived from each still are referenced too.
+        thumbnail_width = getattr(settings, 'ADMIN_THUMBNAIL_WIDTH', 200)
+        referenced = set()
+        rows = FilmImage.objects.exclude(image='').values_list('image', 'crop_boxes').iterator(chunk_size=2000)
+        for name, crop_boxes in rows:
+            referenced.add(name)
+            referenced.add(thumbnail_name(name, thumbnail_width))
+            referenced.update(crop_name(name, level) for level in range(len(crop_boxes)))
+
+        try:
+            files = walk_filesystem(storage.path(''), prefix, options['workers'])
+        except NotImplementedError:
+            files = walk_storage(storage, prefix)
+
+        orphaned = reclaimed = scanned = 0
+        for name, size, mtime in files:
+            scanned += 1
+            if name in referenced or mtime > cutoff:
+                continue
+            orphaned += 1
+            reclaimed += size
+            if options['dry_run']:
+                self.stdout.write(f"Unreferenced: {name} ({size} bytes)")
+                continue
+            try:
+                storage.delete(name)
+            except OSError as e:
+                logger.error("Could not delete %s: %s", name, e)
+                orphaned -= 1
+                reclaimed -= size
+
+        verb = 'Would reclaim' if options['dry_run'] else 'Reclaimed'
+        logger.info("%s %d bytes from %d unreferenced file(s)", verb, reclaimed, orphaned)
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} file(s). {verb} {reclaimed} bytes from {orphaned} unreferenced file(s)."
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from game.models import FilmImage
+from game.zoom import generate_crops
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Generate the zoom mode crops of FilmImages that have none.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Regenerate the crops of every image, e.g. after changing ZOOM_CROP_SCALES.',
+        )
+
+    def handle(self, *args, **options):
+        images = FilmImage.objects.exclude(image='')
+        if not options['all']:
+            images = images.filter(crop_boxes__len=0)
+
+        generated = failed = 0
+        for image in images.only('id', 'image').iterator():
+            try:
+                generate_crops(image)
+            except OSError as e:
+                logger.error("Could not generate crops for image %s: %s", image.image.name, e)
+                failed += 1
+                continue
+            generated += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Generated crops for {generated} image(s), {failed} failed."))
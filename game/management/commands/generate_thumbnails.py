@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from game.imaging import thumbnail
+from game.models import FilmImage
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Generate the admin thumbnails of FilmImages that have none or an outdated one.'
+
+    def handle(self, *args, **options):
+        generated = failed = 0
+        for name in FilmImage.objects.exclude(image='').values_list('image', flat=True).iterator():
+            try:
+                thumbnail(name)
+            except OSError as e:
+                logger.error("Could not generate a thumbnail for image %s: %s", name, e)
+                failed += 1
+                continue
+            generated += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Checked the thumbnails of {generated} image(s), {failed} failed."))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from django.core.files import File
+from game.duplicates import HashIndex
 from game.models import FilmImage
 import csv
 import os
@@ -22,6 +23,9 @@ class Command(BaseCommand):
             for file in files:
                 self.stdout.write(f"- {file}")
 
+        # Stills already loaded, to warn about ones loaded again under another name
+        index = HashIndex.load()
+
         with open(csv_file, newline='', encoding='utf-8') as csvfile:
             reader = csv.DictReader(csvfile)
             for row in reader:
@@ -49,4 +53,10 @@ class Command(BaseCommand):
                     )
                     film_image.image = File(img_file, name=image_filename)
                     film_image.save()
-                    self.stdout.write(f"Loaded image for {title} ({frame})")
\ No newline at end of file
+                    self.stdout.write(f"Loaded image for {title} ({frame})")
+
+                for image_id, distance in index.nearest(film_image.dhash):
+                    self.stderr.write(
+                        f"{title} ({image_filename}) looks like image #{image_id} (hash distance {distance})"
+                    )
+                index.add(film_image.id, film_image.dhash)
\ No newline at end of file
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from game import ingest
+
+
+class Command(BaseCommand):
+    help = 'Load film images and metadata from a zip archive holding the CSV and the images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('zip_file', type=str, help='Path to the zip archive')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Processes decoding and re-encoding images (0 to process them in this process).',
+        )
+
+    def handle(self, *args, **kwargs):
+        created = errors = total = 0
+        try:
+            with open(kwargs['zip_file'], 'rb') as archive:
+                for event in ingest.ingest_zip(archive, workers=kwargs['workers']):
+                    if event.kind == ingest.TOTAL:
+                        total = int(event.message)
+                        self.stdout.write(f"Loading {total} row(s) from {kwargs['zip_file']}")
+                        continue
+                    if event.kind == ingest.WARNING:
+                        self.stderr.write(f"Row {event.row}: {event.message}")
+                        continue
+                    if event.kind == ingest.CREATED:
+                        created += 1
+                        self.stdout.write(f"[{created + errors}/{total}] Loaded {event.message}")
+                    else:
+                        errors += 1
+                        self.stderr.write(f"[{created + errors}/{total}] Row {event.row}: {event.message}")
+        except (OSError, ingest.IngestError) as e:
+            raise CommandError(str(e))
+
+        style = self.style.SUCCESS if not errors else self.style.WARNING
+        self.stdout.write(style(f"Loaded {created} image(s), {errors} row(s) with errors."))
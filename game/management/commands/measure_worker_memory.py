@@ -0,0 +1,65 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+SHARED_FIELDS = ('Shared_Clean', 'Shared_Dirty')
+PRIVATE_FIELDS = ('Private_Clean', 'Private_Dirty')
+
+
+def read_memory(pid):
+    """
+    Returns the kB fields of /proc/<pid>/smaps_rollup as a dict.
+    """
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return fields
+
+
+def child_pids(pid):
+    children = []
+    for task in os.listdir(f'/proc/{pid}/task'):
+        with open(f'/proc/{pid}/task/{task}/children') as file:
+            children.extend(int(child) for child in file.read().split())
+    return children
+
+
+class Command(BaseCommand):
+    help = 'Report shared and private resident memory of server worker processes (Linux only).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('pids', nargs='*', type=int, help='Worker process ids.')
+        parser.add_argument(
+            '--master',
+            type=int,
+            help='Process id of the server master; its child processes are measured.',
+        )
+
+    def handle(self, *args, **options):
+        pids = list(options['pids'])
+        try:
+            if options['master']:
+                pids.extend(child_pids(options['master']))
+            if not pids:
+                raise CommandError('Give worker process ids or --master.')
+
+            self.stdout.write(f"{'pid':>8} {'rss kB':>10} {'shared kB':>10} {'private kB':>10} {'pss kB':>10}")
+            total_private = 0
+            for pid in pids:
+                memory = read_memory(pid)
+                shared = sum(memory.get(field, 0) for field in SHARED_FIELDS)
+                private = sum(memory.get(field, 0) for field in PRIVATE_FIELDS)
+                total_private += private
+                self.stdout.write(
+                    f"{pid:>8} {memory.get('Rss', 0):>10} {shared:>10} {private:>10} {memory.get('Pss', 0):>10}"
+                )
+        except FileNotFoundError as e:
+            raise CommandError(f'Process memory is not available: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(pids)} worker(s), {total_private} kB private in total, "
+            f"{total_private // len(pids)} kB per worker."
+        ))
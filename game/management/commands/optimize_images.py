@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from game.imaging import optimize_image
+from game.models import FilmImage
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Re-encode existing FilmImage files at the lowest quality meeting IMAGE_TARGET_SSIM.'
+
+    def handle(self, *args, **options):
+        total_before = total_after = 0
+        for image_id, name in FilmImage.objects.exclude(image='').values_list('id', 'image').iterator():
+            try:
+                before, after = optimize_image(FilmImage(image=name).image.path)
+            except OSError as e:
+                logger.error("Could not optimise image %s: %s", name, e)
+                continue
+            total_before += before
+            total_after += after
+            if after < before:
+                FilmImage.objects.filter(id=image_id).update(bytes_saved=F('bytes_saved') + (before - after))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Reduced stills from {total_before} to {total_after} bytes ({total_before - total_after} saved)."
+        ))
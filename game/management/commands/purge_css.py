@@ -0,0 +1,175 @@
+import glob
+import os
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Selectors are always kept if they only use these element names
+ALWAYS_KEPT = {'html', 'body'}
+
+# Words used by templates and scripts; like PurgeCSS's default extractor
+TOKEN = re.compile(r'[A-Za-z][\w-]*')
+CLASS_OR_ID = re.compile(r'[.#](-?[_A-Za-z][\w-]*)')
+ELEMENT = re.compile(r'(?:^|[\s>+~])([A-Za-z][A-Za-z0-9]*)')
+# Pseudo-class arguments and attribute selectors don't decide whether a rule is used
+PSEUDO_ARGUMENTS = re.compile(r'\([^()]*\)')
+ATTRIBUTE = re.compile(r'\[[^\]]*\]')
+
+# At-rules whose block holds rules to purge; other at-rules are kept as they are
+NESTED_AT_RULES = ('@media', '@supports', '@layer', '@container')
+
+
+def used_tokens(paths):
+    tokens = set()
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            tokens.update(TOKEN.findall(file.read()))
+    return tokens
+
+
+def split_rules(css):
+    """
+    Splits a stylesheet into (prelude, body) pairs for its top-level rules;
+    comments are returned with a body of None.
+    """
+    rules = []
+    position = 0
+    length = len(css)
+    while position < length:
+        if css.startswith('/*', position):
+            end = css.find('*/', position + 2)
+            end = length if end == -1 else end + 2
+            rules.append((css[position:end], None))
+            position = end
+            continue
+
+        start = position
+        depth = 0
+        quote = None
+        brace = None
+        while position < length:
+            char = css[position]
+            if quote:
+                if char == '\\':
+                    position += 1
+                elif char == quote:
+                    quote = None
+            elif char in '"\'':
+                quote = char
+            elif char == '{':
+                if depth == 0:
+                    brace = position
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    position += 1
+                    break
+            elif char == ';' and depth == 0:
+                # Statement at-rules such as @charset and @import
+                position += 1
+                break
+            position += 1
+
+        text = css[start:position]
+        if not text.strip():
+            continue
+        if brace is None:
+            rules.append((text.strip(), ''))
+        else:
+            rules.append((css[start:brace].strip(), css[brace + 1:position - 1]))
+    return rules
+
+
+def selector_is_used(selector, tokens):
+    if '\\' in selector:
+        # Escaped names aren't parsed here, so keep them
+        return True
+    stripped = selector
+    while PSEUDO_ARGUMENTS.search(stripped):
+        stripped = PSEUDO_ARGUMENTS.sub('', stripped)
+    stripped = ATTRIBUTE.sub('', stripped)
+    stripped = re.sub(r'::?[\w-]+', '', stripped)
+
+    names = CLASS_OR_ID.findall(stripped)
+    elements = [element.lower() for element in ELEMENT.findall(stripped)]
+    return all(name in tokens for name in names) and all(
+        element in tokens or element in ALWAYS_KEPT for element in elements
+    )
+
+
+def purge(css, tokens):
+    output = []
+    for prelude, body in split_rules(css):
+        if body is None:
+            # Keep only licence comments
+            if prelude.startswith('/*!'):
+                output.append(prelude)
+        elif prelude.startswith('@'):
+            if prelude.startswith(NESTED_AT_RULES):
+                inner = purge(body, tokens)
+                if inner:
+                    output.append(f'{prelude}{{{inner}}}')
+            else:
+                output.append(f'{prelude}{{{body}}}' if body else prelude)
+        else:
+            selectors = [selector.strip() for selector in prelude.split(',')]
+            kept = [selector for selector in selectors if selector_is_used(selector, tokens)]
+            if kept:
+                output.append(f'{",".join(kept)}{{{body}}}')
+    return ''.join(output)
+
+
+class Command(BaseCommand):
+    help = 'Write a copy of a stylesheet with the rules no template or script uses removed.'
+
+    def add_arguments(self, parser):
+        default_css = os.path.join(settings.BASE_DIR, 'game', 'static', 'game', 'css', 'bootstrap.min.css')
+        parser.add_argument(
+            '--css',
+            default=default_css,
+            help='Stylesheet to purge.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Where to write the purged stylesheet. Defaults to <name>.purged.css next to --css.',
+        )
+        parser.add_argument(
+            '--content',
+            action='append',
+            help='Glob of files whose words count as used selectors. Defaults to the game templates and scripts.',
+        )
+        parser.add_argument(
+            '--safelist',
+            nargs='*',
+            default=[],
+            help='Class names, ids or elements to keep regardless, e.g. ones added by JavaScript at runtime.',
+        )
+
+    def handle(self, *args, **options):
+        patterns = options['content'] or [
+            os.path.join(settings.BASE_DIR, 'game', 'templates', '**', '*.html'),
+            os.path.join(settings.BASE_DIR, 'game', 'static', 'game', 'js', '*.js'),
+        ]
+        paths = sorted({path for pattern in patterns for path in glob.glob(pattern, recursive=True)})
+        if not paths:
+            raise CommandError('No content files matched.')
+
+        try:
+            with open(options['css'], encoding='utf-8') as file:
+                css = file.read()
+        except OSError as e:
+            raise CommandError(f'Could not read {options["css"]}: {e}')
+
+        tokens = used_tokens(paths) | set(options['safelist'])
+        purged = purge(css, tokens)
+
+        output = options['output'] or re.sub(r'(\.min)?\.css$', '.purged.css', options['css'])
+        with open(output, 'w', encoding='utf-8') as file:
+            file.write(purged)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {output}: {len(css.encode())} -> {len(purged.encode())} bytes "
+            f"using selectors from {len(paths)} file(s)."
+        ))
@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from game.models import ImageStats, FilmImage
+
+
+class Command(BaseCommand):
+    help = 'Propose (or apply) FilmImage tier changes based on observed solve rates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-shows',
+            type=int,
+            default=50,
+            help='Only consider images shown at least this many times.',
+        )
+        parser.add_argument(
+            '--easy',
+            type=float,
+            default=0.6,
+            help='Solve rate at or above which an image is Easy.',
+        )
+        parser.add_argument(
+            '--hard',
+            type=float,
+            default=0.3,
+            help='Solve rate below which an image is Hard.',
+        )
+        parser.add_argument(
+            '--apply',
+            action='store_true',
+            help='Apply the proposed changes instead of only listing them.',
+        )
+
+    def handle(self, *args, **options):
+        changes = {tier: [] for tier, _ in FilmImage.TIER_CHOICES}
+
+        observed = (
+            ImageStats.objects.filter(shown__gte=options['min_shows'])
+            .select_related('image')
+            .only('shown', 'correct', 'image__title', 'image__tier', 'image__frame')
+        )
+        for stat in observed.iterator():
+            rate = stat.solve_rate
+            if rate >= options['easy']:
+                proposed = 'Easy'
+            elif rate < options['hard']:
+                proposed = 'Hard'
+            else:
+                proposed = 'Medium'
+
+            if proposed != stat.image.tier:
+                changes[proposed].append(stat.image_id)
+                self.stdout.write(
+                    f"{stat.image.title} ({stat.image.frame}): {stat.image.tier} -> {proposed} "
+                    f"(solved {stat.correct}/{stat.shown}, {rate:.0%})"
+                )
+
+        total = sum(len(ids) for ids in changes.values())
+        if not total:
+            self.stdout.write("No tier changes proposed.")
+            return
+
+        if not options['apply']:
+            self.stdout.write(self.style.WARNING(f"{total} tier change(s) proposed. Re-run with --apply to apply them."))
+            return
+
+        # queryset.update() skips FilmImage.save, so no images are re-processed
+        with transaction.atomic():
+            for tier, ids in changes.items():
+                if ids:
+                    FilmImage.objects.filter(id__in=ids).update(tier=tier)
+        self.stdout.write(self.style.SUCCESS(f"Applied {total} tier change(s)."))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from game.jobs import reclaim_stale_jobs, run_job
+from game.models import ImageJob
+
+
+class Command(BaseCommand):
+    help = (
+        'Run pending image jobs, e.g. ones queued while IMAGE_JOBS_IN_BACKGROUND is off, '
+        'after reclaiming running jobs that stopped making progress.'
+    )
+
+    def handle(self, *args, **options):
+        reclaimed = reclaim_stale_jobs()
+        if reclaimed:
+            self.stdout.write(f"Reclaimed {reclaimed} stale job(s).")
+        job_ids = list(ImageJob.objects.filter(status=ImageJob.PENDING).order_by('id').values_list('id', flat=True))
+        for job_id in job_ids:
+            run_job(job_id)
+            job = ImageJob.objects.get(pk=job_id)
+            self.stdout.write(f"{job}: {job.failed} failed, {job.bytes_saved} bytes saved")
+
+        self.stdout.write(self.style.SUCCESS(f"Ran {len(job_ids)} image job(s)."))
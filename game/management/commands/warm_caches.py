@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from game.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = 'Preload imports, templates, the catalogue and its indexes, and report how long each stage took.'
+
+    def handle(self, *args, **options):
+        timings = warm_up()
+        for name, seconds, error in timings:
+            if error is None:
+                self.stdout.write(f"{name:<20} {seconds * 1000:8.1f} ms")
+            else:
+                self.stdout.write(self.style.ERROR(f"{name:<20} failed: {error}"))
+
+        total = sum(seconds for _, seconds, _ in timings)
+        self.stdout.write(self.style.SUCCESS(f"Warm-up finished in {total * 1000:.1f} ms."))
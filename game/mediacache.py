@@ -0,0 +1,102 @@
+"""
+In-process LRU cache of media file bytes.
+
+When media is served through Django (SERVE_MEDIA), every request for a still
+would otherwise re-read the file from disk. The cache holds the bytes, content
+type and a precomputed ETag of recently served files, bounded by total size
+(MEDIA_CACHE_MAX_BYTES) so the stills every new player sees stay in RAM. An
+entry is revalidated against the file's mtime and size with one stat() per
+request, so a replaced file is never served stale.
+"""
+
+import hashlib
+import mimetypes
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+
+CachedFile = namedtuple('CachedFile', ['content', 'content_type', 'etag', 'mtime', 'size'])
+
+
+class MediaCache:
+    """
+    Size-bounded LRU of CachedFile by path, with hit/miss/eviction counters.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_file_bytes=2 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.current_bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """
+        Returns the CachedFile for path, reading it from disk on a miss or when
+        it has changed, or None for a file larger than max_file_bytes, which is
+        left for the caller to stream. Raises OSError if the file can't be read.
+        """
+        stat = os.stat(path)
+        if stat.st_size > self.max_file_bytes:
+            return None
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached is not None and cached.mtime == stat.st_mtime_ns and cached.size == stat.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        with open(path, 'rb') as file:
+            content = file.read()
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        cached = CachedFile(
+            content, content_type, f'"{hashlib.md5(content).hexdigest()}"', stat.st_mtime_ns, len(content)
+        )
+        self._put(path, cached)
+        return cached
+
+    def _put(self, path, cached):
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self.current_bytes -= previous.size
+            self._entries[path] = cached
+            self.current_bytes += cached.size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = MediaCache(
+                    max_bytes=getattr(settings, 'MEDIA_CACHE_MAX_BYTES', 64 * 1024 * 1024),
+                    max_file_bytes=getattr(settings, 'MEDIA_CACHE_MAX_FILE_BYTES', 2 * 1024 * 1024),
+                )
+    return _cache
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0007_gamesession_current_tier_shown"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="filmimage",
+            index=models.Index(
+                fields=["frame", "tier"], name="filmimage_frame_tier_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0008_filmimage_frame_tier_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaderboardEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "frame_mode",
+                    models.CharField(
+                        choices=[("first", "First Frame"), ("last", "Last Frame")],
+                        max_length=5,
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[
+                            ("day", "Today"),
+                            ("week", "This Week"),
+                            ("all", "All Time"),
+                        ],
+                        max_length=4,
+                    ),
+                ),
+                ("period_start", models.DateField()),
+                ("session_id", models.CharField(max_length=255)),
+                ("score", models.PositiveIntegerField()),
+                (
+                    "achieved_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["frame_mode", "period", "period_start", "-score"],
+                        name="leaderboard_board_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("frame_mode", "period", "period_start", "session_id"),
+                        name="leaderboard_unique_session",
+                    )
+                ],
+            },
+        ),
+    ]
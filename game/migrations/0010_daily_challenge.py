@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:10
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0009_leaderboardentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyDeck",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(unique=True)),
+                (
+                    "image_ids",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.IntegerField(), size=None
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="gamesession",
+            name="deck_date",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="gamesession",
+            name="deck_position",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="gamesession",
+            name="frame_mode",
+            field=models.CharField(
+                choices=[
+                    ("first", "First Frame"),
+                    ("last", "Last Frame"),
+                    ("daily", "Daily Challenge"),
+                ],
+                default="first",
+                max_length=5,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="leaderboardentry",
+            name="frame_mode",
+            field=models.CharField(
+                choices=[
+                    ("first", "First Frame"),
+                    ("last", "Last Frame"),
+                    ("daily", "Daily Challenge"),
+                ],
+                max_length=5,
+            ),
+        ),
+    ]
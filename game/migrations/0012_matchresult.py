@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0011_imagestats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MatchResult",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("code", models.CharField(max_length=6)),
+                (
+                    "frame_mode",
+                    models.CharField(
+                        choices=[("first", "First Frame"), ("last", "Last Frame")],
+                        max_length=5,
+                    ),
+                ),
+                ("rounds", models.PositiveSmallIntegerField()),
+                ("results", models.JSONField(default=list)),
+                ("finished_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
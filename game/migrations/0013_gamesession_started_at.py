@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0012_matchresult"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gamesession",
+            name="started_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
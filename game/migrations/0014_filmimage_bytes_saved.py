@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0013_gamesession_started_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="filmimage",
+            name="bytes_saved",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
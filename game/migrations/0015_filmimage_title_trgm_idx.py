@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:27
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0014_filmimage_bytes_saved"),
+    ]
+
+    operations = [
+        # pg_trgm ships with PostgreSQL's contrib package, which must be installed
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddIndex(
+            model_name="filmimage",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("title"), name="gin_trgm_ops"
+                ),
+                name="filmimage_title_trgm_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:31
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0016_imagejob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="imagejob",
+            name="source",
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AlterField(
+            model_name="imagejob",
+            name="image_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.BigIntegerField(), blank=True, default=list, size=None
+            ),
+        ),
+        migrations.AlterField(
+            model_name="imagejob",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("reencode", "Re-encode images"),
+                    ("ingest", "Load zip archive"),
+                ],
+                max_length=10,
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:34
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0017_imagejob_ingest"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="filmimage",
+            name="crop_boxes",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=django.contrib.postgres.fields.ArrayField(
+                    base_field=models.IntegerField(), size=4
+                ),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="gamesession",
+            name="frame_mode",
+            field=models.CharField(
+                choices=[
+                    ("first", "First Frame"),
+                    ("last", "Last Frame"),
+                    ("daily", "Daily Challenge"),
+                    ("zoom", "Zoom Challenge"),
+                ],
+                default="first",
+                max_length=5,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="leaderboardentry",
+            name="frame_mode",
+            field=models.CharField(
+                choices=[
+                    ("first", "First Frame"),
+                    ("last", "Last Frame"),
+                    ("daily", "Daily Challenge"),
+                    ("zoom", "Zoom Challenge"),
+                ],
+                max_length=5,
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0018_zoom_mode"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="filmimage",
+            name="dhash",
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0019_filmimage_dhash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gamesession",
+            name="ended_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0020_gamesession_ended_at"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="gamesession",
+            name="current_tier_shown",
+        ),
+        migrations.AddField(
+            model_name="gamesession",
+            name="rotation_cursor",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="gamesession",
+            name="rotation_start",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0021_gamesession_rotation_cursor"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="imagejob",
+            name="heartbeat_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:14
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0022_imagejob_heartbeat_at"),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="gamesession",
+            old_name="rotation_start",
+            new_name="rotation_seed",
+        ),
+    ]
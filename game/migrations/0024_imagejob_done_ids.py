@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:20
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0023_gamesession_rotation_seed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="imagejob",
+            name="done_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.BigIntegerField(), blank=True, default=list, size=None
+            ),
+        ),
+    ]
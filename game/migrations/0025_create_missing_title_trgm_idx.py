@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    An earlier 0015 skipped the title trigram index when pg_trgm wasn't
+    available and still recorded itself as applied. Create the index on those
+    databases, failing here if pg_trgm still can't be installed.
+    """
+
+    dependencies = [
+        ("game", "0024_imagejob_done_ids"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            [
+                "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+                'CREATE INDEX IF NOT EXISTS "filmimage_title_trgm_idx" ON "game_filmimage" '
+                'USING gin ((UPPER("title") gin_trgm_ops))',
+            ],
+            migrations.RunSQL.noop,
+        ),
+    ]
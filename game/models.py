@@ -1,6 +1,10 @@
+import math
+
 from django.db import models
-from PIL import Image
+from django.utils import timezone
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
 
 
 class FilmImage(models.Model):
@@ -22,41 +26,207 @@ class FilmImage(models.Model):
     frame = models.CharField(max_length=6, choices=FRAME_CHOICES, default='first')
     hint_1 = models.CharField(max_length=255, blank=True, null=True)
     hint_2 = models.CharField(max_length=255, blank=True, null=True)
+    # Bytes removed from the uploaded file by resizing and re-encoding
+    bytes_saved = models.IntegerField(default=0, editable=False)
+    # (left, top, right, bottom) of each zoom mode crop, tightest first (see game.zoom)
+    crop_boxes = ArrayField(ArrayField(models.IntegerField(), size=4), default=list, blank=True, editable=False)
+    # Perceptual hash of the still, for finding duplicates (see game.duplicates)
+    dhash = models.BigIntegerField(blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['frame', 'tier'], name='filmimage_frame_tier_idx'),
+            # Trigram index matching the admin's UPPER(title) LIKE '%...%' search
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='filmimage_title_trgm_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
+        # Only a newly assigned file is processed, so re-saving a row doesn't
+        # re-encode (and degrade) an image that was already optimised.
+        new_file = bool(self.image) and not self.image._committed
+        # The crops of a replaced still are named after it, so they are found now
+        previous = None
+        if new_file and self.pk:
+            previous = FilmImage.objects.filter(pk=self.pk).values_list('image', 'crop_boxes').first()
         super().save(*args, **kwargs)
+        if not new_file:
+            return
 
-        img_path = self.image.path
-        img = Image.open(img_path)
-        original_width, original_height = img.size
-
-        max_width = 1080
-        max_height = 400
+        # Imported here as imaging is only needed when a file is uploaded
+        from .imaging import dhash, optimize_image, thumbnail
+        from .zoom import delete_crops, generate_crops
 
-        # Calculate scaling factor while maintaining aspect ratio
-        scaling_factor = min(max_width / original_width, max_height / original_height, 1)  # Prevent upscaling
-        new_size = (int(original_width * scaling_factor), int(original_height * scaling_factor))
+        bytes_before, bytes_after = optimize_image(self.image.path)
+        self.bytes_saved = bytes_before - bytes_after
+        self.dhash = dhash(self.image.path)
+        FilmImage.objects.filter(pk=self.pk).update(bytes_saved=self.bytes_saved, dhash=self.dhash)
+        generate_crops(self)
+        thumbnail(self.image.name)
+        if previous and previous[0] and previous[0] != self.image.name:
+            delete_crops(previous[0], len(previous[1]))
 
-        try:
-            resample_filter = Image.Resampling.LANCZOS
-        except AttributeError:
-            resample_filter = Image.LANCZOS
 
-        img = img.resize(new_size, resample=resample_filter)
-        img.save(img_path)
+class GameSession(models.Model):
 
+    MODE_CHOICES = FilmImage.FRAME_CHOICES + [
+        ("daily", "Daily Challenge"),
+        ("zoom", "Zoom Challenge")
+    ]
 
-class GameSession(models.Model):
     session_id = models.CharField(max_length=255, unique=True)
     score = models.PositiveIntegerField(default=0)
+    # Length of the game in seconds; what is left is derived from started_at
     time_remaining = models.PositiveIntegerField(default=90)
+    started_at = models.DateTimeField(default=timezone.now)
     images_remaining = models.ManyToManyField(FilmImage, related_name='sessions')
-    current_tier_shown = ArrayField(models.IntegerField(), default=list, blank=True)
-    frame_mode = models.CharField(max_length=5, choices=FilmImage.FRAME_CHOICES, default='first')
+    # The images shown follow a shuffle of the eligible ids seeded per
+    # rotation, so no list of shown ids is kept (see views.get_next_image)
+    rotation_seed = models.BigIntegerField(blank=True, null=True)
+    rotation_cursor = models.BigIntegerField(blank=True, null=True)
+    frame_mode = models.CharField(max_length=5, choices=MODE_CHOICES, default='first')
     last_active = models.DateTimeField(auto_now=True)
+    # Daily challenge sessions walk a shared deck instead of images_remaining
+    deck_date = models.DateField(blank=True, null=True)
+    deck_position = models.PositiveSmallIntegerField(default=0)
+    # Set by end_game; an ended session can't be played on
+    ended_at = models.DateTimeField(blank=True, null=True)
+
+    def seconds_remaining(self, now=None):
+        elapsed = ((now or timezone.now()) - self.started_at).total_seconds()
+        return max(0, math.ceil(self.time_remaining - elapsed))
+
+    def has_expired(self, grace=0, now=None):
+        if self.ended_at:
+            return True
+        elapsed = ((now or timezone.now()) - self.started_at).total_seconds()
+        return elapsed > self.time_remaining + grace
+
+    def __str__(self):
+        return f"Session: {self.session_id} - Mode: {self.get_frame_mode_display()}"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    One row of a bounded top-K board. Each (frame_mode, period, period_start)
+    board holds at most LEADERBOARD_SIZE rows, trimmed as games end.
+    """
+
+    PERIOD_CHOICES = [
+        ("day", "Today"),
+        ("week", "This Week"),
+        ("all", "All Time")
+    ]
+
+    frame_mode = models.CharField(max_length=5, choices=GameSession.MODE_CHOICES)
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    session_id = models.CharField(max_length=255)
+    score = models.PositiveIntegerField()
+    achieved_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['frame_mode', 'period', 'period_start', 'session_id'],
+                name='leaderboard_unique_session',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['frame_mode', 'period', 'period_start', '-score'], name='leaderboard_board_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_period_display()} ({self.frame_mode}): {self.score}"
+
+
+class DailyDeck(models.Model):
+    """
+    The shared sequence of stills every daily challenge player gets for a date.
+    """
+    date = models.DateField(unique=True)
+    image_ids = ArrayField(models.IntegerField())
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Daily deck {self.date} ({len(self.image_ids)} images)"
+
+
+class ImageStats(models.Model):
+    """
+    Observed difficulty of a FilmImage, accumulated from buffered in-process
+    counters (see game.stats) rather than written per event.
+    """
+    image = models.OneToOneField(FilmImage, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    shown = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    hinted = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def solve_rate(self):
+        return self.correct / self.shown if self.shown else None
+
+    def __str__(self):
+        return f"Stats: {self.image_id} - {self.correct}/{self.shown} solved"
+
+
+class MatchResult(models.Model):
+    """
+    Final scores of a multiplayer room, written once when the match ends.
+    """
+    code = models.CharField(max_length=6)
+    frame_mode = models.CharField(max_length=5, choices=FilmImage.FRAME_CHOICES)
+    rounds = models.PositiveSmallIntegerField()
+    results = models.JSONField(default=list)
+    finished_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Match {self.code} ({self.finished_at:%Y-%m-%d %H:%M})"
+
+
+class ImageJob(models.Model):
+    """
+    A batch of image processing started from the admin and run in the
+    background (see game.jobs), with progress counters.
+    """
+    KIND_CHOICES = [
+        ("reencode", "Re-encode images"),
+        ("ingest", "Load zip archive"),
+    ]
+
+    PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default=PENDING)
+    image_ids = ArrayField(models.BigIntegerField(), default=list, blank=True)
+    # Images a re-encode job has finished with, so a reclaimed job resumes
+    done_ids = ArrayField(models.BigIntegerField(), default=list, blank=True)
+    # Path of the uploaded archive, for ingest jobs
+    source = models.CharField(max_length=500, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    bytes_saved = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    # Touched as progress is recorded, so jobs whose runner died can be reclaimed
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    @property
+    def progress(self):
+        return self.processed / self.total if self.total else 1.0
 
     def __str__(self):
-        return f"Session: {self.session_id} - Mode: {self.get_frame_mode_display()}"
\ No newline at end of file
+        return f"{self.get_kind_display()} #{self.pk} ({self.status}, {self.processed}/{self.total})"
@@ -0,0 +1,239 @@
+"""
+Head-to-head multiplayer rooms.
+
+Two to eight players race through the same deck of stills; the first correct
+answer for a still scores and moves everyone on to the next one. A room's
+state (players, scores, deck position, round timer) lives in memory on the
+process that created it, and every change is fanned out to the connected
+players through a pub/sub backend. Nothing is written to the database until
+the match ends, when a single MatchResult row is stored.
+
+The backend is pluggable through GAME_ROOM_BACKEND. LocalRoomBackend fans out
+in-process and is what tests use; a shared broker can be dropped in by
+implementing the same three methods. Only the fan-out is pluggable, though:
+rooms live in the RoomManager of the process that created them, so every
+player of a room must reach that process. Serve /ws/room/ from a single ASGI
+process, or route its sockets to one by room code.
+
+Room state is changed from the event loop and from sync_to_async threads,
+so each room guards it with a lock.
+"""
+
+import asyncio
+import logging
+import random
+import string
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import catalogue, daily
+from .models import MatchResult
+
+logger = logging.getLogger(__name__)
+
+MIN_PLAYERS = 2
+MAX_PLAYERS = 8
+
+WAITING, PLAYING, FINISHED = 'waiting', 'playing', 'finished'
+
+
+class RoomError(Exception):
+    pass
+
+
+class Room:
+    """
+    The state of one match. Methods return the list of events to publish to
+    the room and never write to the database; they may read the catalogue, so
+    async callers run them through sync_to_async.
+    """
+    # The round timer task, kept so it isn't garbage collected mid-round
+    timer = None
+
+    def __init__(self, code, frame_mode='first', rounds=None, round_seconds=None, deck=None):
+        self.code = code
+        self.frame_mode = frame_mode
+        self.rounds = rounds or getattr(settings, 'GAME_ROOM_ROUNDS', 20)
+        self.round_seconds = round_seconds or getattr(settings, 'GAME_ROOM_ROUND_SECONDS', 30)
+        self.deck = deck
+        self.players = {}
+        self.state = WAITING
+        self.round = -1
+        self.round_started_at = None
+        self._lock = threading.RLock()
+
+    def scores(self):
+        return sorted(
+            ({'player': player_id, 'name': player['name'], 'score': player['score']}
+             for player_id, player in self.players.items()),
+            key=lambda player: -player['score'],
+        )
+
+    def join(self, player_id, name):
+        with self._lock:
+            if self.state != WAITING:
+                raise RoomError('Match already started')
+            if len(self.players) >= MAX_PLAYERS:
+                raise RoomError('Room is full')
+            self.players[player_id] = {'name': name[:30] or 'Player', 'score': 0}
+            return [{'event': 'players', 'players': self.scores()}]
+
+    def leave(self, player_id):
+        with self._lock:
+            self.players.pop(player_id, None)
+            if self.state == FINISHED:
+                return []
+            if not self.players or (self.state == PLAYING and len(self.players) < MIN_PLAYERS):
+                return self._finish()
+            return [{'event': 'players', 'players': self.scores()}]
+
+    def start(self):
+        with self._lock:
+            if self.state != WAITING:
+                raise RoomError('Match already started')
+            if len(self.players) < MIN_PLAYERS:
+                raise RoomError(f'At least {MIN_PLAYERS} players are needed')
+            if self.deck is None:
+                self.deck = daily.build_tiered_deck(self.rounds, random.Random(), frame=self.frame_mode)
+            self.state = PLAYING
+            return self._advance()
+
+    def _advance(self):
+        self.round += 1
+        entry = catalogue.get_entry(self.deck[self.round]) if self.round < len(self.deck) else None
+        if entry is None:
+            return self._finish()
+
+        self.round_started_at = time.monotonic()
+        return [{
+            'event': 'round',
+            'round': self.round,
+            'image_id': entry.id,
+            'image_url': entry.to_model().image.url,
+            'seconds': self.round_seconds,
+        }]
+
+    def _finish(self):
+        self.state = FINISHED
+        return [{'event': 'finished', 'scores': self.scores()}]
+
+    def current_entry(self):
+        return catalogue.get_entry(self.deck[self.round])
+
+    def guess(self, player_id, answer):
+        # Imported here as views imports this module
+        from .views import is_answer_correct
+
+        with self._lock:
+            if self.state != PLAYING or player_id not in self.players:
+                raise RoomError('No round in progress')
+            entry = self.current_entry()
+            if not is_answer_correct(answer, entry.title):
+                return [{'event': 'missed', 'player': player_id}]
+
+            self.players[player_id]['score'] += 1
+            return [
+                {'event': 'scored', 'player': player_id, 'movie_title': entry.title, 'players': self.scores()},
+            ] + self._advance()
+
+    def timeout(self, round_number):
+        """
+        Ends round_number if it is still the current round and has run out of time.
+        """
+        with self._lock:
+            if self.state != PLAYING or self.round != round_number:
+                return []
+            if time.monotonic() - self.round_started_at < self.round_seconds:
+                return []
+            return [{'event': 'timeout', 'movie_title': self.current_entry().title}] + self._advance()
+
+
+class LocalRoomBackend:
+    """
+    In-process pub/sub: each subscriber gets an asyncio.Queue of messages.
+    """
+
+    def __init__(self):
+        self.channels = {}
+
+    def subscribe(self, channel):
+        queue = asyncio.Queue()
+        self.channels.setdefault(channel, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, channel, queue):
+        subscribers = self.channels.get(channel, set())
+        subscribers.discard(queue)
+        if not subscribers:
+            self.channels.pop(channel, None)
+
+    async def publish(self, channel, message):
+        for queue in list(self.channels.get(channel, ())):
+            queue.put_nowait(message)
+
+
+def save_match(room):
+    MatchResult.objects.create(
+        code=room.code,
+        frame_mode=room.frame_mode,
+        rounds=room.round + 1,
+        results=room.scores(),
+    )
+
+
+class RoomManager:
+    """
+    Owns this process's rooms, publishes their events and runs round timers.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.rooms = {}
+
+    def create_room(self, frame_mode='first', **kwargs):
+        while True:
+            code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+            if code not in self.rooms:
+                break
+        room = self.rooms[code] = Room(code, frame_mode, **kwargs)
+        return room
+
+    def get_room(self, code):
+        return self.rooms.get(code)
+
+    async def dispatch(self, room, events):
+        for event in events:
+            await self.backend.publish(room.code, event)
+            if event['event'] == 'round':
+                self._stop_timer(room)
+                room.timer = asyncio.ensure_future(self._round_timer(room, event['round']))
+            elif event['event'] == 'finished':
+                self._stop_timer(room)
+                if self.rooms.pop(room.code, None) and room.round >= 0:
+                    # The only database write of the whole match
+                    await sync_to_async(save_match)(room)
+
+    def _stop_timer(self, room):
+        # Not from inside the timer itself, which is dispatching its timeout
+        if room.timer is not None and room.timer is not asyncio.current_task():
+            room.timer.cancel()
+        room.timer = None
+
+    async def _round_timer(self, room, round_number):
+        await asyncio.sleep(room.round_seconds)
+        await self.dispatch(room, await sync_to_async(room.timeout)(round_number))
+
+
+_manager = None
+
+
+def get_room_manager():
+    global _manager
+    if _manager is None:
+        backend_class = import_string(getattr(settings, 'GAME_ROOM_BACKEND', 'game.rooms.LocalRoomBackend'))
+        _manager = RoomManager(backend_class())
+    return _manager
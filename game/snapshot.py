@@ -0,0 +1,209 @@
+"""
+Catalogue snapshot shared by every worker on a host.
+
+When CATALOGUE_SNAPSHOT_PATH is set, the catalogue is written once to a
+compact read-only binary file and each worker mmaps it instead of holding its
+own copy, so adding workers no longer multiplies the catalogue's memory or
+load time. Entries are decoded on access.
+
+A rebuild writes a new file with a fresh generation number and renames it
+over the old one, so the swap is atomic: workers that still map the old file
+keep a consistent view until they notice the new one, which they check for at
+most every CATALOGUE_SNAPSHOT_CHECK_INTERVAL seconds. Saving or deleting a
+FilmImage removes the file, and a snapshot older than CATALOGUE_TTL is
+rebuilt, by whichever worker gets there first.
+
+Layout (little-endian):
+
+    4s magic  H version  Q generation  d built at (unix time)  I count
+    count x q image id (sorted)
+    count x I record offset
+    records: for each field after id, H length (0xFFFF: None) + UTF-8 bytes
+"""
+
+import bisect
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Mapping
+
+from django.conf import settings
+
+from .catalogue import CATALOGUE_FIELDS, CatalogueEntry, load_rows
+
+MAGIC = b'BFCS'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHQdI')
+_LENGTH = struct.Struct('<H')
+_NONE = 0xFFFF
+
+
+def encode_snapshot(rows, generation):
+    """
+    Encodes catalogue rows (tuples in CATALOGUE_FIELDS order) into snapshot bytes.
+    """
+    rows = sorted(rows)
+    records = []
+    offsets = []
+    offset = _HEADER.size + len(rows) * 12
+    for row in rows:
+        record = bytearray()
+        for value in row[1:]:
+            if value is None:
+                record += _LENGTH.pack(_NONE)
+            else:
+                encoded = str(value).encode('utf-8')[:_NONE - 1]
+                record += _LENGTH.pack(len(encoded)) + encoded
+        offsets.append(offset)
+        offset += len(record)
+        records.append(bytes(record))
+
+    return b''.join([
+        _HEADER.pack(MAGIC, VERSION, generation, time.time(), len(rows)),
+        struct.pack(f'<{len(rows)}q', *(row[0] for row in rows)),
+        struct.pack(f'<{len(rows)}I', *offsets),
+    ] + records)
+
+
+class CatalogueSnapshot(Mapping):
+    """
+    Read-only mapping of image id to CatalogueEntry over an mmap'd snapshot.
+    Entries that get_entry() fetches on their own are kept in a small overlay.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.key = (stat.st_ino, stat.st_mtime_ns)
+
+        magic, version, self.generation, self.built_at, count = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a catalogue snapshot")
+
+        view = memoryview(self._mmap)
+        ids_end = _HEADER.size + count * 8
+        self._ids = view[_HEADER.size:ids_end].cast('q')
+        self._offsets = view[ids_end:ids_end + count * 4].cast('I')
+        self._extra = {}
+
+    def _decode(self, index):
+        position = self._offsets[index]
+        values = [self._ids[index]]
+        for _ in CATALOGUE_FIELDS[1:]:
+            (length,) = _LENGTH.unpack_from(self._mmap, position)
+            position += _LENGTH.size
+            if length == _NONE:
+                values.append(None)
+            else:
+                values.append(self._mmap[position:position + length].decode('utf-8'))
+                position += length
+        return CatalogueEntry(*values)
+
+    def __getitem__(self, image_id):
+        index = bisect.bisect_left(self._ids, image_id)
+        if index < len(self._ids) and self._ids[index] == image_id:
+            return self._decode(index)
+        return self._extra[image_id]
+
+    def __setitem__(self, image_id, entry):
+        self._extra[image_id] = entry
+
+    def __iter__(self):
+        yield from self._ids
+        yield from self._extra
+
+    def __len__(self):
+        return len(self._ids) + len(self._extra)
+
+    def values(self):
+        # Sequential decode, without a binary search per entry
+        for index in range(len(self._ids)):
+            yield self._decode(index)
+        yield from self._extra.values()
+
+
+def _stat(path):
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _is_fresh(stat):
+    return stat is not None and time.time() - stat.st_mtime <= getattr(settings, 'CATALOGUE_TTL', 300)
+
+
+def build_snapshot(path, blocking=True):
+    """
+    Writes a new snapshot from the database unless another process already
+    has a fresh one. Returns False if blocking is off and another process is
+    building it.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(f'{path}.lock', 'a') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            return False
+        try:
+            if _is_fresh(_stat(path)):
+                return True
+            temp_path = f'{path}.{os.getpid()}.tmp'
+            with open(temp_path, 'wb') as file:
+                file.write(encode_snapshot(load_rows(), time.time_ns()))
+            os.replace(temp_path, path)
+            return True
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+_lock = threading.Lock()
+_current = None
+_checked_at = 0.0
+
+
+def get_snapshot():
+    """
+    Returns the CatalogueSnapshot for CATALOGUE_SNAPSHOT_PATH, building or
+    remapping it when it is missing, stale or has been replaced.
+    """
+    global _current, _checked_at
+    current = _current
+    interval = getattr(settings, 'CATALOGUE_SNAPSHOT_CHECK_INTERVAL', 1)
+    if current is not None and time.monotonic() - _checked_at < interval:
+        return current
+
+    path = settings.CATALOGUE_SNAPSHOT_PATH
+    with _lock:
+        stat = _stat(path)
+        if not _is_fresh(stat):
+            # Without a usable snapshot, wait for whoever is building one
+            build_snapshot(path, blocking=_current is None or stat is None)
+            stat = _stat(path)
+        if stat is not None and (_current is None or _current.key != (stat.st_ino, stat.st_mtime_ns)):
+            try:
+                _current = CatalogueSnapshot(path)
+            except FileNotFoundError:
+                # Removed again by an invalidation in another process
+                if _current is None:
+                    build_snapshot(path)
+                    _current = CatalogueSnapshot(path)
+        _checked_at = time.monotonic()
+        return _current
+
+
+def invalidate():
+    """
+    Removes the snapshot so the next lookup in any worker rebuilds it.
+    """
+    global _current
+    try:
+        os.unlink(settings.CATALOGUE_SNAPSHOT_PATH)
+    except FileNotFoundError:
+        pass
+    _current = None
@@ -0,0 +1,94 @@
+"""
+Buffered per-image difficulty statistics.
+
+Gameplay views count shows, correct answers, skips and hint requests in
+in-process counters. The counters are flushed to ImageStats in one batched
+UPSERT every STATS_FLUSH_INTERVAL seconds (or once STATS_MAX_PENDING images
+have pending counts), so collecting them costs next to nothing per request.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from .models import FilmImage, ImageStats
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ('shown', 'correct', 'skipped', 'hinted')
+
+_lock = threading.Lock()
+_pending = defaultdict(Counter)
+_last_flush = time.monotonic()
+
+
+def record(image_id, counter):
+    """
+    Counts one event for an image, flushing the buffer when it is due.
+    """
+    with _lock:
+        _pending[image_id][counter] += 1
+        due = (
+            time.monotonic() - _last_flush >= getattr(settings, 'STATS_FLUSH_INTERVAL', 30)
+            or len(_pending) >= getattr(settings, 'STATS_MAX_PENDING', 500)
+        )
+    if due:
+        # Runs on the request that finds the buffer due: one statement at most
+        # every STATS_FLUSH_INTERVAL seconds per process, an accepted cost
+        # rather than a flusher thread with its own database connection
+        flush()
+
+
+def flush():
+    """
+    Writes all pending counters in a single INSERT ... ON CONFLICT statement.
+    Returns the number of images written.
+    """
+    global _pending, _last_flush
+    with _lock:
+        pending, _pending = _pending, defaultdict(Counter)
+        _last_flush = time.monotonic()
+    if not pending:
+        return 0
+
+    stats_table = ImageStats._meta.db_table
+    image_table = FilmImage._meta.db_table
+    columns = ', '.join(COUNTERS)
+    updates = ', '.join(f'{name} = {stats_table}.{name} + EXCLUDED.{name}' for name in COUNTERS)
+    values = ', '.join(['(%s, %s, %s, %s, %s)'] * len(pending))
+    params = []
+    for image_id, counts in pending.items():
+        params.extend([image_id] + [counts[name] for name in COUNTERS])
+
+    # The join drops counts for images deleted since they were recorded
+    sql = (
+        f'INSERT INTO {stats_table} (image_id, {columns}, updated_at) '
+        f'SELECT v.image_id, v.shown, v.correct, v.skipped, v.hinted, now() '
+        f'FROM (VALUES {values}) AS v (image_id, {columns}) '
+        f'JOIN {image_table} ON {image_table}.id = v.image_id '
+        f'ON CONFLICT (image_id) DO UPDATE SET {updates}, updated_at = EXCLUDED.updated_at'
+    )
+    try:
+        # A savepoint inside an outer transaction, so a failure here doesn't
+        # leave it aborted for the rest of the request
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, params)
+    except DatabaseError:
+        # Statistics are best effort, never fail a request over them
+        logger.exception("Failed to flush statistics for %s image(s)", len(pending))
+        return 0
+    return len(pending)
+
+
+def flush_at_exit():
+    """
+    Flushes what is still buffered when the process exits. Registered by the
+    WSGI and ASGI entry points only: a test run or management command would
+    otherwise flush into the configured database after its own has gone.
+    """
+    atexit.register(flush)
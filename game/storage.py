@@ -0,0 +1,76 @@
+"""
+Static files storage with hashed names and precompressed variants.
+
+collectstatic writes every file under a content-hashed name with a manifest
+(as ManifestStaticFilesStorage does) and then a .gz, and a .br when the
+optional brotli package is installed, next to each compressible file. A front
+end server can send those directly (nginx gzip_static/brotli_static), and
+serve_static in game.views picks the best one from Accept-Encoding when
+Django serves static files itself.
+"""
+
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.json', '.txt', '.xml', '.webmanifest', '.ico', '.map'}
+
+# Preferred first
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def compress_gzip(content):
+    # mtime=0 so the output only depends on the content
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def compress_brotli(content):
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(content)
+
+
+COMPRESSORS = {'gzip': compress_gzip, 'br': compress_brotli}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        for name in self.hashed_files.values():
+            if os.path.splitext(name)[1] not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            path = self.path(name)
+            with open(path, 'rb') as file:
+                content = file.read()
+            for encoding, suffix in ENCODINGS:
+                compressed = COMPRESSORS[encoding](content)
+                # Only keep variants that are actually smaller
+                if compressed is not None and len(compressed) < len(content):
+                    with open(path + suffix, 'wb') as file:
+                        file.write(compressed)
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Not collected yet (development, tests), use the plain name
+            return name
+
+    def is_hashed(self, name):
+        """
+        Returns True if name is the hashed name of a collected file, whose
+        content therefore never changes.
+        """
+        return name in self._hashed_names()
+
+    def _hashed_names(self):
+        if getattr(self, '_hashed_name_set', None) is None:
+            self._hashed_name_set = set(self.hashed_files.values())
+        return self._hashed_name_set
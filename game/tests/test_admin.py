@@ -0,0 +1,234 @@
+import io
+import os
+import tempfile
+from datetime import timedelta
+from PIL import Image
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from game import catalogue
+from game.admin import EstimatedCountPaginator
+from game.imaging import dhash, thumbnail_name, zoom_crops
+from game.models import FilmImage, GameSession, ImageJob
+from game.tests.utils import get_temporary_image
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir(), ADMIN_THUMBNAIL_WIDTH=40, AXES_ENABLED=False)
+class AdminTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user, backend='django.contrib.auth.backends.ModelBackend')
+        self.image = FilmImage.objects.create(
+            title='Heat',
+            image=get_temporary_image(name='admin_heat.jpg', size=(800, 400)),
+            tier='Easy',
+            frame='first'
+        )
+        for i in range(3):
+            GameSession.objects.create(session_id=f'admin-session-{i}')
+
+    def test_changelist_uses_cached_thumbnails(self):
+        """
+        Test that the changelist links a generated thumbnail instead of the full-size still.
+        """
+        response = self.client.get(reverse('admin:game_filmimage_changelist'))
+        self.assertEqual(response.status_code, 200)
+        name = thumbnail_name(self.image.image.name, 40)
+        self.assertContains(response, name)
+        self.assertNotContains(response, f'src="{self.image.image.url}"')
+
+        path = os.path.join(tempfile.gettempdir(), name)
+        with Image.open(path) as thumb:
+            self.assertEqual(thumb.size, (40, 20))
+        modified = os.path.getmtime(path)
+        self.client.get(reverse('admin:game_filmimage_changelist'))
+        self.assertEqual(os.path.getmtime(path), modified)
+
+    def test_changelist_never_makes_thumbnails(self):
+        """
+        Test that the changelist links the still itself when its thumbnail is
+        missing, and that generate_thumbnails makes it.
+        """
+        name = thumbnail_name(self.image.image.name, 40)
+        default_storage.delete(name)
+        response = self.client.get(reverse('admin:game_filmimage_changelist'))
+        self.assertContains(response, f'src="{self.image.image.url}"')
+        self.assertFalse(default_storage.exists(name))
+
+        call_command('generate_thumbnails', stdout=io.StringIO())
+        self.assertTrue(default_storage.exists(name))
+        response = self.client.get(reverse('admin:game_filmimage_changelist'))
+        self.assertContains(response, name)
+
+    def test_title_search(self):
+        """
+        Test that the changelist search finds titles case-insensitively.
+        """
+        response = self.client.get(reverse('admin:game_filmimage_changelist'), {'q': 'hea'})
+        self.assertContains(response, 'Heat')
+
+    def test_estimated_count_paginator(self):
+        """
+        Test that an unfiltered large table is counted from the planner estimate, and filtered lists exactly.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE game_gamesession')
+
+        class SmallThresholdPaginator(EstimatedCountPaginator):
+            exact_count_below = 1
+
+        with CaptureQueriesContext(connection) as queries:
+            count = SmallThresholdPaginator(GameSession.objects.order_by('id'), 100).count
+        self.assertEqual(count, 3)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries))
+
+        filtered = GameSession.objects.filter(session_id='admin-session-1').order_by('id')
+        self.assertEqual(SmallThresholdPaginator(filtered, 100).count, 1)
+        self.assertEqual(EstimatedCountPaginator(GameSession.objects.order_by('id'), 100).count, 3)
+
+        response = self.client.get(reverse('admin:game_gamesession_changelist'), {'q': 'admin-session-2'})
+        self.assertContains(response, 'admin-session-2')
+        self.assertNotContains(response, 'admin-session-1')
+
+    def test_bulk_tier_action_is_one_update(self):
+        """
+        Test that a bulk tier change is a single UPDATE and refreshes the catalogue.
+        """
+        other = FilmImage.objects.create(
+            title='Ronin', image=get_temporary_image(name='admin_ronin.jpg'), tier='Easy', frame='first'
+        )
+        catalogue.get_catalogue()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('admin:game_filmimage_changelist'), {
+                'action': 'set_tier_hard',
+                ACTION_CHECKBOX_NAME: [self.image.pk, other.pk],
+            })
+        self.assertEqual(response.status_code, 302)
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "game_filmimage"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(set(FilmImage.objects.values_list('tier', flat=True)), {'Hard'})
+        self.assertEqual(catalogue.get_entry(other.pk).tier, 'Hard')
+
+    def test_bulk_hint_action(self):
+        """
+        Test that the hint form is shown first and blank fields keep the current hints.
+        """
+        self.image.hint_2 = 'Old second hint'
+        self.image.save()
+        url = reverse('admin:game_filmimage_changelist')
+        data = {'action': 'edit_hints', ACTION_CHECKBOX_NAME: [self.image.pk]}
+
+        response = self.client.post(url, data)
+        self.assertContains(response, 'Set the hints of 1 selected image(s).')
+
+        response = self.client.post(url, {**data, 'apply': 'Apply', 'hint_1': 'New first hint', 'hint_2': ''})
+        self.assertEqual(response.status_code, 302)
+        self.image.refresh_from_db()
+        self.assertEqual((self.image.hint_1, self.image.hint_2), ('New first hint', 'Old second hint'))
+
+    def test_catalogue_reloads_when_another_worker_invalidates(self):
+        """
+        Test that a worker reloads its catalogue once the stamp file is touched by another process.
+        """
+        stamp = os.path.join(tempfile.mkdtemp(), 'catalogue.stamp')
+        with override_settings(CATALOGUE_STAMP_PATH=stamp):
+            catalogue.get_catalogue()
+            # An update made by another worker sends no signal here
+            FilmImage.objects.filter(pk=self.image.pk).update(hint_1='Edited elsewhere')
+            self.assertIsNone(catalogue.get_entry(self.image.pk).hint_1)
+
+            with open(stamp, 'a'):
+                pass
+            self.assertEqual(catalogue.get_entry(self.image.pk).hint_1, 'Edited elsewhere')
+
+    @override_settings(IMAGE_JOBS_IN_BACKGROUND=False, IMAGE_JOB_WORKERS=1)
+    def test_reencode_action_runs_job(self):
+        """
+        Test that the re-encode action records a job that a process pool runs to completion.
+        """
+        response = self.client.post(reverse('admin:game_filmimage_changelist'), {
+            'action': 'reencode_images',
+            ACTION_CHECKBOX_NAME: [self.image.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        job = ImageJob.objects.get()
+        self.assertEqual((job.status, job.total), (ImageJob.PENDING, 1))
+
+        call_command('run_image_jobs', stdout=io.StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.DONE)
+        self.assertEqual((job.processed, job.failed), (1, 0))
+        self.assertEqual(job.progress, 1.0)
+
+        response = self.client.get(reverse('admin:game_imagejob_changelist'))
+        self.assertContains(response, '1/1 (100%)')
+
+    @override_settings(IMAGE_JOBS_IN_BACKGROUND=False, IMAGE_JOB_WORKERS=0, IMAGE_JOB_STALE_AFTER=60)
+    def test_stale_running_jobs_are_reclaimed(self):
+        """
+        Test that running jobs with no recent progress are re-queued or failed by run_image_jobs.
+        """
+        long_ago = timezone.now() - timedelta(hours=1)
+        reencode = ImageJob.objects.create(
+            kind='reencode', image_ids=[self.image.pk], done_ids=[self.image.pk], total=1, processed=1,
+            status=ImageJob.RUNNING, started_at=long_ago, heartbeat_at=long_ago,
+        )
+        fd, source = tempfile.mkstemp(suffix='.zip')
+        os.close(fd)
+        ingest = ImageJob.objects.create(
+            kind='ingest', source=source, status=ImageJob.RUNNING, started_at=long_ago, heartbeat_at=long_ago
+        )
+        running = ImageJob.objects.create(
+            kind='reencode', image_ids=[self.image.pk], total=1,
+            status=ImageJob.RUNNING, started_at=long_ago, heartbeat_at=timezone.now(),
+        )
+
+        out = io.StringIO()
+        call_command('run_image_jobs', stdout=out)
+        self.assertIn('Reclaimed 2 stale job(s).', out.getvalue())
+        for job in (reencode, ingest, running):
+            job.refresh_from_db()
+        self.assertEqual((reencode.status, reencode.processed), (ImageJob.DONE, 1))
+        self.assertEqual(ingest.status, ImageJob.FAILED)
+        self.assertFalse(os.path.exists(source))
+        self.assertEqual(running.status, ImageJob.RUNNING)
+
+    @override_settings(IMAGE_JOBS_IN_BACKGROUND=False, IMAGE_JOB_WORKERS=0)
+    def test_reencode_job_skips_done_images_and_refreshes_derived_data(self):
+        """
+        Test that a resumed re-encode job leaves done images alone and rehashes and recrops the ones it rewrites.
+        """
+        other = FilmImage.objects.create(
+            title='Ronin', image=get_temporary_image(name='admin_ronin.jpg'), tier='Easy', frame='first'
+        )
+        with open(self.image.image.path, 'rb') as file:
+            done_bytes = file.read()
+        # A still written at full quality, with nothing in common with the old one
+        gradient = Image.linear_gradient('L').transpose(Image.Transpose.ROTATE_90).resize((600, 300)).convert('RGB')
+        gradient.save(other.image.path, 'JPEG', quality=100)
+        old_hash = other.dhash
+
+        job = ImageJob.objects.create(
+            kind='reencode', image_ids=[self.image.pk, other.pk], done_ids=[self.image.pk], total=2, processed=1,
+        )
+        call_command('run_image_jobs', stdout=io.StringIO())
+        job.refresh_from_db()
+        other.refresh_from_db()
+
+        self.assertEqual((job.status, job.processed, job.failed), (ImageJob.DONE, 2, 0))
+        self.assertCountEqual(job.done_ids, [self.image.pk, other.pk])
+        with open(self.image.image.path, 'rb') as file:
+            self.assertEqual(file.read(), done_bytes)
+        self.assertGreater(other.bytes_saved, 0)
+        self.assertEqual(other.dhash, dhash(other.image.path))
+        self.assertNotEqual(other.dhash, old_hash)
+        self.assertEqual(len(other.crop_boxes), len(zoom_crops(other.image.path)))
+        self.assertFalse([name for name in os.listdir(os.path.dirname(other.image.path)) if name.endswith('.tmp')])
+
@@ -0,0 +1,61 @@
+import tempfile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from game import autocomplete
+from game.models import FilmImage
+from game.tests.utils import get_temporary_image
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class TitleAutocompleteTest(TestCase):
+    def setUp(self):
+        for i, title in enumerate(['the_shawshank_redemption', 'the_dark_knight', 'inception']):
+            FilmImage.objects.create(
+                title=title,
+                image=get_temporary_image(name=f'autocomplete_{i}.jpg'),
+                tier='Easy',
+                frame='first'
+            )
+
+    def test_prefix_and_typo_matches(self):
+        """
+        Test that titles are found by prefix, by any word and despite typos.
+        """
+        self.assertEqual(autocomplete.suggest('incep')[0], 'inception')
+        self.assertEqual(autocomplete.suggest('knight')[0], 'the dark knight')
+        self.assertEqual(autocomplete.suggest('shawshenk redemtion')[0], 'the shawshank redemption')
+        self.assertEqual(autocomplete.suggest('i'), [])
+
+    def test_suggestions_include_decoys(self):
+        """
+        Test that decoy titles are suggested alongside catalogue titles.
+        """
+        decoy = autocomplete.load_decoy_titles()[0]
+        self.assertIn(decoy, autocomplete.suggest(decoy))
+
+    def test_index_rebuilt_when_catalogue_changes(self):
+        """
+        Test that the index picks up new titles once the catalogue reloads.
+        """
+        autocomplete.suggest('heat')
+        FilmImage.objects.create(
+            title='heat',
+            image=get_temporary_image(name='autocomplete_heat.jpg'),
+            tier='Easy',
+            frame='first'
+        )
+        self.assertIn('heat', autocomplete.suggest('heat'))
+
+    def test_suggest_titles_view(self):
+        """
+        Test that the endpoint returns cacheable suggestions without querying the database once warm.
+        """
+        url = reverse('suggest_titles')
+        self.client.get(url, {'q': 'incep'})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'q': 'incpetion'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['suggestions'][0], 'inception')
+        self.assertIn('public', response['Cache-Control'])
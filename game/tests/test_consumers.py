@@ -0,0 +1,119 @@
+import json
+import tempfile
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from game.consumers import game_socket
+from game.models import FilmImage, GameSession
+from game.tests.utils import get_temporary_image
+
+
+async def run_socket(cookie, frames, origin='http://testserver'):
+    """
+    Drives game_socket through a connect, the given frames and a disconnect,
+    returning everything it sent. A callable in frames is awaited in between.
+    """
+    headers = [(b'cookie', cookie.encode())]
+    if origin:
+        headers.append((b'origin', origin.encode()))
+    scope = {'type': 'websocket', 'path': '/ws/game/', 'headers': headers}
+
+    incoming = [{'type': 'websocket.connect'}]
+    for frame in frames:
+        incoming.append(frame if callable(frame) else {'type': 'websocket.receive', 'text': json.dumps(frame)})
+    incoming.append({'type': 'websocket.disconnect', 'code': 1000})
+
+    async def receive():
+        event = incoming.pop(0)
+        while callable(event):
+            await event()
+            event = incoming.pop(0)
+        return event
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await game_socket(scope, receive, send)
+    return sent
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir(), EVENT_LOG_DIR=None, ALLOWED_HOSTS=['testserver'])
+class GameSocketTest(TransactionTestCase):
+    # Frames close old connections as requests do, which a TestCase
+    # transaction would not survive
+    def setUp(self):
+        for i, title in enumerate(['Heat', 'Alien', 'Jaws']):
+            FilmImage.objects.create(
+                title=title,
+                image=get_temporary_image(name=f'socket_{i}.jpg'),
+                tier='Easy',
+                frame='first',
+                hint_1=f'{title} hint'
+            )
+        self.client.get(reverse('start_game'), {'mode': 'first'})
+        self.session = GameSession.objects.get(session_id=self.client.session['session_id'])
+        self.cookie = f'{settings.SESSION_COOKIE_NAME}={self.client.cookies[settings.SESSION_COOKIE_NAME].value}'
+
+    async def test_game_over_socket(self):
+        """
+        Test that guesses, hints and skips are answered over one connection.
+        """
+        image = await FilmImage.objects.aget(title='Heat')
+        sent = await run_socket(self.cookie, [
+            {'action': 'hint', 'image_id': image.id},
+            {'action': 'guess', 'image_id': image.id, 'answer': 'Heat'},
+            {'action': 'skip', 'image_id': image.id},
+            {'action': 'dance'},
+        ])
+        self.assertEqual(sent[0], {'type': 'websocket.accept'})
+        replies = [json.loads(message['text']) for message in sent[1:]]
+
+        self.assertEqual(replies[0]['hint'], '"Heat hint"')
+        self.assertTrue(replies[1]['correct'])
+        self.assertEqual(replies[1]['score'], 1)
+        self.assertTrue(replies[2]['skipped'])
+        self.assertEqual(replies[3]['error'], 'Invalid action')
+
+        await self.session.arefresh_from_db()
+        self.assertEqual(self.session.score, 1)
+
+    async def test_rejects_unknown_session(self):
+        """
+        Test that a socket without a game session is closed during the handshake.
+        """
+        sent = await run_socket(f'{settings.SESSION_COOKIE_NAME}=nope', [])
+        self.assertEqual(sent, [{'type': 'websocket.close', 'code': 4004}])
+
+    async def test_rejects_foreign_origin(self):
+        """
+        Test that a cross-site handshake is refused.
+        """
+        sent = await run_socket(self.cookie, [], origin='https://evil.example')
+        self.assertEqual(sent, [{'type': 'websocket.close', 'code': 4003}])
+        sent = await run_socket(self.cookie, [], origin=None)
+        self.assertEqual(sent, [{'type': 'websocket.close', 'code': 4003}])
+
+    async def test_sees_game_ended_over_http(self):
+        """
+        Test that a game ended after the socket connected is treated as over.
+        """
+        image = await FilmImage.objects.aget(title='Heat')
+
+        @sync_to_async
+        def end_game():
+            GameSession.objects.filter(pk=self.session.pk).update(ended_at=timezone.now())
+
+        sent = await run_socket(self.cookie, [
+            {'action': 'skip', 'image_id': image.id},
+            end_game,
+            {'action': 'guess', 'image_id': image.id, 'answer': 'Heat'},
+        ])
+        replies = [json.loads(message['text']) for message in sent[1:]]
+        self.assertTrue(replies[0]['skipped'])
+        self.assertTrue(replies[1]['end_game'])
+        self.assertEqual(replies[1]['error'], 'Time is up.')
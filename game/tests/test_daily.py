@@ -0,0 +1,113 @@
+import datetime
+import tempfile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from game import catalogue, daily
+from game.models import DailyDeck, FilmImage, GameSession
+from game.tests.utils import get_temporary_image
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir(), EVENT_LOG_DIR=None, DAILY_DECK_SIZE=30)
+class DailyChallengeTest(TestCase):
+    def setUp(self):
+        daily._decks.clear()
+        for tier in ['Easy', 'Medium', 'Hard']:
+            for i in range(4):
+                FilmImage.objects.create(
+                    title=f'{tier} Film {i}',
+                    image=get_temporary_image(name=f'{tier.lower()}_{i}.jpg'),
+                    tier=tier,
+                    frame='first'
+                )
+
+    def test_build_deck_is_deterministic(self):
+        """
+        Test that the same date always gives the same deck, following the tier progression.
+        """
+        date = datetime.date(2026, 1, 1)
+        deck = daily.build_deck(date)
+        self.assertEqual(deck, daily.build_deck(date))
+        self.assertEqual(len(deck), len(set(deck)))
+
+        tiers = [FilmImage.objects.get(id=image_id).tier for image_id in deck]
+        self.assertEqual(set(tiers[:4]), {'Easy'})
+
+    def test_get_deck_is_stored_once(self):
+        """
+        Test that the deck is persisted on first use and then served from the worker cache.
+        """
+        date = datetime.date(2026, 1, 2)
+        deck = daily.get_deck(date)
+        self.assertEqual(list(deck), DailyDeck.objects.get(date=date).image_ids)
+        with self.assertNumQueries(0):
+            self.assertEqual(daily.get_deck(date), deck)
+
+    def test_empty_catalogue_deck_is_not_stored(self):
+        """
+        Test that a deck built before any stills are loaded isn't kept for the day.
+        """
+        date = datetime.date(2026, 1, 3)
+        images = list(FilmImage.objects.all())
+        FilmImage.objects.all().delete()
+        catalogue.invalidate()
+        self.assertEqual(daily.get_deck(date), ())
+        self.assertFalse(DailyDeck.objects.exists())
+
+        for image in images:
+            image.pk = None
+            image.save()
+        catalogue.invalidate()
+        deck = daily.get_deck(date)
+        self.assertTrue(deck)
+        self.assertEqual(list(deck), DailyDeck.objects.get(date=date).image_ids)
+
+    def test_older_deck_keeps_todays_cached(self):
+        """
+        Test that asking for an older date's deck doesn't evict today's.
+        """
+        today = timezone.localdate()
+        deck = daily.get_deck(today)
+        daily.get_deck(today - datetime.timedelta(days=3))
+        with self.assertNumQueries(0):
+            self.assertEqual(daily.get_deck(today), deck)
+
+    def test_daily_game_walks_shared_deck(self):
+        """
+        Test that a daily game needs no images_remaining rows and serves the deck in order.
+        """
+        response = self.client.get(reverse('start_game'), {'mode': 'daily'})
+        self.assertRedirects(response, reverse('play_game'), fetch_redirect_response=False)
+        session = GameSession.objects.get(session_id=self.client.session['session_id'])
+        self.assertEqual(session.frame_mode, 'daily')
+        self.assertEqual(session.images_remaining.count(), 0)
+
+        deck = daily.get_deck(timezone.localdate())
+        response = self.client.get(reverse('play_game'))
+        self.assertEqual(response.context['image'].id, deck[0])
+
+        image = FilmImage.objects.get(id=deck[0])
+        response = self.client.post(reverse('check_answer'), {'image_id': image.id, 'answer': image.title})
+        data = response.json()
+        self.assertTrue(data['correct'])
+        self.assertEqual(data['image_id'], deck[1])
+
+        session.refresh_from_db()
+        self.assertEqual(session.score, 1)
+        self.assertEqual(session.deck_position, 2)
+
+    def test_repeated_daily_answer_scores_once(self):
+        """
+        Test that answering a daily still again neither scores nor advances the deck again.
+        """
+        self.client.get(reverse('start_game'), {'mode': 'daily'})
+        self.client.get(reverse('play_game'))
+        deck = daily.get_deck(timezone.localdate())
+        image = FilmImage.objects.get(id=deck[0])
+
+        for _ in range(2):
+            self.client.post(reverse('check_answer'), {'image_id': image.id, 'answer': image.title})
+        session = GameSession.objects.get(session_id=self.client.session['session_id'])
+        self.assertEqual((session.score, session.deck_position), (1, 2))
+
@@ -0,0 +1,141 @@
+import io
+import os
+import random
+import tempfile
+import numpy as np
+from PIL import Image, ImageDraw
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from game.duplicates import HashIndex, popcount
+from game.imaging import dhash
+from game.models import FilmImage
+from game.tests.utils import get_temporary_image
+
+
+def get_still(seed, size=(320, 160)):
+    """
+    Generates a still of random shapes, the same for the same seed.
+    """
+    rng = random.Random(seed)
+    image = Image.new('RGB', size, color=(rng.randrange(256), 0, 0))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        colour = tuple(rng.randrange(256) for _ in range(3))
+        draw.ellipse((x, y, x + rng.randrange(20, 120), y + rng.randrange(20, 80)), fill=colour)
+    return image
+
+
+def distance(first, second):
+    return bin((first ^ second) & (2 ** 64 - 1)).count('1')
+
+
+class HashTest(TestCase):
+    def hash_of(self, image, quality=90):
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as file:
+            image.save(file, 'JPEG', quality=quality)
+            file.flush()
+            return dhash(file.name)
+
+    def test_copies_hash_close(self):
+        """
+        Test that a resized, re-encoded copy hashes close to the original and another still doesn't.
+        """
+        original = self.hash_of(get_still(1))
+        copy = self.hash_of(get_still(1).resize((200, 100)), quality=40)
+        other = self.hash_of(get_still(2))
+        self.assertLessEqual(distance(original, copy), 4)
+        self.assertGreater(distance(original, other), 10)
+        self.assertTrue(-2 ** 63 <= original < 2 ** 63)
+
+    def test_popcount(self):
+        """
+        Test that popcount counts the bits of full 64-bit values.
+        """
+        values = np.array([0, 1, 2 ** 64 - 1, 0x8000000000000001], dtype=np.uint64)
+        self.assertEqual(popcount(values).tolist(), [0, 1, 64, 2])
+
+
+class HashIndexTest(TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        # Few distinct bits, so many hashes are close and share buckets
+        self.hashes = [rng.getrandbits(10) << rng.choice([0, 30, 53]) for _ in range(300)]
+        self.hashes[-1] = -1
+        self.hashes[-2] = -2
+        self.index = HashIndex(range(300), self.hashes)
+
+    def test_pairs_match_pairwise_comparison(self):
+        """
+        Test that the bucketed pair search finds exactly what comparing every pair finds.
+        """
+        for max_distance in (0, 3, 6, 64):
+            expected = sorted(
+                (a, b, distance(self.hashes[a], self.hashes[b]))
+                for a in range(300) for b in range(a + 1, 300)
+                if distance(self.hashes[a], self.hashes[b]) <= max_distance
+            )
+            pairs = self.index.pairs(max_distance)
+            self.assertEqual(sorted(pairs), expected)
+            self.assertEqual([pair[2] for pair in pairs], sorted(pair[2] for pair in pairs))
+        self.assertIn((298, 299, 1), self.index.pairs(1))
+
+    def test_nearest(self):
+        """
+        Test that nearest returns the hashes in range of one hash, closest first.
+        """
+        self.index.add(300, -3)
+        self.assertEqual(self.index.nearest(-1, 1), [(299, 0), (298, 1), (300, 1)])
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class DuplicateCommandsTest(TestCase):
+    def setUp(self):
+        self.original = FilmImage.objects.create(
+            title='Ran', image=get_temporary_image('dup_ran.jpg', image=get_still(1), quality=90),
+            tier='Easy', frame='first'
+        )
+        self.other = FilmImage.objects.create(
+            title='Ikiru', image=get_temporary_image('dup_ikiru.jpg', image=get_still(2), quality=90),
+            tier='Easy', frame='first'
+        )
+
+    def test_upload_is_hashed(self):
+        """
+        Test that saving an uploaded still records its hash.
+        """
+        self.original.refresh_from_db()
+        self.assertEqual(self.original.dhash, dhash(self.original.image.path))
+
+    def test_find_duplicates_reports_copies(self):
+        """
+        Test that find_duplicates lists a copy loaded under another title, hashing unhashed stills first.
+        """
+        copy = FilmImage.objects.create(
+            title='Chaos', image=get_temporary_image('dup_chaos.jpg', image=get_still(1), quality=50),
+            tier='Hard', frame='last'
+        )
+        FilmImage.objects.filter(pk=copy.pk).update(dhash=None)
+
+        out = io.StringIO()
+        call_command('find_duplicates', stdout=out)
+        output = out.getvalue()
+        self.assertIn('Hashed 1 image(s).', output)
+        self.assertIn(f'#{self.original.id} Ran', output)
+        self.assertIn(f'#{copy.id} Chaos', output)
+        self.assertNotIn('Ikiru', output)
+        self.assertIn('Found 1 pair(s) within distance 6 among 3 image(s)', output)
+
+    def test_load_images_warns_about_duplicates(self):
+        """
+        Test that load_images warns when a still looks like one already loaded.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            get_still(2).save(os.path.join(directory, 'dup_living.jpg'), 'JPEG', quality=60)
+            csv_path = os.path.join(directory, 'films.csv')
+            with open(csv_path, 'w') as file:
+                file.write('title,image_filename,tier,frame\nTo Live,dup_living.jpg,Easy,first\n')
+            err = io.StringIO()
+            call_command('load_images', csv_path, directory, stdout=io.StringIO(), stderr=err)
+        self.assertIn(f'To Live (dup_living.jpg) looks like image #{self.other.id}', err.getvalue())
@@ -0,0 +1,101 @@
+import io
+import json
+import os
+import tempfile
+import uuid
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from game import eventlog
+
+
+class EventLogTest(SimpleTestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.session_id = str(uuid.uuid4())
+
+    def write_events(self, writer):
+        writer.write(eventlog.encode(eventlog.START, self.session_id))
+        writer.write(eventlog.encode(
+            eventlog.GUESS, self.session_id, image_id=7, score=1, similarity=91.5, elapsed=4.0, answer='heat'
+        ))
+        writer.write(eventlog.encode(eventlog.SKIP, self.session_id, image_id=8, score=1))
+        writer.write(eventlog.encode(eventlog.HINT, None, image_id=8))
+
+    def test_round_trip(self):
+        """
+        Test that written records stream back unchanged, in order.
+        """
+        writer = eventlog.EventLogWriter(self.log_dir)
+        self.write_events(writer)
+        writer.close()
+
+        events = list(eventlog.iter_events(eventlog.list_log_files(self.log_dir)))
+        self.assertEqual(
+            [event.event for event in events], [eventlog.START, eventlog.GUESS, eventlog.SKIP, eventlog.HINT]
+        )
+        guess = events[1]
+        self.assertEqual(guess.session_id, self.session_id)
+        self.assertEqual((guess.image_id, guess.score, guess.answer), (7, 1, 'heat'))
+        self.assertAlmostEqual(guess.similarity, 91.5)
+        self.assertIsNone(events[0].image_id)
+        self.assertIsNone(events[2].similarity)
+
+    def test_rotation_and_truncated_tail(self):
+        """
+        Test that files rotate by size and a partially written record is skipped.
+        """
+        writer = eventlog.EventLogWriter(self.log_dir, max_bytes=1)
+        self.write_events(writer)
+        writer.close()
+        paths = eventlog.list_log_files(self.log_dir)
+        self.assertEqual(len(paths), 4)
+
+        with open(paths[-1], 'ab') as file:
+            file.write(eventlog.encode(eventlog.END, self.session_id)[:10])
+        self.assertEqual(len(list(eventlog.iter_events(paths))), 4)
+
+    def test_forked_writer_drops_inherited_buffer(self):
+        """
+        Test that a forked child opens its own file without writing the
+        records its parent had buffered but not yet flushed.
+        """
+        writer = eventlog.EventLogWriter(self.log_dir, fsync_every=1000, fsync_interval=3600)
+        writer.write(eventlog.encode(eventlog.START, self.session_id))
+        pid = os.fork()
+        if pid == 0:
+            try:
+                writer.write(eventlog.encode(eventlog.END, self.session_id))
+                writer.close()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        writer.close()
+
+        events = list(eventlog.iter_events(eventlog.list_log_files(self.log_dir)))
+        self.assertEqual(sorted(event.event for event in events), [eventlog.START, eventlog.END])
+
+    def test_compact_event_log(self):
+        """
+        Test that compact_event_log writes a columnar per-image summary.
+        """
+        writer = eventlog.EventLogWriter(self.log_dir)
+        self.write_events(writer)
+        writer.close()
+
+        output = os.path.join(self.log_dir, 'summary.json')
+        call_command('compact_event_log', dir=self.log_dir, output=output, min_age=0, stdout=io.StringIO())
+        with open(output) as file:
+            summary = json.load(file)
+        self.assertEqual(summary['columns']['image_id'], [7, 8])
+        self.assertEqual(summary['columns']['correct'], [1, 0])
+        self.assertEqual(summary['columns']['hints'], [0, 1])
+        self.assertEqual(summary['events']['guess'], 1)
+
+    @override_settings(EVENT_LOG_DIR=None)
+    def test_compact_event_log_needs_a_directory(self):
+        """
+        Test that compact_event_log reports a missing log directory as a command error.
+        """
+        with self.assertRaisesMessage(CommandError, 'No event log directory'):
+            call_command('compact_event_log', stdout=io.StringIO())
@@ -0,0 +1,79 @@
+import io
+import os
+import tempfile
+import time
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from game.imaging import thumbnail, thumbnail_name
+from game.models import FilmImage
+from game.zoom import crop_name
+from game.tests.utils import get_temporary_image
+
+
+class MediaGarbageCollectorTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.kept = FilmImage.objects.create(
+            title='kept', image=get_temporary_image(name='kept.jpg'), tier='Easy', frame='first'
+        )
+        orphan_dir = os.path.join(self.media_root, 'film_images', 'old')
+        os.makedirs(orphan_dir)
+        self.orphan = os.path.join(orphan_dir, 'orphan.jpg')
+        self.recent = os.path.join(self.media_root, 'film_images', 'recent.jpg')
+        for path in (self.orphan, self.recent):
+            with open(path, 'wb') as file:
+                file.write(b'x' * 10)
+        two_days_ago = time.time() - 48 * 60 * 60
+        os.utime(self.orphan, (two_days_ago, two_days_ago))
+        os.utime(self.kept.image.path, (two_days_ago, two_days_ago))
+
+    def test_dry_run_only_reports(self):
+        """
+        Test that a dry run lists old unreferenced files without deleting anything.
+        """
+        stdout = io.StringIO()
+        call_command('gc_media', dry_run=True, stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn('film_images/old/orphan.jpg', output)
+        self.assertNotIn('recent.jpg', output)
+        self.assertIn('Would reclaim 10 bytes from 1', output)
+        self.assertTrue(os.path.exists(self.orphan))
+
+    def test_deletes_unreferenced_files_past_grace(self):
+        """
+        Test that only unreferenced files older than the grace period are deleted.
+        """
+        stdout = io.StringIO()
+        call_command('gc_media', stdout=stdout)
+        self.assertFalse(os.path.exists(self.orphan))
+        self.assertTrue(os.path.exists(self.recent))
+        self.assertTrue(os.path.exists(self.kept.image.path))
+        self.assertIn('Reclaimed 10 bytes from 1', stdout.getvalue())
+
+        call_command('gc_media', grace=0, stdout=io.StringIO())
+        self.assertFalse(os.path.exists(self.recent))
+        self.assertTrue(os.path.exists(self.kept.image.path))
+
+    def test_keeps_derived_files(self):
+        """
+        Test that collecting the whole storage keeps the crops and thumbnails of live stills.
+        """
+        thumbnail(self.kept.image.name)
+        self.kept.refresh_from_db()
+        derived = [crop_name(self.kept.image.name, level) for level in range(len(self.kept.crop_boxes))]
+        derived.append(thumbnail_name(self.kept.image.name, 200))
+        stale_crop = os.path.join(self.media_root, crop_name('film_images/deleted.jpg', 0))
+        with open(stale_crop, 'wb') as file:
+            file.write(b'x' * 10)
+
+        call_command('gc_media', prefix='', grace=0, stdout=io.StringIO())
+        self.assertTrue(derived[0].startswith('crops/'))
+        for name in derived:
+            self.assertTrue(os.path.exists(os.path.join(self.media_root, name)), name)
+        self.assertFalse(os.path.exists(stale_crop))
+
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.test import SimpleTestCase
+
+# Heavy dependencies that must only be imported on first use
+LAZY_MODULES = {'PIL', 'rapidfuzz', 'numpy'}
+
+# Cumulative import time allowed for django.setup() plus the game views, in ms
+IMPORT_TIME_BUDGET_MS = int(os.environ.get('IMPORT_TIME_BUDGET_MS', 1500))
+
+
+def measure_imports(code):
+    """
+    Runs code under python -X importtime and returns ({module: cumulative us}, total us).
+    """
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, env=env, cwd=settings.BASE_DIR, check=True,
+    )
+    modules = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+        # Top-level imports have a single space before the name
+        if not name.startswith('  '):
+            total += int(cumulative)
+    return modules, total
+
+
+class ImportTimeTest(SimpleTestCase):
+    def test_setup_does_not_import_heavy_dependencies(self):
+        """
+        Test that django.setup() and importing the views leave PIL, rapidfuzz and numpy unimported.
+        """
+        modules, _ = measure_imports('import django; django.setup(); import game.views, game.admin')
+        imported = {name.split('.')[0] for name in modules}
+        self.assertEqual(imported & LAZY_MODULES, set())
+
+    def test_setup_import_time_budget(self):
+        """
+        Test that django.setup() and importing the views stays within the import time budget.
+        """
+        _, total = measure_imports('import django; django.setup(); import game.views, game.admin')
+        self.assertLess(
+            total / 1000, IMPORT_TIME_BUDGET_MS,
+            f'Imports took {total / 1000:.0f} ms, over the {IMPORT_TIME_BUDGET_MS} ms budget',
+        )
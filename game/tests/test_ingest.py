@@ -0,0 +1,172 @@
+import io
+import os
+import tempfile
+import zipfile
+from PIL import Image
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from game.models import FilmImage, ImageJob
+from game.tests.utils import get_temporary_image_bytes
+
+
+def get_gradient(transpose, size=(100, 100)):
+    """
+    Generates a still shading from black to white, turned by transpose so
+    that differently turned stills don't look alike.
+    """
+    return Image.linear_gradient('L').transpose(transpose).resize(size).convert('RGB')
+
+
+def get_temporary_archive():
+    """
+    Builds a zip archive with a CSV of two good rows, one row with an invalid tier
+    and one naming an image that isn't in the archive.
+    """
+    rows = [
+        'title,image_filename,tier,frame,hint_1,hint_2',
+        'Alien,ingest_alien.jpg,Easy,first,Space,Ripley',
+        'Brazil,ingest_brazil.png,Hard,last,,',
+        'Casablanca,ingest_casablanca.jpg,Impossible,first,,',
+        'Dune,ingest_dune.jpg,Easy,first,,',
+    ]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('films.csv', '\n'.join(rows))
+        archive.writestr(
+            'images/ingest_alien.jpg', get_temporary_image_bytes(image=get_gradient(Image.ROTATE_90, (1600, 800)))
+        )
+        archive.writestr(
+            'images/ingest_brazil.png', get_temporary_image_bytes('PNG', image=get_gradient(Image.ROTATE_270))
+        )
+        archive.writestr('images/ingest_casablanca.jpg', get_temporary_image_bytes())
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class LoadZipTest(TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.zip')
+        with os.fdopen(fd, 'wb') as file:
+            file.write(get_temporary_archive())
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def assertLoaded(self):
+        self.assertEqual(
+            sorted(FilmImage.objects.values_list('title', 'tier', 'frame', 'hint_1')),
+            [('Alien', 'Easy', 'first', 'Space'), ('Brazil', 'Hard', 'last', None)],
+        )
+        alien = FilmImage.objects.get(title='Alien')
+        with Image.open(alien.image.path) as img:
+            self.assertEqual(img.size, (800, 400))
+
+    def test_load_zip_inline(self):
+        """
+        Test that load_zip creates the valid rows and reports the others.
+        """
+        out, err = io.StringIO(), io.StringIO()
+        call_command('load_zip', self.path, workers=0, stdout=out, stderr=err)
+        self.assertLoaded()
+        self.assertIn('Loaded 2 image(s), 2 row(s) with errors.', out.getvalue())
+        self.assertIn('Row 4: invalid tier "Impossible"', err.getvalue())
+        self.assertIn('Row 5: image "ingest_dune.jpg" is not in the archive', err.getvalue())
+
+    def test_load_zip_with_workers(self):
+        """
+        Test that load_zip gives the same result when images are processed in a pool.
+        """
+        call_command('load_zip', self.path, workers=1, stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertLoaded()
+
+    def test_load_zip_reports_clashes_and_lookalikes(self):
+        """
+        Test that an image name found in two folders is a row error, and that a
+        still that looks like one already loaded is loaded with a warning.
+        """
+        rows = [
+            'title,image_filename,tier,frame,hint_1,hint_2',
+            'Alien,ingest_alien.jpg,Easy,first,,',
+            'Aliens,ingest_aliens.jpg,Easy,first,,',
+            'Brazil,ingest_brazil.jpg,Hard,first,,',
+        ]
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('films.csv', '\n'.join(rows))
+            archive.writestr('ingest_alien.jpg', get_temporary_image_bytes(image=get_gradient(Image.ROTATE_90)))
+            archive.writestr(
+                'ingest_aliens.jpg', get_temporary_image_bytes(image=get_gradient(Image.ROTATE_90), quality=40)
+            )
+            archive.writestr('first/ingest_brazil.jpg', get_temporary_image_bytes())
+            archive.writestr('second/ingest_brazil.jpg', get_temporary_image_bytes())
+        with open(self.path, 'wb') as file:
+            file.write(buffer.getvalue())
+
+        out, err = io.StringIO(), io.StringIO()
+        call_command('load_zip', self.path, workers=0, stdout=out, stderr=err)
+        alien = FilmImage.objects.get(title='Alien')
+        self.assertEqual(sorted(FilmImage.objects.values_list('title', flat=True)), ['Alien', 'Aliens'])
+        self.assertIn('Loaded 2 image(s), 1 row(s) with errors.', out.getvalue())
+        self.assertIn(f'Row 3: Aliens (ingest_aliens.jpg) looks like image #{alien.pk}', err.getvalue())
+        self.assertIn('Row 4: image "ingest_brazil.jpg" is in more than one folder (first, second)', err.getvalue())
+
+    def test_load_zip_rejects_other_files(self):
+        """
+        Test that a file that isn't a zip archive is reported as a command error.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.zip') as file:
+            file.write(b'not a zip')
+            file.flush()
+            with self.assertRaisesMessage(CommandError, 'Not a zip archive'):
+                call_command('load_zip', file.name, workers=0)
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.gettempdir(), AXES_ENABLED=False, IMAGE_JOBS_IN_BACKGROUND=False, IMAGE_JOB_WORKERS=0
+)
+class UploadZipAdminTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user, backend='django.contrib.auth.backends.ModelBackend')
+
+    def test_changelist_links_upload(self):
+        """
+        Test that the image changelist links the zip upload page.
+        """
+        response = self.client.get(reverse('admin:game_filmimage_changelist'))
+        self.assertContains(response, reverse('admin:game_filmimage_upload_zip'))
+
+    def test_upload_zip_records_job(self):
+        """
+        Test that an uploaded archive is loaded by an ingest job with per-row errors.
+        """
+        upload = SimpleUploadedFile('films.zip', get_temporary_archive(), content_type='application/zip')
+        response = self.client.post(reverse('admin:game_filmimage_upload_zip'), {'archive': upload})
+        job = ImageJob.objects.get()
+        self.assertRedirects(response, reverse('admin:game_imagejob_change', args=[job.pk]))
+        self.assertEqual((job.kind, job.status), ('ingest', ImageJob.PENDING))
+        self.assertTrue(os.path.exists(job.source))
+
+        call_command('run_image_jobs', stdout=io.StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.DONE)
+        self.assertEqual((job.total, job.processed, job.failed), (4, 4, 2))
+        self.assertEqual(job.error.splitlines(), [
+            'Row 4: invalid tier "Impossible"',
+            'Row 5: image "ingest_dune.jpg" is not in the archive',
+        ])
+        self.assertEqual(FilmImage.objects.count(), 2)
+        self.assertFalse(os.path.exists(job.source))
+
+    def test_upload_rejects_other_files(self):
+        """
+        Test that the upload form only accepts zip archives.
+        """
+        upload = SimpleUploadedFile('films.csv', b'title', content_type='text/csv')
+        response = self.client.post(reverse('admin:game_filmimage_upload_zip'), {'archive': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ImageJob.objects.exists())
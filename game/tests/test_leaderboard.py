@@ -0,0 +1,77 @@
+import datetime
+import uuid
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from game import leaderboard
+from game.models import GameSession, LeaderboardEntry
+
+
+@override_settings(LEADERBOARD_SIZE=3)
+class LeaderboardTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = datetime.date(2026, 10, 21)  # A Wednesday
+
+    def finish_game(self, score, frame_mode='first'):
+        session = GameSession.objects.create(
+            session_id=str(uuid.uuid4()),
+            score=score,
+            frame_mode=frame_mode
+        )
+        leaderboard.record_score(session, today=self.today)
+        return session
+
+    def test_board_is_bounded_to_top_k(self):
+        """
+        Test that each board keeps only the best LEADERBOARD_SIZE scores.
+        """
+        for score in [5, 12, 3, 9, 20]:
+            self.finish_game(score)
+
+        scores = [score for _, score, _ in leaderboard.get_leaderboard('first', 'day', today=self.today)]
+        self.assertEqual(scores, [20, 12, 9])
+        self.assertEqual(LeaderboardEntry.objects.filter(period='all').count(), 3)
+
+    def test_non_qualifying_score_skips_database(self):
+        """
+        Test that a score below a full board is rejected from the cache without queries.
+        """
+        for score in [10, 11, 12]:
+            self.finish_game(score)
+        for period in leaderboard.PERIODS:
+            leaderboard.get_leaderboard('first', period, today=self.today)
+
+        session = GameSession.objects.create(session_id='low-score', score=2)
+        with self.assertNumQueries(0):
+            leaderboard.record_score(session, today=self.today)
+
+    def test_recording_is_idempotent_and_per_mode(self):
+        """
+        Test that the same session is recorded once and boards are split by frame mode.
+        """
+        session = self.finish_game(7)
+        leaderboard.record_score(session, today=self.today)
+        self.finish_game(4, frame_mode='last')
+
+        self.assertEqual(len(leaderboard.get_leaderboard('first', 'week', today=self.today)), 1)
+        self.assertEqual(len(leaderboard.get_leaderboard('last', 'week', today=self.today)), 1)
+
+    def test_period_start(self):
+        """
+        Test that weekly boards start on Monday and all-time boards share one start.
+        """
+        self.assertEqual(leaderboard.get_period_start('day', self.today), self.today)
+        self.assertEqual(leaderboard.get_period_start('week', self.today), datetime.date(2026, 10, 19))
+        self.assertEqual(leaderboard.get_period_start('all', self.today), leaderboard.ALL_TIME_START)
+
+    def test_leaderboard_view(self):
+        """
+        Test that the leaderboard view renders the requested board.
+        """
+        response = self.client.get(reverse('leaderboard'), {'mode': 'last', 'period': 'all'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'game/leaderboard.html')
+        self.assertEqual(response.context['frame_mode'], 'last')
+        self.assertEqual(response.context['period'], 'all')
@@ -0,0 +1,64 @@
+import logging
+import os
+import tempfile
+from django.test import SimpleTestCase
+
+from blockflusters.log_handlers import QueuedRotatingFileHandler
+
+
+class QueuedRotatingFileHandlerTest(SimpleTestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.log_dir, 'test.log')
+
+    def make_record(self, msg, *args):
+        return logging.LogRecord('game', logging.WARNING, __file__, 1, msg, args, None)
+
+    def test_records_are_written_by_listener(self):
+        """
+        Test that records are formatted lazily and written to the file by the listener thread.
+        """
+        handler = QueuedRotatingFileHandler(self.log_path)
+        handler.setFormatter(logging.Formatter('[%(levelname)s] %(message)s'))
+        handler.emit(self.make_record("Ending game for session %s with score %s", 'abc', 7))
+        handler.close()
+
+        with open(self.log_path) as file:
+            self.assertEqual(file.read(), '[WARNING] Ending game for session abc with score 7\n')
+
+    def test_full_queue_drops_and_counts(self):
+        """
+        Test that records are dropped, not blocked on, when the queue is full.
+        """
+        handler = QueuedRotatingFileHandler(self.log_path, queue_size=1)
+        # Stop the listener so nothing drains the queue
+        handler.listener.stop()
+        for i in range(3):
+            handler.emit(self.make_record("Record %s", i))
+        self.assertEqual(handler.dropped, 2)
+        handler.listener = None
+        handler.close()
+
+    def test_listener_restarts_after_fork(self):
+        """
+        Test that records logged in a forked child, like a preloaded gunicorn worker, reach the file.
+        """
+        handler = QueuedRotatingFileHandler(self.log_path)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        handler.emit(self.make_record("Parent"))
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                for i in range(20):
+                    handler.emit(self.make_record("Child %s", i))
+                handler.close()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        handler.close()
+
+        with open(self.log_path) as file:
+            lines = file.read().splitlines()
+        self.assertIn('Child 19', lines)
+        self.assertIn('Parent', lines)
@@ -0,0 +1,95 @@
+import os
+import tempfile
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from game import mediacache
+from game.views import serve_media
+
+
+class MediaCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+
+    def write_file(self, name, content):
+        path = os.path.join(self.media_root, name)
+        with open(path, 'wb') as file:
+            file.write(content)
+        return path
+
+    def test_hits_and_size_bounded_eviction(self):
+        """
+        Test that repeated reads are hits and the least recently used files are evicted past the byte limit.
+        """
+        cache = mediacache.MediaCache(max_bytes=25, max_file_bytes=20)
+        first = self.write_file('first.jpg', b'a' * 10)
+        second = self.write_file('second.jpg', b'b' * 10)
+        third = self.write_file('third.jpg', b'c' * 10)
+        large = self.write_file('large.jpg', b'd' * 30)
+
+        self.assertEqual(cache.get(first).content, b'a' * 10)
+        self.assertEqual(cache.get(first).content_type, 'image/jpeg')
+        cache.get(second)
+        cache.get(first)
+        cache.get(third)
+        self.assertIsNone(cache.get(large))
+
+        self.assertEqual(cache.stats(), {'entries': 2, 'bytes': 20, 'hits': 2, 'misses': 3, 'evictions': 1})
+        cache.get(first)
+        self.assertEqual(cache.hits, 3)
+
+    def test_changed_file_is_reread(self):
+        """
+        Test that a file replaced on disk is not served stale.
+        """
+        cache = mediacache.MediaCache()
+        path = self.write_file('still.jpg', b'old')
+        old_etag = cache.get(path).etag
+        self.write_file('still.jpg', b'newer')
+        os.utime(path, ns=(0, 0))
+
+        cached = cache.get(path)
+        self.assertEqual(cached.content, b'newer')
+        self.assertNotEqual(cached.etag, old_etag)
+
+    def test_serve_media_view(self):
+        """
+        Test that media is served with an ETag and answered with 304 when it matches.
+        """
+        self.write_file('served.jpg', b'image bytes')
+        factory = RequestFactory()
+        with override_settings(MEDIA_ROOT=self.media_root):
+            response = serve_media(factory.get('/media/served.jpg'), 'served.jpg')
+            self.assertEqual(response.content, b'image bytes')
+            self.assertIn('public', response['Cache-Control'])
+
+            response = serve_media(
+                factory.get('/media/served.jpg', HTTP_IF_NONE_MATCH=response['ETag']), 'served.jpg'
+            )
+            self.assertEqual(response.status_code, 304)
+
+            with self.assertRaises(Http404):
+                serve_media(factory.get('/media/missing.jpg'), 'missing.jpg')
+
+    def test_serve_media_rejects_traversal(self):
+        """
+        Test that a path escaping MEDIA_ROOT is a 404 rather than a server error.
+        """
+        factory = RequestFactory()
+        with override_settings(MEDIA_ROOT=self.media_root):
+            with self.assertRaises(Http404):
+                serve_media(factory.get('/media/../etc/passwd'), '../etc/passwd')
+
+    def test_serve_media_streams_large_files(self):
+        """
+        Test that a file over the per-file cache limit is streamed and not cached.
+        """
+        cache = mediacache.get_cache()
+        content = b'x' * (cache.max_file_bytes + 1)
+        path = self.write_file('large.jpg', content)
+        with override_settings(MEDIA_ROOT=self.media_root):
+            response = serve_media(RequestFactory().get('/media/large.jpg'), 'large.jpg')
+            self.assertTrue(response.streaming)
+            self.assertEqual(b''.join(response.streaming_content), content)
+            self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertNotIn(path, cache._entries)
@@ -1,23 +1,14 @@
 import io
 import os
 import tempfile
+from datetime import timedelta
 from PIL import Image
 from django.test import TestCase, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.exceptions import ValidationError
 from django.db.utils import IntegrityError
 from game.models import FilmImage, GameSession
-
-
-def get_temporary_image(name='test.jpg', ext='JPEG', size=(100, 100), color=(255, 0, 0)):
-    """
-    Generates a temporary image for testing purposes.
-    """
-    file = io.BytesIO()
-    image = Image.new('RGB', size=size, color=color)
-    image.save(file, ext)
-    file.seek(0)
-    return SimpleUploadedFile(name, file.read(), content_type='image/jpeg')
+from game.tests.utils import get_temporary_image
 
 
 @override_settings(MEDIA_ROOT=tempfile.gettempdir())
@@ -105,6 +96,52 @@ class FilmImageModelTest(TestCase):
         self.assertIsNone(film_image.hint_1)
         self.assertIsNone(film_image.hint_2)
 
+    def test_upload_is_resized_and_reencoded(self):
+        """
+        Test that an uploaded image is resized, stripped of metadata and re-encoded smaller, once.
+        """
+        file = io.BytesIO()
+        image = Image.effect_noise((1600, 800), 40).convert('RGB')
+        image.save(file, 'JPEG', quality=100, exif=b'Exif\x00\x00' + bytes(32))
+        upload = SimpleUploadedFile('large.jpg', file.getvalue(), content_type='image/jpeg')
+
+        film_image = FilmImage.objects.create(title='Heat', image=upload, tier='Easy', frame='first')
+        with Image.open(film_image.image.path) as stored:
+            self.assertEqual(stored.size, (800, 400))
+            self.assertNotIn('exif', stored.info)
+            self.assertTrue(stored.info.get('progressive'))
+        self.assertGreater(film_image.bytes_saved, 0)
+        self.assertEqual(FilmImage.objects.get(pk=film_image.pk).bytes_saved, film_image.bytes_saved)
+
+        size = os.path.getsize(film_image.image.path)
+        film_image.tier = 'Hard'
+        film_image.save()
+        self.assertEqual(os.path.getsize(film_image.image.path), size)
+
+    def test_upload_keeps_orientation_alpha_and_colour_profile(self):
+        """
+        Test that re-encoding applies the EXIF orientation, keeps a WebP's alpha
+        channel and keeps the colour profile.
+        """
+        file = io.BytesIO()
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotated 90 degrees clockwise
+        Image.new('RGB', (200, 100), color=(255, 0, 0)).save(file, 'JPEG', exif=exif, icc_profile=b'profile')
+        upload = SimpleUploadedFile('rotated.jpg', file.getvalue(), content_type='image/jpeg')
+        film_image = FilmImage.objects.create(title='Heat', image=upload, tier='Easy', frame='first')
+        with Image.open(film_image.image.path) as stored:
+            self.assertEqual(stored.size, (100, 200))
+            self.assertNotIn('exif', stored.info)
+            self.assertEqual(stored.info.get('icc_profile'), b'profile')
+
+        file = io.BytesIO()
+        Image.new('RGBA', (200, 100), color=(255, 0, 0, 128)).save(file, 'WEBP', lossless=True)
+        upload = SimpleUploadedFile('alpha.webp', file.getvalue(), content_type='image/webp')
+        film_image = FilmImage.objects.create(title='Heat', image=upload, tier='Easy', frame='first')
+        with Image.open(film_image.image.path) as stored:
+            self.assertEqual(stored.mode, 'RGBA')
+            self.assertEqual(stored.getpixel((0, 0))[3], 128)
+
 
 @override_settings(MEDIA_ROOT=tempfile.gettempdir())
 class GameSessionModelTest(TestCase):
@@ -199,4 +236,16 @@ class GameSessionModelTest(TestCase):
         self.assertIn(self.image1, session.images_remaining.all())
         self.assertIn(self.image2, session.images_remaining.all())
         self.assertEqual(self.image1.sessions.count(), 1)
-        self.assertEqual(self.image2.sessions.count(), 1)
\ No newline at end of file
+        self.assertEqual(self.image2.sessions.count(), 1)
+
+    def test_seconds_remaining(self):
+        """
+        Test that remaining time is derived from started_at and never goes negative.
+        """
+        session = GameSession.objects.create(session_id='timer_session')
+        self.assertEqual(session.seconds_remaining(now=session.started_at), 90)
+        self.assertEqual(session.seconds_remaining(now=session.started_at + timedelta(seconds=30.5)), 60)
+        self.assertEqual(session.seconds_remaining(now=session.started_at + timedelta(seconds=200)), 0)
+        self.assertFalse(session.has_expired(now=session.started_at + timedelta(seconds=90)))
+        self.assertTrue(session.has_expired(now=session.started_at + timedelta(seconds=91)))
+        self.assertFalse(session.has_expired(grace=3, now=session.started_at + timedelta(seconds=91)))
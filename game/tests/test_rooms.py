@@ -0,0 +1,114 @@
+import asyncio
+import tempfile
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+
+from game import rooms
+from game.models import FilmImage, MatchResult
+from game.tests.utils import get_temporary_image
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class RoomTest(TestCase):
+    def setUp(self):
+        self.images = [
+            FilmImage.objects.create(
+                title=title,
+                image=get_temporary_image(name=f'room_{i}.jpg'),
+                tier='Easy',
+                frame='first'
+            )
+            for i, title in enumerate(['Heat', 'Alien'])
+        ]
+        self.room = rooms.Room('ABC123', deck=[image.id for image in self.images])
+
+    def test_needs_two_players(self):
+        """
+        Test that a match can't start with a single player.
+        """
+        self.room.join('p1', 'Ripley')
+        with self.assertRaises(rooms.RoomError):
+            self.room.start()
+
+    def test_first_correct_answer_scores(self):
+        """
+        Test that the first correct answer scores and moves the room to the next still.
+        """
+        self.room.join('p1', 'Ripley')
+        self.room.join('p2', 'Hicks')
+        events = self.room.start()
+        self.assertEqual(events[0]['image_id'], self.images[0].id)
+
+        self.assertEqual(self.room.guess('p2', 'aliens')[0]['event'], 'missed')
+        events = self.room.guess('p1', 'heat')
+        self.assertEqual([event['event'] for event in events], ['scored', 'round'])
+        self.assertEqual(events[1]['image_id'], self.images[1].id)
+
+        events = self.room.guess('p2', 'alien')
+        self.assertEqual(events[-1]['event'], 'finished')
+        self.assertEqual([player['score'] for player in events[-1]['scores']], [1, 1])
+
+    def test_timeout_only_ends_current_round(self):
+        """
+        Test that a stale timer does not advance a later round.
+        """
+        self.room.join('p1', 'Ripley')
+        self.room.join('p2', 'Hicks')
+        self.room.start()
+        self.room.round_started_at -= self.room.round_seconds
+        self.assertEqual(self.room.timeout(1), [])
+        self.assertEqual([event['event'] for event in self.room.timeout(0)], ['timeout', 'round'])
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class RoomManagerTest(TestCase):
+    def setUp(self):
+        self.image = FilmImage.objects.create(
+            title='Heat',
+            image=get_temporary_image(name='manager.jpg'),
+            tier='Easy',
+            frame='first'
+        )
+
+    async def test_events_fan_out_and_result_saved_once(self):
+        """
+        Test that events reach every subscriber and only the finished match is written.
+        """
+        manager = rooms.RoomManager(rooms.LocalRoomBackend())
+        room = manager.create_room(deck=[self.image.id])
+        queues = [manager.backend.subscribe(room.code) for _ in range(2)]
+
+        await manager.dispatch(room, room.join('p1', 'Ripley') + room.join('p2', 'Hicks'))
+        await manager.dispatch(room, await sync_to_async(room.start)())
+        self.assertFalse(await MatchResult.objects.aexists())
+
+        await manager.dispatch(room, await sync_to_async(room.guess)('p1', 'heat'))
+        for queue in queues:
+            events = [queue.get_nowait()['event'] for _ in range(queue.qsize())]
+            self.assertEqual(events, ['players', 'players', 'round', 'scored', 'finished'])
+
+        result = await MatchResult.objects.aget(code=room.code)
+        self.assertEqual(result.results[0]['name'], 'Ripley')
+        self.assertIsNone(manager.get_room(room.code))
+
+    async def test_round_timer_kept_and_cancelled(self):
+        """
+        Test that the room holds its round timer, which is cancelled when the match ends.
+        """
+        manager = rooms.RoomManager(rooms.LocalRoomBackend())
+        room = manager.create_room(deck=[self.image.id])
+        queue = manager.backend.subscribe(room.code)
+        await manager.dispatch(room, room.join('p1', 'Ripley') + room.join('p2', 'Hicks'))
+        await manager.dispatch(room, await sync_to_async(room.start)())
+        timer = room.timer
+        self.assertFalse(timer.done())
+
+        await manager.dispatch(room, room.leave('p2'))
+        self.assertIsNone(room.timer)
+        await asyncio.sleep(0)
+        self.assertTrue(timer.cancelled())
+
+        # The last player leaving a finished match announces nothing more
+        await manager.dispatch(room, room.leave('p1'))
+        events = [queue.get_nowait()['event'] for _ in range(queue.qsize())]
+        self.assertEqual(events, ['players', 'players', 'round', 'finished'])
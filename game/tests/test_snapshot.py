@@ -0,0 +1,79 @@
+import os
+import tempfile
+from django.test import TestCase, override_settings
+
+from game import catalogue, snapshot
+from game.models import FilmImage
+from game.tests.utils import get_temporary_image
+
+
+SNAPSHOT_PATH = os.path.join(tempfile.mkdtemp(), 'catalogue.snapshot')
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.gettempdir(),
+    CATALOGUE_SNAPSHOT_PATH=SNAPSHOT_PATH,
+    CATALOGUE_SNAPSHOT_CHECK_INTERVAL=0,
+)
+class CatalogueSnapshotTest(TestCase):
+    def setUp(self):
+        self.images = [
+            FilmImage.objects.create(
+                title=title,
+                image=get_temporary_image(name=f'snapshot_{i}.jpg'),
+                tier='Easy',
+                frame='first',
+                hint_1='Première hint' if i == 0 else None,
+            )
+            for i, title in enumerate(['alien', 'aliens', 'heat'])
+        ]
+
+    def test_snapshot_matches_database(self):
+        """
+        Test that the mmap'd snapshot returns the same entries as the database.
+        """
+        entries = catalogue.get_catalogue()
+        self.assertIsInstance(entries, snapshot.CatalogueSnapshot)
+        self.assertTrue(os.path.exists(SNAPSHOT_PATH))
+
+        expected = {row[0]: catalogue.CatalogueEntry(*row) for row in catalogue.load_rows()}
+        self.assertEqual(dict(entries), expected)
+        self.assertEqual(list(entries.values()), list(expected.values()))
+        self.assertEqual(entries[self.images[0].id].hint_1, 'Première hint')
+        self.assertIsNone(entries[self.images[1].id].hint_1)
+        self.assertIsNone(entries.get(0))
+
+    def test_lookups_do_not_query(self):
+        """
+        Test that once the snapshot is mapped, lookups need no queries.
+        """
+        catalogue.get_catalogue()
+        with self.assertNumQueries(0):
+            self.assertEqual(catalogue.get_entry(self.images[2].id).title, 'heat')
+
+    def test_save_swaps_in_new_generation(self):
+        """
+        Test that saving a FilmImage replaces the snapshot with a new generation.
+        """
+        first = catalogue.get_catalogue()
+        image = FilmImage.objects.create(
+            title='ronin', image=get_temporary_image(name='snapshot_ronin.jpg'), tier='Hard', frame='last'
+        )
+        second = catalogue.get_catalogue()
+        self.assertGreater(second.generation, first.generation)
+        self.assertEqual(second[image.id].title, 'ronin')
+        # The old mapping stays readable for anything still holding it
+        self.assertEqual(first[self.images[0].id].title, 'alien')
+
+    def test_worker_picks_up_replaced_snapshot(self):
+        """
+        Test that a snapshot rebuilt by another process is remapped on the next check.
+        """
+        first = catalogue.get_catalogue()
+        FilmImage.objects.filter(id=self.images[2].id).update(title='heat 2')
+        os.unlink(SNAPSHOT_PATH)
+        snapshot.build_snapshot(SNAPSHOT_PATH)
+
+        second = catalogue.get_catalogue()
+        self.assertIsNot(second, first)
+        self.assertEqual(second[self.images[2].id].title, 'heat 2')
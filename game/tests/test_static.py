@@ -0,0 +1,108 @@
+import gzip
+import io
+import os
+import tempfile
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from game.management.commands.purge_css import purge
+from game.views import serve_static
+
+
+class CompressedStaticFilesTest(SimpleTestCase):
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(STATIC_ROOT=self.static_root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        call_command(
+            'collectstatic', interactive=False, verbosity=0, ignore_patterns=['admin', 'images', 'sitemaps'],
+        )
+        self.hashed_name = staticfiles_storage.stored_name('game/css/bootstrap.min.css')
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        """
+        Test that collectstatic writes hashed names with a gzip variant of the same content.
+        """
+        self.assertNotEqual(self.hashed_name, 'game/css/bootstrap.min.css')
+        path = os.path.join(self.static_root, self.hashed_name)
+        with open(path, 'rb') as file, gzip.open(path + '.gz') as compressed:
+            content = file.read()
+            self.assertEqual(compressed.read(), content)
+        self.assertLess(os.path.getsize(path + '.gz'), len(content))
+
+    def test_serve_static_picks_encoding(self):
+        """
+        Test that the precompressed variant is sent when accepted, with immutable caching for hashed names.
+        """
+        factory = RequestFactory()
+        url = f'/static/{self.hashed_name}'
+
+        response = serve_static(factory.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate'), self.hashed_name)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        gzip.decompress(b''.join(response.streaming_content))
+
+        response = serve_static(factory.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0'), self.hashed_name)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        response = serve_static(factory.get('/static/game/css/styles.css'), 'game/css/styles.css')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+        with self.assertRaises(Http404):
+            serve_static(factory.get('/static/../settings.py'), '../settings.py')
+
+    def test_serve_static_types_compressed_variant_as_original(self):
+        """
+        Test that a precompressed file of an unknown type isn't sent as application/gzip.
+        """
+        path = os.path.join(self.static_root, 'game', 'stills.bundle')
+        with open(path, 'wb') as file:
+            file.write(b'stills')
+        with gzip.open(path + '.gz', 'wb') as file:
+            file.write(b'stills')
+
+        request = RequestFactory().get('/static/game/stills.bundle', HTTP_ACCEPT_ENCODING='gzip')
+        response = serve_static(request, 'game/stills.bundle')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'application/octet-stream')
+        response.close()
+
+
+class PurgeCssTest(SimpleTestCase):
+    def test_purge_keeps_used_rules(self):
+        """
+        Test that rules are kept only when their classes, ids and elements are used.
+        """
+        css = (
+            '/*! licence */:root{--x:1}.btn,.unused{color:red}a.btn:hover{color:blue}'
+            '@media (min-width:1px){.col{width:1px}.gone{width:2px}}@media print{.gone{x:y}}'
+            '#main>table{border:0}'
+        )
+        purged = purge(css, {'btn', 'col', 'a', 'main'})
+        self.assertEqual(
+            purged,
+            '/*! licence */:root{--x:1}.btn{color:red}a.btn:hover{color:blue}'
+            '@media (min-width:1px){.col{width:1px}}',
+        )
+
+    def test_purge_css_command(self):
+        """
+        Test that the command writes the purged stylesheet.
+        """
+        directory = tempfile.mkdtemp()
+        css_path = os.path.join(directory, 'site.min.css')
+        template_path = os.path.join(directory, 'page.html')
+        with open(css_path, 'w') as file:
+            file.write('.used{a:b}.unused{c:d}')
+        with open(template_path, 'w') as file:
+            file.write('<div class="used"></div>')
+
+        stdout = io.StringIO()
+        call_command('purge_css', css=css_path, content=[template_path], stdout=stdout)
+        with open(os.path.join(directory, 'site.purged.css')) as file:
+            self.assertEqual(file.read(), '.used{a:b}')
@@ -0,0 +1,75 @@
+import io
+import tempfile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from game import stats
+from game.models import FilmImage, ImageStats
+from game.tests.utils import get_temporary_image
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir(), STATS_FLUSH_INTERVAL=3600)
+class ImageStatsTest(TestCase):
+    def setUp(self):
+        stats.flush()
+        self.image = FilmImage.objects.create(
+            title='Heat',
+            image=get_temporary_image(name='heat.jpg'),
+            tier='Easy',
+            frame='first'
+        )
+
+    def test_counters_are_buffered_until_flush(self):
+        """
+        Test that recording events does not write until the buffer is flushed.
+        """
+        with self.assertNumQueries(0):
+            stats.record(self.image.id, 'shown')
+            stats.record(self.image.id, 'shown')
+            stats.record(self.image.id, 'hinted')
+        self.assertFalse(ImageStats.objects.exists())
+
+        # The UPSERT, inside a savepoint as the test runs in a transaction
+        with self.assertNumQueries(3):
+            self.assertEqual(stats.flush(), 1)
+        image_stats = ImageStats.objects.get(image=self.image)
+        self.assertEqual((image_stats.shown, image_stats.hinted), (2, 1))
+
+    def test_flush_accumulates(self):
+        """
+        Test that repeated flushes add to the stored counters.
+        """
+        stats.record(self.image.id, 'shown')
+        stats.flush()
+        stats.record(self.image.id, 'shown')
+        stats.record(self.image.id, 'correct')
+        stats.record(999999, 'shown')  # Deleted or unknown images are ignored
+        stats.flush()
+
+        image_stats = ImageStats.objects.get(image=self.image)
+        self.assertEqual((image_stats.shown, image_stats.correct), (2, 1))
+        self.assertEqual(ImageStats.objects.count(), 1)
+
+    def test_failed_flush_leaves_transaction_usable(self):
+        """
+        Test that a failing flush inside a transaction doesn't break later queries.
+        """
+        # Out of range for the counter columns
+        stats._pending[self.image.id]['shown'] = 2 ** 40
+        with self.assertLogs('game.stats', 'ERROR'):
+            self.assertEqual(stats.flush(), 0)
+        self.assertEqual(FilmImage.objects.count(), 1)
+
+    def test_recalibrate_tiers(self):
+        """
+        Test that recalibrate_tiers only changes tiers when asked to apply.
+        """
+        ImageStats.objects.create(image=self.image, shown=100, correct=10)
+
+        call_command('recalibrate_tiers', stdout=io.StringIO())
+        self.image.refresh_from_db()
+        self.assertEqual(self.image.tier, 'Easy')
+
+        call_command('recalibrate_tiers', '--apply', stdout=io.StringIO())
+        self.image.refresh_from_db()
+        self.assertEqual(self.image.tier, 'Hard')
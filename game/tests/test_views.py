@@ -1,26 +1,16 @@
-import io
 import tempfile
 import uuid
-from PIL import Image
+from datetime import timedelta
 from django.test import TestCase, Client, override_settings
 from django.urls import reverse
-from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
 
-from game.models import FilmImage, GameSession
+from game import stats
+from game.models import FilmImage, GameSession, LeaderboardEntry
+from game.tests.utils import get_temporary_image
 
 
-def get_temporary_image(name='test.jpg', ext='JPEG', size=(100, 100), color=(255, 0, 0)):
-    """
-    Generates a temporary image for testing purposes.
-    """
-    file = io.BytesIO()
-    image = Image.new('RGB', size=size, color=color)
-    image.save(file, ext)
-    file.seek(0)
-    return SimpleUploadedFile(name, file.read(), content_type='image/jpeg')
-
-
-@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+@override_settings(MEDIA_ROOT=tempfile.gettempdir(), EVENT_LOG_DIR=None)
 class ViewsTestCase(TestCase):
     def setUp(self):
         self.client = Client()
@@ -284,6 +274,29 @@ class ViewsTestCase(TestCase):
         self.assertIn('performance_message', response.context)
         self.assertIn('performance_image', response.context)
 
+    def test_end_game_ends_session_once(self):
+        """
+        Test that end_game records the final score once and the session can't be played on.
+        """
+        self.client.get(reverse('start_game'), {'mode': 'first'})
+        session = GameSession.objects.get(session_id=self.client.session['session_id'])
+        GameSession.objects.filter(pk=session.pk).update(score=4)
+        self.client.get(reverse('end_game'))
+
+        session.refresh_from_db()
+        self.assertIsNotNone(session.ended_at)
+        self.assertRedirects(self.client.get(reverse('play_game')), reverse('end_game'))
+        response = self.client.post(reverse('skip_image'), {'image_id': self.image1.id})
+        self.assertTrue(response.json()['end_game'])
+
+        # Visiting end_game again doesn't offer the score again
+        GameSession.objects.filter(pk=session.pk).update(score=9)
+        self.client.get(reverse('end_game'))
+        self.assertEqual(
+            set(LeaderboardEntry.objects.filter(session_id=session.session_id).values_list('score', flat=True)),
+            {4},
+        )
+
     def test_end_game_view_without_session(self):
         """
         Test ending a game without a valid session redirects to start_game.
@@ -368,3 +381,169 @@ class ViewsTestCase(TestCase):
         self.assertTrue(is_answer_correct('Incepton', 'Inception'))
         self.assertFalse(is_answer_correct('Matrix', 'Inception'))
         self.assertFalse(is_answer_correct('Wrong Movie', 'Inception'))
+
+    def test_get_next_image_rotates_through_tier(self):
+        """
+        Test that get_next_image does not repeat an image until the active tier is exhausted.
+        """
+        from game.views import get_next_image
+
+        extra = FilmImage.objects.create(
+            title='Alien',
+            image=get_temporary_image(name='alien.jpg'),
+            tier='Easy',
+            frame='first'
+        )
+        session = GameSession.objects.create(
+            session_id=str(uuid.uuid4()),
+            score=0
+        )
+        session.images_remaining.set([self.image1, extra])
+
+        first = get_next_image(session)
+        second = get_next_image(session)
+        self.assertNotEqual(first, second)
+        seed = session.rotation_seed
+
+        # Rotation resets in a new shuffle once every eligible image has been shown
+        third = get_next_image(session)
+        self.assertIn(third, [first, second])
+        self.assertNotEqual(session.rotation_seed, seed)
+
+    def test_get_next_image_rotation_covers_tier(self):
+        """
+        Test that a rotation shows every eligible image once.
+        """
+        from game.views import get_next_image
+
+        session = GameSession.objects.create(session_id=str(uuid.uuid4()), score=0)
+        extras = [
+            FilmImage(title=f'Extra {i}', image=f'film_images/extra_{i}.jpg', tier='Easy', frame='first')
+            for i in range(8)
+        ]
+        session.images_remaining.set(FilmImage.objects.bulk_create(extras) + [self.image1])
+
+        for _ in range(3):
+            shown = [get_next_image(session).id for _ in range(9)]
+            self.assertEqual(len(set(shown)), 9)
+            session.refresh_from_db()
+            self.assertEqual(session.rotation_cursor, shown[-1])
+
+    def test_get_next_image_shuffles_per_session(self):
+        """
+        Test that two sessions over the same images are not shown them in the same order.
+        """
+        from game.views import get_next_image
+
+        images = FilmImage.objects.bulk_create([
+            FilmImage(title=f'Extra {i}', image=f'film_images/extra_{i}.jpg', tier='Easy', frame='first')
+            for i in range(20)
+        ])
+        sequences = []
+        for _ in range(2):
+            session = GameSession.objects.create(session_id=str(uuid.uuid4()), score=0)
+            session.images_remaining.set(images)
+            sequences.append([get_next_image(session).id for _ in range(20)])
+
+        self.assertEqual(set(sequences[0]), set(sequences[1]))
+        self.assertNotEqual(sequences[0], sequences[1])
+        self.assertNotEqual(sequences[0], sorted(sequences[0]))
+
+    def test_get_next_image_increments_score_atomically(self):
+        """
+        Test that the score increment is applied in the database rather than
+        overwriting it from a stale in-memory session.
+        """
+        from game.views import get_next_image
+
+        session = GameSession.objects.create(
+            session_id=str(uuid.uuid4()),
+            score=3
+        )
+        session.images_remaining.set(FilmImage.objects.all())
+        stale_session = GameSession.objects.get(pk=session.pk)
+
+        # A concurrent request scores in the meantime
+        GameSession.objects.filter(pk=session.pk).update(score=5)
+
+        stale_session.score += 1
+        get_next_image(stale_session, score_increment=1)
+        session.refresh_from_db()
+        self.assertEqual(session.score, 6)
+        self.assertIsNotNone(session.rotation_cursor)
+
+    def test_repeated_correct_answer_scores_once(self):
+        """
+        Test that submitting the same correct answer again doesn't score again.
+        """
+        self.client.get(reverse('start_game'), {'mode': 'first'})
+        session = GameSession.objects.get(session_id=self.client.session['session_id'])
+        form_data = {'image_id': str(self.image1.id), 'answer': self.image1.title}
+
+        first = self.client.post(reverse('check_answer'), data=form_data).json()
+        second = self.client.post(reverse('check_answer'), data=form_data).json()
+        self.assertEqual((first['correct'], first['score']), (True, 1))
+        self.assertEqual((second['correct'], second['score']), (True, 1))
+        self.assertNotIn('image_id', second)
+        session.refresh_from_db()
+        self.assertEqual(session.score, 1)
+        self.assertFalse(session.images_remaining.filter(id=self.image1.id).exists())
+
+    def test_get_hint_is_cacheable(self):
+        """
+        Test that hints are served from the catalogue with an ETag and honour If-None-Match.
+        """
+        url = reverse('get_hint')
+        params = {'image_id': self.image1.id, 'hint_count': 0}
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('must-revalidate', response['Cache-Control'])
+        self.assertNotIn('immutable', response['Cache-Control'])
+        etag = response['ETag']
+
+        # The catalogue is warm, so revalidation needs no query and records nothing
+        stats.flush()
+        with self.assertNumQueries(0):
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(stats.flush(), 0)
+
+        response = self.client.get(url, {'image_id': self.image1.id, 'hint_count': 1})
+        self.assertNotEqual(response['ETag'], etag)
+
+        # An edited hint no longer matches the cached copy
+        self.image1.hint_1 = 'An edited hint.'
+        self.image1.save()
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['hint'], '"An edited hint."')
+
+    def test_get_hint_invalid_hint_count(self):
+        """
+        Test that a non-numeric hint_count is a 400 rather than a server error.
+        """
+        response = self.client.get(reverse('get_hint'), {'image_id': self.image1.id, 'hint_count': 'two'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_expired_session_is_rejected(self):
+        """
+        Test that guesses and skips are refused once the server-side clock has run out.
+        """
+        self.client.get(reverse('start_game'), {'mode': 'first'})
+        session_id = self.client.session['session_id']
+        GameSession.objects.filter(session_id=session_id).update(
+            started_at=timezone.now() - timedelta(seconds=120)
+        )
+
+        # Only the session is loaded, no image lookup happens
+        with self.assertNumQueries(2):
+            response = self.client.post(reverse('check_answer'), {'image_id': self.image1.id, 'answer': 'Inception'})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.json()['end_game'])
+
+        response = self.client.post(reverse('skip_image'), {'image_id': self.image1.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Time is up.')
+
+        response = self.client.get(reverse('play_game'))
+        self.assertRedirects(response, reverse('end_game'), fetch_redirect_response=False)
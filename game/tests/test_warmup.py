@@ -0,0 +1,88 @@
+import gc
+import io
+import os
+import tempfile
+import unittest
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from game import autocomplete, catalogue, daily, warmup
+from game.models import DailyDeck, FilmImage
+from game.tests.utils import get_temporary_image
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class WarmUpTest(TestCase):
+    def setUp(self):
+        daily._decks.clear()
+        FilmImage.objects.create(
+            title='heat',
+            image=get_temporary_image(name='warmup.jpg'),
+            tier='Easy',
+            frame='first'
+        )
+
+    def test_warm_up_runs_every_stage(self):
+        """
+        Test that every stage runs without error and leaves the catalogue and its indexes built.
+        """
+        timings = warmup.warm_up()
+        self.assertEqual([name for name, _, _ in timings], [name for name, _ in warmup.STAGES])
+        self.assertEqual([error for _, _, error in timings], [None] * len(warmup.STAGES))
+
+        with self.assertNumQueries(0):
+            catalogue.get_catalogue()
+            self.assertEqual(autocomplete.suggest('heat'), ['heat'])
+
+    def test_warm_up_only_loads_a_stored_deck(self):
+        """
+        Test that warming up doesn't build the day's deck, but caches one already stored.
+        """
+        warmup.warm_indexes()
+        self.assertFalse(DailyDeck.objects.exists())
+
+        deck = daily.get_deck()
+        daily._decks.clear()
+        warmup.warm_indexes()
+        with self.assertNumQueries(0):
+            self.assertEqual(daily.get_deck(), deck)
+
+    def test_warm_caches_command_reports_stages(self):
+        """
+        Test that the command prints a timing for each stage.
+        """
+        stdout = io.StringIO()
+        call_command('warm_caches', stdout=stdout)
+        output = stdout.getvalue()
+        for name, _ in warmup.STAGES:
+            self.assertIn(name, output)
+        self.assertIn('Warm-up finished', output)
+
+    @unittest.skipUnless(os.path.exists('/proc/self/smaps_rollup'), 'Requires /proc smaps_rollup')
+    def test_measure_worker_memory(self):
+        """
+        Test that the measurement command reports shared and private memory for a process.
+        """
+        stdout = io.StringIO()
+        call_command('measure_worker_memory', os.getpid(), stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn(str(os.getpid()), output)
+        self.assertIn('1 worker(s)', output)
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class PreloadTest(TransactionTestCase):
+    # preload() closes database connections, which a TestCase transaction can't survive
+    def test_preload_freezes_heap(self):
+        """
+        Test that preloading moves objects to the permanent generation and applies GC_THRESHOLDS.
+        """
+        thresholds = gc.get_threshold()
+        self.addCleanup(gc.set_threshold, *thresholds)
+        self.addCleanup(gc.unfreeze)
+
+        with override_settings(GC_THRESHOLDS=(40000, 15, 15)):
+            warmup.preload()
+        self.assertGreater(gc.get_freeze_count(), 0)
+        self.assertEqual(gc.get_threshold(), (40000, 15, 15))
+        self.assertTrue(gc.isenabled())
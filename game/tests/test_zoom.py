@@ -0,0 +1,169 @@
+import io
+import os
+import tempfile
+from PIL import Image, ImageDraw
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from game.imaging import salient_centre, zoom_crops
+from game.models import FilmImage
+from game.tests.utils import get_temporary_image
+from game.zoom import crop_name, crop_urls
+
+
+def get_detailed_image(size=(400, 200), detail=(300, 150)):
+    """
+    Generates a flat image with a small checkerboard centred on detail.
+    """
+    image = Image.new('RGB', size=size, color=(40, 40, 40))
+    draw = ImageDraw.Draw(image)
+    x, y = detail
+    for left in range(x - 20, x + 20, 5):
+        for top in range(y - 20, y + 20, 5):
+            if (left + top) // 5 % 2:
+                draw.rectangle((left, top, left + 4, top + 4), fill=(255, 255, 255))
+    return image
+
+
+class SaliencyTest(TestCase):
+    def test_centre_follows_detail(self):
+        """
+        Test that the crop centre lands on the detailed region of a still.
+        """
+        x, y = salient_centre(get_detailed_image(), (40, 40))
+        self.assertAlmostEqual(x, 300, delta=10)
+        self.assertAlmostEqual(y, 150, delta=10)
+
+    def test_flat_image_uses_middle(self):
+        """
+        Test that a still without detail is cropped around its middle.
+        """
+        self.assertEqual(salient_centre(Image.new('RGB', (100, 50)), (10, 10)), (50, 25))
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir(), ZOOM_CROP_SCALES=(0.25, 0.5))
+class ZoomCropTest(TestCase):
+    def test_crops_widen_around_detail(self):
+        """
+        Test that crops are nested, widen in order and keep the still's size.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as file:
+            get_detailed_image().save(file, 'JPEG')
+            file.flush()
+            crops = zoom_crops(file.name)
+
+        (left, top, right, bottom), widest = [box for box, _ in crops]
+        self.assertEqual((right - left, bottom - top), (100, 50))
+        self.assertAlmostEqual((left + right) / 2, 300, delta=5)
+        self.assertAlmostEqual((top + bottom) / 2, 150, delta=5)
+        # Moved inside the still rather than centred past its edge
+        self.assertEqual(widest, (200, 100, 400, 200))
+        for _, data in crops:
+            with Image.open(io.BytesIO(data)) as crop:
+                self.assertEqual((crop.format, crop.size), ('JPEG', (400, 200)))
+
+    def test_upload_generates_crops(self):
+        """
+        Test that saving an uploaded still stores its crops alongside it.
+        """
+        image = FilmImage.objects.create(
+            title='Zodiac', image=get_temporary_image('zoom_zodiac.jpg', image=get_detailed_image()),
+            tier='Easy', frame='first'
+        )
+        image.refresh_from_db()
+        self.assertEqual(len(image.crop_boxes), 2)
+        for level in range(2):
+            self.assertTrue(default_storage.exists(crop_name(image.image.name, level)))
+        self.assertEqual(crop_urls(image), [
+            default_storage.url(crop_name(image.image.name, 0)),
+            default_storage.url(crop_name(image.image.name, 1)),
+        ])
+
+    def test_crops_deleted_with_image(self):
+        """
+        Test that deleting a still, or replacing its file, deletes its crops.
+        """
+        image = FilmImage.objects.create(
+            title='Zodiac', image=get_temporary_image('zoom_replaced.jpg', image=get_detailed_image()),
+            tier='Easy', frame='first'
+        )
+        old_crop = crop_name(image.image.name, 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            image.image = get_temporary_image('zoom_replacement.jpg', image=get_detailed_image())
+            image.save()
+        self.assertFalse(default_storage.exists(old_crop))
+        new_crop = crop_name(image.image.name, 0)
+        self.assertTrue(default_storage.exists(new_crop))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.delete()
+        self.assertFalse(default_storage.exists(new_crop))
+
+    def test_generate_crops_command(self):
+        """
+        Test that generate_crops backfills stills without crops.
+        """
+        image = FilmImage.objects.create(
+            title='Zodiac', image=get_temporary_image('zoom_backfill.jpg', image=get_detailed_image()),
+            tier='Easy', frame='first'
+        )
+        os.remove(default_storage.path(crop_name(image.image.name, 0)))
+        FilmImage.objects.filter(pk=image.pk).update(crop_boxes=[])
+
+        call_command('generate_crops', stdout=io.StringIO())
+        image.refresh_from_db()
+        self.assertEqual(len(image.crop_boxes), 2)
+        self.assertTrue(default_storage.exists(crop_name(image.image.name, 0)))
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir(), EVENT_LOG_DIR=None)
+class ZoomModeViewsTest(TestCase):
+    def setUp(self):
+        self.images = [
+            FilmImage.objects.create(
+                title=title, image=get_temporary_image(f'zoom_{frame}.jpg', image=get_detailed_image()),
+                tier='Easy', frame=frame
+            )
+            for title, frame in [('Se7en', 'first'), ('Fargo', 'last')]
+        ]
+        self.without_crops = FilmImage.objects.create(
+            title='Heat', image=get_temporary_image('zoom_heat.jpg', image=get_detailed_image()),
+            tier='Easy', frame='first'
+        )
+        FilmImage.objects.filter(pk=self.without_crops.pk).update(crop_boxes=[])
+
+    def test_zoom_game_serves_crop_urls(self):
+        """
+        Test that a zoom game sends only crop URLs, from stills of both frames,
+        and the still's URL once its round is over.
+        """
+        self.client.get(reverse('start_game'), {'mode': 'zoom'})
+        response = self.client.get(reverse('play_game'))
+        self.assertNotIn('image', response.context)
+        image = FilmImage.objects.get(id=response.context['form'].initial['image_id'])
+        self.assertIn(image, self.images)
+        self.assertEqual(response.context['crop_urls'], crop_urls(image))
+        self.assertNotIn(image.image.url, response.content.decode())
+        for url in crop_urls(image):
+            self.assertNotIn(image.image.name.rsplit('.', 1)[0], url)
+
+        data = self.client.post(reverse('skip_image'), {'image_id': image.id}).json()
+        next_image = FilmImage.objects.get(id=data['image_id'])
+        self.assertNotEqual(next_image, self.without_crops)
+        self.assertEqual(data['crop_urls'], crop_urls(next_image))
+        self.assertNotIn('image_url', data)
+        self.assertEqual(data['answer_image_url'], image.image.url)
+
+        data = self.client.post(reverse('check_answer'), {'image_id': next_image.id, 'answer': 'wrong'}).json()
+        self.assertNotIn('image_url', data)
+        self.assertEqual(data['answer_image_url'], next_image.image.url)
+
+    def test_other_modes_have_no_crop_urls(self):
+        """
+        Test that crop URLs are only sent in zoom games.
+        """
+        self.client.get(reverse('start_game'), {'mode': 'first'})
+        response = self.client.get(reverse('play_game'))
+        self.assertNotIn('crop_urls', response.context)
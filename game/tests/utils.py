@@ -0,0 +1,21 @@
+import io
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+
+def get_temporary_image_bytes(ext='JPEG', size=(100, 100), color=(255, 0, 0), image=None, **options):
+    """
+    Generates image bytes for testing purposes. A given image is saved
+    instead of a plain one; options are passed on to its save().
+    """
+    file = io.BytesIO()
+    (image or Image.new('RGB', size=size, color=color)).save(file, ext, **options)
+    return file.getvalue()
+
+
+def get_temporary_image(name='test.jpg', ext='JPEG', size=(100, 100), color=(255, 0, 0), image=None, **options):
+    """
+    Generates a temporary image for testing purposes.
+    """
+    data = get_temporary_image_bytes(ext, size, color, image, **options)
+    return SimpleUploadedFile(name, data, content_type='image/jpeg')
@@ -12,6 +12,8 @@ urlpatterns = [
     path("end-game/", views.end_game, name="end_game"),
     path("is-movie-answer-correct/", views.is_answer_correct, name="is_answer_correct"),
     path("get-movie-hint/", views.get_hint, name="get_hint"),
+    path("suggest-titles/", views.suggest_titles, name="suggest_titles"),
     path("skip-film/", views.skip_image, name="skip_image"),
+    path("leaderboard/", views.leaderboard_view, name="leaderboard"),
     path('robots.txt', views.robots_txt, name='robots_txt'),
 ]
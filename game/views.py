@@ -1,23 +1,36 @@
 import os
 import random
+import hashlib
 import uuid
 import json
 import logging
+import mimetypes
 
-from rapidfuzz import fuzz
 from django.shortcuts import render, redirect
 from django.urls import reverse
 from django.conf import settings
-from django.http import JsonResponse, HttpResponse
+from django.db.models import BigIntegerField, F, Func, Q, Value
+from django.utils import timezone
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, Http404, JsonResponse, HttpResponse, HttpResponseNotModified
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils._os import safe_join
+from django.utils.http import parse_etags, quote_etag
 from django.views.decorators.http import require_POST
 from django.contrib.sitemaps.views import sitemap
 from .sitemaps import StaticViewsSitemap
 
-from .models import FilmImage, GameSession
+from . import autocomplete, catalogue, daily, eventlog, leaderboard, mediacache, stats, zoom
+from .storage import ENCODINGS
+from .models import FilmImage, GameSession, LeaderboardEntry
 from .forms import AnswerForm
 
 logger = logging.getLogger(__name__)
 
+# Minimum token_sort_ratio for an answer to count as correct
+ANSWER_THRESHOLD = 80
+
 
 def custom_sitemap_view(request):
     response = sitemap(request, sitemaps={'static': StaticViewsSitemap})
@@ -60,22 +73,35 @@ def cookies_policy(request):
 
 def start_game(request):
     mode = request.GET.get('mode', 'first')
-    if mode not in dict(FilmImage.FRAME_CHOICES):
-        logger.warning(f"Inavlid mode '{mode} provided. Deafulting to 'first")
+    if mode not in dict(GameSession.MODE_CHOICES):
+        logger.warning("Inavlid mode '%s provided. Deafulting to 'first", mode)
         mode = 'first'  # Fallback to 'first' if invalid mode is provided
 
     # Create a new game session
     session_id = str(uuid.uuid4())
     request.session['session_id'] = session_id
     request.session['frame_mode'] = mode
-    images = FilmImage.objects.filter(frame=mode)
-    session = GameSession.objects.create(
-        session_id=session_id,
-        frame_mode=mode
-    )
-    session.images_remaining.set(images)
-    session.save()
-    logger.info(f"Started new game session: {session_id} with mode: {mode}")
+
+    if mode == daily.DAILY_MODE:
+        # Daily players share one precomputed deck, nothing to select per session
+        GameSession.objects.create(
+            session_id=session_id,
+            frame_mode=mode,
+            deck_date=timezone.localdate()
+        )
+    else:
+        if mode == zoom.ZOOM_MODE:
+            # Any still with pre-generated crops, whichever frame it is
+            images = FilmImage.objects.filter(crop_boxes__len__gt=0)
+        else:
+            images = FilmImage.objects.filter(frame=mode)
+        session = GameSession.objects.create(
+            session_id=session_id,
+            frame_mode=mode
+        )
+        session.images_remaining.set(images)
+    logger.info("Started new game session: %s with mode: %s", session_id, mode)
+    eventlog.log_event(eventlog.START, session_id)
 
     return redirect('play_game')
 
@@ -91,80 +117,199 @@ def play_game(request):
     try:
         session = GameSession.objects.get(session_id=session_id)
     except GameSession.DoesNotExist:
-        logger.warning(f"GameSessiion ID: {session_id} does not exist. Redirecting to start game")
+        logger.warning("GameSessiion ID: %s does not exist. Redirecting to start game", session_id)
         return redirect('start_game')
 
-    if not session.images_remaining.exists():
-        logger.info(f"No images remaining, session ID: {session_id}. Redirecting to end_game")
+    if session.has_expired():
+        logger.info("Time is up for session %s. Redirecting to end_game", session_id)
+        return redirect('end_game')
+
+    if session.frame_mode != daily.DAILY_MODE and not session.images_remaining.exists():
+        logger.info("No images remaining, session ID: %s. Redirecting to end_game", session_id)
         return redirect('end_game')
 
     image = get_next_image(session)
     if not image:
-        logger.info(f"No next image found for session {session_id}. Redirecting to end_game")
+        logger.info("No next image found for session %s. Redirecting to end_game", session_id)
         return redirect('end_game')
 
     form = AnswerForm(initial={'image_id': image.id})
     context = {
         'image': image,
         'score': session.score,
-        'time_remaining': 90,
+        'time_remaining': session.seconds_remaining(),
         'form': form,
         'frame_mode': frame_mode,
     }
-    logger.debug(f"Rendering play_game with image ID {image.id} for session {session_id}")
+    if session.frame_mode == zoom.ZOOM_MODE:
+        # Shown in turn as hints are taken; the still itself only once the
+        # round is over
+        del context['image']
+        context['crop_urls'] = zoom.crop_urls(image)
+    logger.debug("Rendering play_game with image ID %s for session %s", image.id, session_id)
     return render(request, 'game/play_game.html', context)
 
 
-def get_next_image(session, current_image=None):
-    total_shown = session.score
+def get_active_tiers(score):
     # Determine the active tiers
-    if total_shown < 10:
-        tiers = ['Easy']
-    elif total_shown < 20:
-        tiers = ['Easy', 'Medium']
-    elif total_shown < 30:
-        tiers = ['Medium']
-    elif total_shown < 40:
-        tiers = ['Medium', 'Hard']
-    else:
-        tiers = ['Hard']
-
-    # Ensure current_tier_shown is initialized as before
-    if not session.current_tier_shown:
-        session.current_tier_shown = []
-
-    current_tier_shown = set(session.current_tier_shown)
-
+    if score < 10:
+        return ['Easy']
+    elif score < 20:
+        return ['Easy', 'Medium']
+    elif score < 30:
+        return ['Medium']
+    elif score < 40:
+        return ['Medium', 'Hard']
+    return ['Hard']
+
+
+def rotation_rank(seed, value=F('id')):
+    """
+    A seeded hash of an image id. Ordering by it gives each seed its own
+    shuffle of the catalogue, computed in the database.
+    """
+    return Func(value, Value(seed), function='hashint8extended', output_field=BigIntegerField())
+
+
+def next_in_rotation(queryset, seed, cursor):
+    """
+    Returns the image after cursor in the shuffle given by seed, or the first
+    one when cursor is None; None once the rotation is complete. A keyset
+    over (rank, id), so no list of shown images is needed, and the database
+    keeps only the best row while scanning the eligible ones.
+    """
+    ranked = queryset.annotate(rotation_rank=rotation_rank(seed)).order_by('rotation_rank', 'id')
+    if cursor is not None:
+        cursor_rank = rotation_rank(seed, Value(cursor))
+        ranked = ranked.filter(Q(rotation_rank__gt=cursor_rank) | Q(rotation_rank=cursor_rank, id__gt=cursor))
+    return ranked.first()
+
+
+def session_expired(session):
+    """
+    Whether the game clock has run out, with GAME_TIME_GRACE seconds allowed
+    for answers that were in flight when the client's timer hit zero.
+    """
+    return session.has_expired(grace=getattr(settings, 'GAME_TIME_GRACE', 3))
+
+
+def expired_payload(session):
+    return {'error': 'Time is up.', 'end_game': True, 'score': session.score}
+
+
+def seconds_since_active(session):
+    return (timezone.now() - session.last_active).total_seconds()
+
+
+def update_session(session, **fields):
+    """
+    Writes only the given columns (plus last_active) in a single UPDATE,
+    rather than rewriting the whole row with session.save().
+    """
+    GameSession.objects.filter(pk=session.pk).update(last_active=timezone.now(), **fields)
+
+
+def image_payload(session, image):
+    """
+    Returns the part of a response that shows image: its URL, or in zoom mode
+    only the URLs of its crops, so the still isn't given away.
+    """
+    if session.frame_mode == zoom.ZOOM_MODE:
+        return {'image_id': image.id, 'crop_urls': zoom.crop_urls(image)}
+    return {'image_id': image.id, 'image_url': image.image.url}
+
+
+def round_over_payload(session, image):
+    """
+    Returns what is sent about image once its round is over: in zoom mode,
+    the still that was hidden behind the crops.
+    """
+    if session.frame_mode == zoom.ZOOM_MODE:
+        return {'answer_image_url': image.image.url}
+    return {}
+
+
+def get_next_image(session, current_image=None, score_increment=0):
+    # Callers bump session.score locally before asking for the next image;
+    # the database value is incremented atomically in the same UPDATE.
+    if session.frame_mode == daily.DAILY_MODE:
+        return get_next_daily_image(session, score_increment)
+
+    tiers = get_active_tiers(session.score)
     tier_images = session.images_remaining.filter(tier__in=tiers)
 
     if current_image:
         tier_images = tier_images.exclude(id=current_image.id)
 
-    tier_images = tier_images.exclude(id__in=current_tier_shown)
+    chosen_image = None
+    if session.rotation_seed is not None:
+        chosen_image = next_in_rotation(tier_images, session.rotation_seed, session.rotation_cursor)
+    if chosen_image is None:
+        # Start a new rotation in a fresh shuffle; every image in the active
+        # tiers is eligible again
+        session.rotation_seed = random.getrandbits(63)
+        chosen_image = next_in_rotation(tier_images, session.rotation_seed, None)
+    session.rotation_cursor = chosen_image.id if chosen_image else None
+
+    fields = {'rotation_seed': session.rotation_seed, 'rotation_cursor': session.rotation_cursor}
+    if score_increment:
+        fields['score'] = F('score') + score_increment
+    update_session(session, **fields)
+    if chosen_image:
+        stats.record(chosen_image.id, 'shown')
+    return chosen_image
+
+
+def get_next_daily_image(session, score_increment=0):
+    chosen_image = daily.get_image(session.deck_date, session.deck_position)
+
+    fields = {}
+    position = session.deck_position
+    if chosen_image:
+        session.deck_position += 1
+        fields['deck_position'] = session.deck_position
+    if score_increment:
+        fields['score'] = F('score') + score_increment
+    if fields:
+        # Only from the position read, so a concurrent duplicate answer
+        # neither scores nor advances the deck again
+        GameSession.objects.filter(pk=session.pk, deck_position=position).update(
+            last_active=timezone.now(), **fields
+        )
+    if chosen_image:
+        stats.record(chosen_image.id, 'shown')
+    return chosen_image
+
+
+def skip(session, current_image):
+    """
+    Skips current_image and returns the response payload. Shared by the
+    skip_image view and the WebSocket channel.
+    """
+    stats.record(current_image.id, 'skipped')
+    eventlog.log_event(
+        eventlog.SKIP, session.session_id,
+        image_id=current_image.id,
+        score=session.score,
+        elapsed=seconds_since_active(session),
+    )
+
+    # Fetch the next image without modifying the score or timer
+    next_image = get_next_image(session, current_image=current_image)
 
-    if tier_images.exists():
-        chosen_image = random.choice(list(tier_images))
-        current_tier_shown.add(chosen_image.id)
-        session.current_tier_shown = list(current_tier_shown)
-        session.save()
-        return chosen_image
+    if next_image:
+        data = {
+            'skipped': True,
+            **image_payload(session, next_image),
+        }
     else:
-        # Reset the rotation
-        session.current_tier_shown = []
-        session.save()
-
-        # Images in active tiers are eligible again
-        tier_images = session.images_remaining.filter(tier__in=tiers)
-        if current_image:
-            tier_images = tier_images.exclude(id=current_image.id)
-
-        if tier_images.exists():
-            chosen_image = random.choice(list(tier_images))
-            session.current_tier_shown = [chosen_image.id]
-            session.save()
-            return chosen_image
-        else:
-            return None
+        data = {
+            'end_game': True,
+            'score': session.score,
+        }
+
+    data.update(round_over_payload(session, current_image))
+    return data
 
 
 @require_POST
@@ -177,26 +322,128 @@ def skip_image(request):
 
     try:
         session = GameSession.objects.get(session_id=session_id)
+    except GameSession.DoesNotExist:
+        return JsonResponse({'error': 'Invalid session or image ID.'}, status=400)
+
+    # Reject expired games before any image lookup
+    if session_expired(session):
+        return JsonResponse(expired_payload(session), status=400)
+
+    try:
         current_image = FilmImage.objects.get(id=current_image_id)
-    except (GameSession.DoesNotExist, FilmImage.DoesNotExist):
+    except (FilmImage.DoesNotExist, ValueError):
         return JsonResponse({'error': 'Invalid session or image ID.'}, status=400)
 
-    # Fetch the next image without modifying the score or timer
-    next_image = get_next_image(session, current_image=current_image)
+    return JsonResponse(skip(session, current_image))
+
+
+def claim_answer(session, image):
+    """
+    Takes image off the session for a correct answer, returning whether this
+    call took it, so an answer submitted again (or twice at once) scores once.
+    """
+    if session.frame_mode == daily.DAILY_MODE:
+        # Only the image last served from the deck can be answered
+        deck = daily.get_deck(session.deck_date)
+        position = session.deck_position - 1
+        return 0 <= position < len(deck) and deck[position] == image.id
+
+    through = GameSession.images_remaining.through
+    deleted, _ = through.objects.filter(gamesession_id=session.pk, filmimage_id=image.id).delete()
+    return deleted > 0
+
+
+def submit_answer(session, image, user_answer):
+    """
+    Checks user_answer against image, updates the session and returns the
+    response payload. Shared by the check_answer view and the WebSocket channel.
+    """
+    similarity = answer_similarity(user_answer, image.title)
+    correct = similarity >= ANSWER_THRESHOLD
+    scored = correct and claim_answer(session, image)
+    eventlog.log_event(
+        eventlog.GUESS, session.session_id,
+        image_id=image.id,
+        score=session.score + int(scored),
+        similarity=similarity,
+        elapsed=seconds_since_active(session),
+        answer=user_answer,
+    )
+
+    if correct:
+        if scored:
+            session.score += 1
+            stats.record(image.id, 'correct')
+        message = "Correct!"
+    else:
+        message = "Incorrect!"
+        quotes = [
+            "You're gonna need a bigger boat.",
+            "Not quite my tempo!",
+            "Why do we fall Master Bruce... to pick ourselves back up.",
+            "I didn't hear no bell!",
+            "We who are about to die, salute you!",
+            "I'll be back.",
+            "I know it was you, Fredo!",
+            "What we got here, is a failure to communicate.",
+            "It's like finding a needle in a stack of needles.",
+            "It's only after we've lost everything that we're free to do anything.",
+            "There's no crying in baseball",
+            "Houston, we have a problem",
+        ]
+        quote = random.choice(quotes)
+
+    if correct and not scored:
+        # Already answered, e.g. a resubmitted form; the first response
+        # carried the next image, so nothing moves on
+        return {
+            'correct': True,
+            'score': session.score,
+            'message': message,
+            'movie_title': image.title,
+            **round_over_payload(session, image),
+        }
+
+    # Check if the user has reached a score of 50
+    if session.score >= 50:
+        if scored:
+            update_session(session, score=F('score') + 1)
+        logger.info("User %s reached a score of 50. Ending game.", session.session_id)
+        return {
+            'correct': correct,
+            'score': session.score,
+            'end_game': True,
+            'message': message,
+            'movie_title': image.title if correct else None,
+            'quote': quote if not correct else None,
+            **round_over_payload(session, image),
+        }
+
+    # Get the next image, excluding the current image
+    next_image = get_next_image(session, current_image=image, score_increment=int(scored))
 
     if next_image:
         data = {
-            'skipped': True,
-            'image_url': next_image.image.url,
-            'image_id': next_image.id,
+            'correct': correct,
+            'score': session.score,
+            'message': message,
+            **image_payload(session, next_image),
+            'movie_title': image.title,
         }
+        if not correct:
+            data['quote'] = quote
     else:
+        # End game
         data = {
-            'end_game': True,
+            'correct': correct,
             'score': session.score,
+            'end_game': True,
         }
+        if not correct:
+            data['quote'] = quote
 
-    return JsonResponse(data)
+    data.update(round_over_payload(session, image))
+    return data
 
 
 def check_answer(request):
@@ -209,74 +456,21 @@ def check_answer(request):
 
             try:
                 session = GameSession.objects.get(session_id=session_id)
+            except GameSession.DoesNotExist:
+                logger.error("Invalid session %s or image %s", session_id, image_id)
+                return JsonResponse({'error': 'Invalid session or image'}, status=400)
+
+            # Reject expired games before any image lookup or answer matching
+            if session_expired(session):
+                return JsonResponse(expired_payload(session), status=400)
+
+            try:
                 image = FilmImage.objects.get(id=image_id)
-            except (GameSession.DoesNotExist, FilmImage.DoesNotExist):
-                logger.error(f"Invalid session {session_id} or image {image_id}")
+            except FilmImage.DoesNotExist:
+                logger.error("Invalid session %s or image %s", session_id, image_id)
                 return JsonResponse({'error': 'Invalid session or image'}, status=400)
 
-            correct = is_answer_correct(user_answer, image.title)
-
-            if correct:
-                session.score += 1
-                session.images_remaining.remove(image)
-                message = "Correct!"
-            else:
-                message = "Incorrect!"
-                quotes = [
-                    "You're gonna need a bigger boat.",
-                    "Not quite my tempo!",
-                    "Why do we fall Master Bruce... to pick ourselves back up.",
-                    "I didn't hear no bell!",
-                    "We who are about to die, salute you!",
-                    "I'll be back.",
-                    "I know it was you, Fredo!",
-                    "What we got here, is a failure to communicate.",
-                    "It's like finding a needle in a stack of needles.",
-                    "It's only after we've lost everything that we're free to do anything.",
-                    "There's no crying in baseball",
-                    "Houston, we have a problem",
-                ]
-                quote = random.choice(quotes)
-
-            session.save()
-
-            # Check if the user has reached a score of 50
-            if session.score >= 50:
-                logger.info(f"User {session_id} reached a score of 50. Ending game.")
-                return JsonResponse({
-                    'correct': correct,
-                    'score': session.score,
-                    'end_game': True,
-                    'message': message,
-                    'movie_title': image.title if correct else None,
-                    'quote': quote if not correct else None,
-                })
-
-            # Get the next image, excluding the current image
-            next_image = get_next_image(session, current_image=image)
-
-            if next_image:
-                data = {
-                    'correct': correct,
-                    'score': session.score,
-                    'message': message,
-                    'image_url': next_image.image.url,
-                    'image_id': next_image.id,
-                    'movie_title': image.title,
-                }
-                if not correct:
-                    data['quote'] = quote
-            else:
-                # End game
-                data = {
-                    'correct': correct,
-                    'score': session.score,
-                    'end_game': True,
-                }
-                if not correct:
-                    data['quote'] = quote
-
-            return JsonResponse(data)
+            return JsonResponse(submit_answer(session, image, user_answer))
         else:
             logger.warning("Invalid form submission in check_answer")
             return JsonResponse({'error': 'Invalid input'}, status=400)
@@ -285,42 +479,184 @@ def check_answer(request):
         return JsonResponse({'error': 'Invalid request'}, status=400)
 
 
-def is_answer_correct(user_answer, correct_answer):
+def answer_similarity(user_answer, correct_answer):
+    # Imported on first use to keep rapidfuzz off the import path of every
+    # management command and worker boot
+    from rapidfuzz import fuzz
+
     user_answer = ''.join(user_answer.split()).lower()
     correct_answer = ''.join(correct_answer.split()).lower()
     similarity = fuzz.token_sort_ratio(user_answer, correct_answer)
-    logger.debug(f"Calculated similarity {similarity} between '{user_answer}' and '{correct_answer}'")
-    return similarity >= 80
+    logger.debug("Calculated similarity %s between '%s' and '%s'", similarity, user_answer, correct_answer)
+    return similarity
+
+
+def is_answer_correct(user_answer, correct_answer):
+    return answer_similarity(user_answer, correct_answer) >= ANSWER_THRESHOLD
+
+
+def pick_hint(entry, hint_count):
+    """
+    Returns (hint_index, hint) for the hint_count'th hint click on a catalogue
+    entry, or None if it has no hints.
+    """
+    hints = entry.hints
+    if not hints:
+        return None
+    hint_index = hint_count % len(hints)
+    return hint_index, hints[hint_index]
+
+
+def take_hint(entry, hint_count, session_id=None):
+    """
+    Like pick_hint(), and records the hint as taken. Shared by get_hint and
+    the WebSocket channel.
+    """
+    hint = pick_hint(entry, hint_count)
+    if hint:
+        stats.record(entry.id, 'hinted')
+        eventlog.log_event(eventlog.HINT, session_id, image_id=entry.id)
+    return hint
 
 
 def get_hint(request):
     if request.method == 'GET':
         image_id = request.GET.get('image_id')
-        hint_count = int(request.GET.get('hint_count', 0))
-
         try:
-            image = FilmImage.objects.get(id=image_id)
-        except FilmImage.DoesNotExist:
-            logger.error(f"Image with ID {image_id} does not exist in get_hint")
+            hint_count = int(request.GET.get('hint_count', 0))
+        except ValueError:
+            return JsonResponse({'error': 'Invalid hint count.'}, status=400)
+
+        # Hints are read from the in-process catalogue and served with a strong
+        # ETag. They can be edited in the admin, so caches keep them for
+        # HINT_CACHE_MAX_AGE seconds and then revalidate.
+        entry = catalogue.get_entry(int(image_id)) if image_id and image_id.isdigit() else None
+        if entry is None:
+            logger.error("Image with ID %s does not exist in get_hint", image_id)
             return JsonResponse({'error': 'Invalid image'}, status=400)
 
-        hints = [image.hint_1, image.hint_2]
-        hints = [hint for hint in hints if hint]
+        hint = pick_hint(entry, hint_count)
 
-        if not hints:
-            logger.info(f"No hints available for image ID {image_id}")
+        if not hint:
+            logger.info("No hints available for image ID %s", image_id)
             return JsonResponse({'error': 'No hints available.'}, status=400)
 
-        hint_index = hint_count % len(hints)
-        hint = hints[hint_index]
-
-        hint_wrapped = f'"{hint}"'
-        return JsonResponse({'hint': hint_wrapped})
+        hint_index, hint = hint
+        etag = quote_etag(hashlib.md5(f'{entry.id}:{hint_index}:{hint}'.encode()).hexdigest())
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            # The client already has this hint, and it was recorded then
+            response = HttpResponseNotModified()
+        else:
+            take_hint(entry, hint_count, request.session.get('session_id'))
+            hint_wrapped = f'"{hint}"'
+            response = JsonResponse({'hint': hint_wrapped})
+        response['ETag'] = etag
+        patch_cache_control(
+            response,
+            public=True,
+            must_revalidate=True,
+            max_age=getattr(settings, 'HINT_CACHE_MAX_AGE', 60 * 5),
+        )
+        return response
     else:
         logger.warning("Invalid request method to get_hint")
         return JsonResponse({'error': 'Invalid request method.'}, status=400)
 
 
+def suggest_titles(request):
+    query = request.GET.get('q', '')[:100]
+    response = JsonResponse({'suggestions': autocomplete.suggest(query)})
+    # The same query always gives the same suggestions until the catalogue changes
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'AUTOCOMPLETE_CACHE_MAX_AGE', 60 * 60))
+    return response
+
+
+def serve_media(request, path):
+    # Popular stills are served from the worker's in-memory cache rather than
+    # re-read from disk on every request; files too large to cache are streamed.
+    try:
+        file_path = safe_join(settings.MEDIA_ROOT, path)
+        cached = mediacache.get_cache().get(file_path)
+        if cached is None:
+            response = FileResponse(open(file_path, 'rb'), content_type=mimetypes.guess_type(path)[0])
+    except (OSError, SuspiciousFileOperation):
+        raise Http404("Media file not found")
+
+    if cached is not None:
+        if cached.etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(cached.content, content_type=cached.content_type)
+        response['ETag'] = cached.etag
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'MEDIA_CACHE_MAX_AGE', 60 * 60 * 24))
+    return response
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for item in header.split(','):
+        encoding, _, params = item.partition(';')
+        params = params.strip()
+        try:
+            quality = float(params[2:]) if params.startswith('q=') else 1
+        except ValueError:
+            quality = 1
+        if quality > 0:
+            accepted.add(encoding.strip().lower())
+    return accepted
+
+
+def serve_static(request, path):
+    # Sends the precompressed variant collectstatic wrote, when the client
+    # accepts it, so nothing is compressed per request.
+    try:
+        file_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Static file not found")
+    if not os.path.isfile(file_path):
+        raise Http404("Static file not found")
+
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    content_encoding = None
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted and os.path.isfile(file_path + suffix):
+            content_encoding = encoding
+            file_path += suffix
+            break
+
+    # Typed after the original file: left to guess, FileResponse would call
+    # a precompressed variant application/gzip
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    response = FileResponse(open(file_path, 'rb'), content_type=content_type)
+    if content_encoding:
+        response['Content-Encoding'] = content_encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    if getattr(staticfiles_storage, 'is_hashed', None) and staticfiles_storage.is_hashed(path):
+        patch_cache_control(response, public=True, immutable=True, max_age=60 * 60 * 24 * 365)
+    else:
+        patch_cache_control(response, public=True, max_age=getattr(settings, 'STATIC_CACHE_MAX_AGE', 60 * 60))
+    return response
+
+
+_performance_scores = None
+
+
+def get_performance_scores():
+    """
+    Returns the score bands from performance_score.json, read once per worker.
+    """
+    global _performance_scores
+    if _performance_scores is None:
+        json_path = os.path.join(settings.BASE_DIR, 'game', 'data', 'performance_score.json')
+        try:
+            with open(json_path, 'r') as file:
+                _performance_scores = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            logger.error("Error loading performance scores: %s", e)
+            return []
+    return _performance_scores
+
+
 def end_game(request):
     session_id = request.session.get('session_id')
     if not session_id:
@@ -330,20 +666,12 @@ def end_game(request):
     try:
         session = GameSession.objects.get(session_id=session_id)
     except GameSession.DoesNotExist:
-        logger.error(f"GameSession with ID {session_id} does not exist in end_game")
+        logger.error("GameSession with ID %s does not exist in end_game", session_id)
         return redirect('start_game')
 
     score = session.score
-    logger.info(f"Ending game for session {session_id} with score {score}")
-    json_path = os.path.join(settings.BASE_DIR, 'game', 'data', 'performance_score.json')
-
-    # Load JSON data
-    try:
-        with open(json_path, 'r') as file:
-            performance_scores = json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        logger.error(f"Error loading performance scores: {e}")
-        performance_scores = []
+    logger.info("Ending game for session %s with score %s", session_id, score)
+    performance_scores = get_performance_scores()
 
     # Initialize with defaults
     performance_message = "You're not wrong man, you're just am asshole! "
@@ -355,15 +683,38 @@ def end_game(request):
             performance_image = scale['image']
             break
 
-    # Clear current_tier_shown as the game has ended
-    session.current_tier_shown = []
-    session.save()
+    # Only the first end_game call for a session ends it, so the score is
+    # offered to the leaderboard once, when it is final
+    ended = GameSession.objects.filter(pk=session.pk, ended_at__isnull=True).update(
+        ended_at=timezone.now(), last_active=timezone.now()
+    )
+    if ended:
+        leaderboard.record_score(session)
+        eventlog.log_event(eventlog.END, session_id, score=score, elapsed=seconds_since_active(session))
 
     context = {
         'score': score,
         'performance_message': performance_message,
         'performance_image': performance_image,
     }
-    logger.debug(f"Rendering end_game with context: {context}")
+    logger.debug("Rendering end_game with context: %s", context)
 
     return render(request, 'game/end_game.html', context)
+
+
+def leaderboard_view(request):
+    mode = request.GET.get('mode', 'first')
+    if mode not in dict(GameSession.MODE_CHOICES):
+        mode = 'first'
+    period = request.GET.get('period', 'day')
+    if period not in leaderboard.PERIODS:
+        period = 'day'
+
+    context = {
+        'entries': leaderboard.get_leaderboard(mode, period),
+        'frame_mode': mode,
+        'period': period,
+        'frame_choices': GameSession.MODE_CHOICES,
+        'period_choices': LeaderboardEntry.PERIOD_CHOICES,
+    }
+    return render(request, 'game/leaderboard.html', context)
@@ -0,0 +1,145 @@
+"""
+Worker warm-up.
+
+The first requests to a fresh worker otherwise pay for cold work: importing
+PIL and rapidfuzz, compiling templates, loading the catalogue and the indexes
+built from it, reading performance_score.json and, with persistent
+connections, opening a database connection. warm_up() does all of that up front and returns how long each
+stage took. It is run by the warm_caches command, and from the WSGI/ASGI
+entry points when WARM_CACHES_ON_STARTUP is set.
+
+preload() goes further for servers that fork workers from a preloaded
+master (gunicorn --preload with WSGI_PRELOAD set): it imports everything a
+request can reach, warms the caches and then moves every object into the
+permanent GC generation, so the workers' cyclic GC never touches (and
+un-shares) the pages inherited from the master.
+"""
+
+import gc
+import importlib
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.db import connection, connections
+from django.template import engines
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+WARM_IMPORTS = ['PIL.Image', 'PIL.JpegImagePlugin', 'PIL.WebPImagePlugin', 'rapidfuzz.fuzz', 'game.imaging']
+
+
+def warm_imports():
+    for module in WARM_IMPORTS:
+        importlib.import_module(module)
+
+
+def warm_templates():
+    template_dir = os.path.join(os.path.dirname(__file__), 'templates', 'game')
+    for name in sorted(os.listdir(template_dir)):
+        if name.endswith('.html'):
+            get_template(f'game/{name}')
+
+
+def warm_database():
+    # Without persistent connections the first request closes this one unused
+    if not connection.settings_dict['CONN_MAX_AGE']:
+        return
+    connection.ensure_connection()
+
+
+def warm_catalogue():
+    from . import catalogue
+
+    catalogue.get_catalogue()
+
+
+def warm_indexes():
+    from . import autocomplete, daily
+
+    autocomplete.get_index()
+    # Only loads a stored deck: warming a worker mustn't decide the day's deck
+    daily.get_deck(build=False)
+
+
+def warm_performance_scores():
+    from .views import get_performance_scores
+
+    get_performance_scores()
+
+
+def warm_media():
+    # Only worth doing when media is served by Django, through the media cache
+    if not getattr(settings, 'SERVE_MEDIA', settings.DEBUG):
+        return
+    from . import catalogue, mediacache
+
+    cache = mediacache.get_cache()
+    for entry in catalogue.get_catalogue().values():
+        if entry.tier == 'Easy' and entry.image:
+            try:
+                cache.get(os.path.join(settings.MEDIA_ROOT, entry.image))
+            except OSError:
+                pass
+
+
+STAGES = [
+    ('imports', warm_imports),
+    ('templates', warm_templates),
+    ('database', warm_database),
+    ('catalogue', warm_catalogue),
+    ('indexes', warm_indexes),
+    ('performance scores', warm_performance_scores),
+    ('media', warm_media),
+]
+
+
+def warm_up(skip=()):
+    """
+    Runs every warm-up stage and returns a list of (stage, seconds, error).
+    A failing stage is logged and skipped, so a worker can still start.
+    """
+    timings = []
+    for name, stage in STAGES:
+        if name in skip:
+            continue
+        started = time.perf_counter()
+        error = None
+        try:
+            stage()
+        except Exception as e:
+            logger.exception("Warm-up stage %s failed", name)
+            error = e
+        timings.append((name, time.perf_counter() - started, error))
+    logger.info("Warm-up finished: %s", ', '.join(f'{name} {seconds:.3f}s' for name, seconds, _ in timings))
+    return timings
+
+
+def preload():
+    """
+    Prepares a master process to fork workers: imports every URLconf, view,
+    admin and template tag library, runs the warm-up (without keeping a
+    database connection, which must not be shared across a fork), freezes
+    the heap and applies GC_THRESHOLDS.
+    """
+    gc.disable()
+    try:
+        # Resolving the URLconf imports every view module and the admin
+        get_resolver().url_patterns
+        for engine in engines.all():
+            getattr(engine, 'engine', engine).template_libraries
+        warm_up(skip=('database',))
+        connections.close_all()
+    finally:
+        # Collect first so the frozen heap has no garbage holding pages
+        gc.collect()
+        gc.freeze()
+        gc.enable()
+
+    thresholds = getattr(settings, 'GC_THRESHOLDS', None)
+    if thresholds:
+        gc.set_threshold(*thresholds)
+    logger.info("Preloaded for fork: %d objects frozen, GC thresholds %s", gc.get_freeze_count(), gc.get_threshold())
@@ -0,0 +1,80 @@
+"""
+Zoom mode.
+
+Zoom players first see a tight crop of a still, which widens with each hint
+they take. The crops are generated once, when the still is uploaded or loaded
+from a zip (or by the generate_crops command for older stills), and stored as
+ordinary JPEGs under crops/. Serving a zoom round therefore costs the same as
+serving a normal still: the URLs are built from the row that was already
+fetched and no image is processed in the request path.
+
+A zoom round sends only the crop URLs; the still's own URL is sent once the
+round is over. Crop names are an HMAC of the still's name, so they don't give
+it away either; after changing SECRET_KEY, run generate_crops --all.
+
+Crops are deleted with their FilmImage, and the old ones when its still is
+replaced.
+"""
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.crypto import salted_hmac
+
+from .models import FilmImage
+
+ZOOM_MODE = 'zoom'
+
+
+def crop_name(name, level):
+    digest = salted_hmac('game.zoom.crop_name', name, algorithm='sha256').hexdigest()[:32]
+    return f'crops/{digest}.zoom{level}.jpg'
+
+
+def crop_urls(image):
+    """
+    Returns the URLs of image's crops, tightest first.
+    """
+    return [default_storage.url(crop_name(image.image.name, level)) for level in range(len(image.crop_boxes))]
+
+
+def store_crops(image_id, name, crops):
+    """
+    Saves the (box, data) crops made by imaging.zoom_crops() for the still
+    stored as name, and records their boxes on the FilmImage row.
+    """
+    for level, (_, data) in enumerate(crops):
+        level_name = crop_name(name, level)
+        if default_storage.exists(level_name):
+            default_storage.delete(level_name)
+        default_storage.save(level_name, ContentFile(data))
+
+    boxes = [list(box) for box, _ in crops]
+    FilmImage.objects.filter(pk=image_id).update(crop_boxes=boxes)
+    return boxes
+
+
+def generate_crops(image):
+    # Imported here to keep PIL off the import path of the views
+    from .imaging import zoom_crops
+
+    image.crop_boxes = store_crops(image.pk, image.image.name, zoom_crops(image.image.path))
+
+
+def delete_crops(name, levels):
+    """
+    Deletes the crops of the still stored as name once the transaction
+    commits, so a rolled back delete keeps them.
+    """
+    def delete():
+        for level in range(levels):
+            default_storage.delete(crop_name(name, level))
+    transaction.on_commit(delete)
+
+
+def delete_image_crops(sender, instance, **kwargs):
+    """
+    FilmImage post_delete receiver.
+    """
+    if instance.image:
+        delete_crops(instance.image.name, len(instance.crop_boxes))